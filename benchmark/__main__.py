@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 import sys
-from . import bench_code_data
+from . import bench_code_data, bench_import, bench_index_mih
 
 
 def main():
@@ -8,11 +8,17 @@ def main():
         print("Usage: python -m benchmark <command> [args...]")
         print("\nAvailable commands:")
         print("  datacode <filepath>  - Benchmark data code generation")
+        print("  import               - Benchmark package import (startup) time")
+        print("  mih [entries]        - Benchmark multi-index hashing similarity index")
         return
 
     command = sys.argv[1]
     if command == "datacode":
         bench_code_data.main()
+    elif command == "import":
+        bench_import.main()
+    elif command == "mih":
+        bench_index_mih.main()
     else:
         print(f"Unknown command: {command}")
         print("Use 'python -m benchmark' to see available commands")
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import statistics
+import subprocess
+import sys
+import time
+
+
+def measure(code, runs=20):
+    """Measure median wall time in seconds for running `code` in a fresh interpreter."""
+    timings = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        timings.append(time.perf_counter() - start_time)
+    return statistics.median(timings)
+
+
+def benchmark_import():
+    """Benchmark cold start time of `import iscc_core` against a bare interpreter."""
+    baseline = measure("pass")
+    package = measure("import iscc_core")
+    full = measure("import iscc_core; iscc_core.gen_meta_code; iscc_core.Code")
+    return {
+        "interpreter_ms": baseline * 1000,
+        "import_ms": (package - baseline) * 1000,
+        "full_api_ms": (full - baseline) * 1000,
+    }
+
+
+def main():
+    results = benchmark_import()
+
+    print("\nBenchmark results for import iscc_core:")
+    print(f"Interpreter startup: {results['interpreter_ms']:.2f} ms")
+    print(f"Import iscc_core: {results['import_ms']:.2f} ms")
+    print(f"Import iscc_core and load full api: {results['full_api_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
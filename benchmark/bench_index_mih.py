@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import random
+import sys
+import time
+import iscc_core as ic
+
+
+def generate_codes(n, bits, clusters=1000):
+    """Generate `n` Content-Codes as noisy variations of random cluster centers."""
+    rgen = random.Random(0)
+    length = ic.encode_length(ic.MT.CONTENT, bits)
+    centers = [rgen.getrandbits(bits) for _ in range(clusters)]
+    codes = []
+    for _ in range(n):
+        body = rgen.choice(centers)
+        for _ in range(rgen.randint(0, bits // 8)):
+            body ^= 1 << rgen.randrange(bits)
+        body = body.to_bytes(bits // 8, "big")
+        codes.append(ic.Code((ic.MT.CONTENT, ic.ST_CC.IMAGE, ic.VS.V0, length, body)))
+    return codes
+
+
+def benchmark_mih(n=100000, bits=64, queries=100):
+    """Benchmark build time, memory usage and query latency of the MIH index."""
+    codes = generate_codes(n, bits)
+    index = ic.MihIndex(bits)
+    start_time = time.perf_counter()
+    for key, code in enumerate(codes):
+        index.add(code, key)
+    build = time.perf_counter() - start_time
+    memory = index.memory()["total"]
+
+    sample = random.Random(1).sample(codes, queries)
+    radius = bits // 8
+    start_time = time.perf_counter()
+    for code in sample:
+        index.query(code, radius)
+    radius_ms = (time.perf_counter() - start_time) / queries * 1000
+    start_time = time.perf_counter()
+    for code in sample:
+        index.knn(code, 10)
+    knn_ms = (time.perf_counter() - start_time) / queries * 1000
+    return {
+        "entries": n,
+        "bits": bits,
+        "build_s": build,
+        "memory_mb": memory / (1024 * 1024),
+        "radius": radius,
+        "radius_ms": radius_ms,
+        "knn_ms": knn_ms,
+    }
+
+
+def main():
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    for bits in (64, 256):
+        results = benchmark_mih(n, bits)
+
+        print(f"\nBenchmark results for MihIndex with {results['bits']}-bit Content-Codes:")
+        print(f"Entries: {results['entries']}")
+        print(f"Build: {results['build_s']:.2f} seconds")
+        print(f"Memory: {results['memory_mb']:.2f} MB")
+        print(f"Radius query (r={results['radius']}): {results['radius_ms']:.3f} ms")
+        print(f"10-NN query: {results['knn_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,206 @@
 __version__ = "1.3.0"
-from iscc_core.options import core_opts, conformant_options
+import importlib
 
-# Import full api to toplevel
-from iscc_core.conformance import *
-from iscc_core.constants import *
+# Full toplevel api mapped to the submodules that implement it. Submodules are imported lazily
+# on first attribute access (PEP 562), so `import iscc_core` does not pay for loading options,
+# settings files and third party dependencies that the caller may never use.
+_LAZY_API = {
+    "iscc_core.options": ("core_opts", "conformant_options"),
+    "iscc_core.conformance": ("conformance_selftest", "conformance_testdata"),
+    "iscc_core.constants": (
+        "Data",
+        "Stream",
+        "MainType",
+        "SubType",
+        "Version",
+        "Length",
+        "Header",
+        "IsccTuple",
+        "IsccAny",
+        "Meta",
+        "FrameSig",
+        "b32_to_hex",
+        "hex_to_b32",
+        "MT",
+        "ST",
+        "ST_CC",
+        "ST_ISCC",
+        "ST_ID",
+        "ST_ID_REALM",
+        "VS",
+        "LN",
+        "VR",
+        "MULTIBASE",
+        "UNITS",
+        "SUBTYPE_MAP",
+        "MC_PREFIX",
+        "PREFIXES",
+        "CANONICAL_REGEX",
+    ),
+    "iscc_core.simhash": ("alg_simhash",),
+    "iscc_core.minhash": (
+        "alg_minhash",
+        "alg_minhash_64",
+        "alg_minhash_256",
+        "alg_minhash_compress",
+        "MAXI64",
+        "MPRIME",
+        "MAXH",
+        "MPA",
+        "MPB",
+    ),
+    "iscc_core.wtahash": (
+        "alg_wtahash",
+        "alg_wtahash_batch",
+        "WTA_VIDEO_ID_PERMUTATIONS",
+        "WTA_VIDEO_ID_IDX_A",
+        "WTA_VIDEO_ID_IDX_B",
+    ),
+    "iscc_core.dct": ("alg_dct",),
+    "iscc_core.cdc": ("alg_cdc_chunks",),
+    "iscc_core.iscc_code": ("gen_iscc_code", "gen_iscc_code_v0"),
+    "iscc_core.iscc_id": (
+        "gen_iscc_id",
+        "gen_iscc_id_v0",
+        "gen_iscc_id_v1",
+        "IsccIdIssuer",
+        "iscc_id_v1_bodies",
+        "iscc_id_v1_from_bodies",
+        "iscc_id_v1_split",
+        "iscc_id_v1_pack",
+        "iscc_id_v1_base32hex",
+        "IsccIdV0Replay",
+        "iscc_id_incr",
+        "iscc_id_incr_v0",
+        "alg_simhash_from_iscc_id",
+    ),
+    "iscc_core.code_meta": (
+        "gen_meta_code",
+        "gen_meta_code_v0",
+        "soft_hash_meta_v0",
+        "text_clean",
+        "text_remove_newlines",
+        "text_trim",
+    ),
+    "iscc_core.code_content_text": (
+        "gen_text_code",
+        "gen_text_code_v0",
+        "soft_hash_text_v0",
+        "text_collapse",
+    ),
+    "iscc_core.code_content_image": ("gen_image_code", "gen_image_code_v0", "soft_hash_image_v0"),
+    "iscc_core.code_content_audio": ("gen_audio_code", "gen_audio_code_v0", "soft_hash_audio_v0"),
+    "iscc_core.code_content_video": (
+        "gen_video_code",
+        "gen_video_code_v0",
+        "soft_hash_video_v0",
+        "soft_hash_video_segments_v0",
+    ),
+    "iscc_core.code_content_mixed": ("gen_mixed_code", "gen_mixed_code_v0", "soft_hash_codes_v0"),
+    "iscc_core.code_data": (
+        "gen_data_code",
+        "gen_data_code_v0",
+        "soft_hash_data_v0",
+        "DataHasher",
+        "DataHasherV0",
+    ),
+    "iscc_core.code_instance": (
+        "gen_instance_code",
+        "gen_instance_code_v0",
+        "hash_instance_v0",
+        "InstanceHasher",
+        "InstanceHasherV0",
+    ),
+    "iscc_core.code_flake": (
+        "gen_flake_code",
+        "gen_flake_code_v0",
+        "uid_flake_v0",
+        "FlakeGenerator",
+    ),
+    "iscc_core.codec": (
+        "encode_component",
+        "encode_header",
+        "encode_varnibble",
+        "decode_header",
+        "decode_varnibble",
+        "encode_units",
+        "decode_units",
+        "encode_length",
+        "decode_length",
+        "encode_base32",
+        "decode_base32",
+        "encode_base32_many",
+        "decode_base32_many",
+        "encode_base64",
+        "decode_base64",
+        "encode_base32hex",
+        "decode_base32hex",
+        "normalize_multiformat",
+        "iscc_decompose",
+        "iscc_normalize",
+        "iscc_normalize_many",
+        "iscc_decode",
+        "iscc_explain",
+        "iscc_type_id",
+        "iscc_validate",
+        "iscc_validate_many",
+        "iscc_validate_mf",
+        "iscc_clean",
+    ),
+    "iscc_core.utils": (
+        "iscc_nph_similarity_bytes",
+        "iscc_nph_distance_bytes",
+        "iscc_nph_compare",
+        "json_canonical",
+        "cidv1_hex",
+        "cidv1_to_token_id",
+        "cidv1_from_token_id",
+        "sliding_window",
+        "iscc_similarity",
+        "iscc_compare",
+        "iscc_distance",
+        "iscc_distance_bytes",
+        "iscc_distance_many",
+        "iscc_distance_topk",
+        "multi_hash_blake3",
+    ),
+    "iscc_core.models": ("Code", "Flake"),
+    "iscc_core.iscc_array": ("IsccArray",),
+    "iscc_core.iscc_file": ("IsccFile", "IsccFileWriter"),
+    "iscc_core.index_mih": ("MihIndex",),
+    "iscc_core.index_lsh": ("LshIndex",),
+    "iscc_core.index_mmap": ("MmapIndex",),
+    "iscc_core.index_iscc": ("IsccIndex",),
+    "iscc_core.index_instance": ("InstanceIndex",),
+    "iscc_core.index_chunk": ("ChunkIndex",),
+    "iscc_core.index_knn": ("KnnIndex",),
+    "iscc_core.index_id": ("IsccIdIndex",),
+    "iscc_core.nph": ("NphEngine",),
+    "iscc_core.cluster": ("iscc_cluster", "iscc_cluster_shards"),
+    "iscc_core.join": ("iscc_join",),
+    "iscc_core.check": ("turbo",),
+}
 
-from iscc_core.simhash import *
-from iscc_core.minhash import *
-from iscc_core.wtahash import *
-from iscc_core.dct import *
-from iscc_core.cdc import *
+_LAZY_NAMES = {name: module for module, names in _LAZY_API.items() for name in names}
 
-from iscc_core.iscc_code import *
-from iscc_core.iscc_id import *
-from iscc_core.code_meta import *
-from iscc_core.code_content_text import *
-from iscc_core.code_content_image import *
-from iscc_core.code_content_audio import *
-from iscc_core.code_content_video import *
-from iscc_core.code_content_mixed import *
-from iscc_core.code_data import *
-from iscc_core.code_instance import *
-from iscc_core.code_flake import *
-from iscc_core.codec import *
-from iscc_core.utils import *
-from iscc_core.models import *
-from iscc_core.check import *
+__all__ = list(_LAZY_NAMES)
+
+
+def __getattr__(name):
+    """Import toplevel api objects and submodules on first access."""
+    module = _LAZY_NAMES.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module(module), name)
+        globals()[name] = value
+        return value
+    if not name.startswith("_"):
+        try:
+            return importlib.import_module(f"{__name__}.{name}")
+        except ModuleNotFoundError as e:
+            if e.name != f"{__name__}.{name}":  # pragma: no cover
+                raise
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""*Near-duplicate clustering of large ISCC collections.*
+
+ISCCs are decomposed into their ISCC-UNITs. The work of every clustered unit type is split
+into one task per shard: a task indexes the units of its shard in a `MihIndex`, links them
+among each other and then streams all later shards through that index. Each link connects two
+rows with units within the configured distance threshold, and the links are merged with a
+union-find (disjoint-set) forest into clusters.
+
+Tasks are independent of each other and are processed in parallel worker processes. Each task
+reduces its links to a spanning forest per pair of shards before they are merged, so the number
+of links that are passed between processes stays linear in the number of rows per shard pair.
+
+Memory of a worker is bounded by the shard size: a task holds the index over the distinct units
+of its shard (about 1 KB per distinct 64-bit unit) and one later shard at a time. The parent
+process needs 8 bytes per row for the union-find forest and the labels. The number of tasks
+grows with the square of the number of shards, as every shard is streamed once per earlier
+shard.
+"""
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import iscc_core as ic
+from iscc_core.index_mih import MihIndex
+from iscc_core.iscc_array import IsccArray
+from iscc_core.iscc_file import IsccFile
+
+__all__ = [
+    "iscc_cluster",
+    "iscc_cluster_shards",
+]
+
+Codes = Union[IsccArray, Iterable[ic.IsccAny]]
+Shard = Union[IsccArray, str, os.PathLike]
+
+# Default maximum normalized hamming distances of linked units by MainType
+THRESHOLDS = {ic.MT.CONTENT: 0.1, ic.MT.DATA: 0.1, ic.MT.INSTANCE: 0.0}
+
+
+def iscc_cluster(codes, thresholds=None, workers=None):
+    # type: (Codes, Optional[Dict[int, float]], Optional[int]) -> dict
+    """
+    Cluster near-duplicate ISCCs.
+
+    The codes are split into one shard per worker. See `iscc_cluster_shards` for details.
+
+    :param codes: IsccArray or iterable of ISCC-CODEs or ISCC-UNITs
+    :param thresholds: Maximum normalized hamming distance by MainType for units to be linked
+    :param int workers: Number of worker processes (default: number of CPUs)
+    :return: Cluster `labels` per row and cluster `representatives`
+    :rtype: dict
+    """
+    if not isinstance(codes, IsccArray):
+        codes = IsccArray(codes)
+    step = max(1, -(-len(codes) // (workers or os.cpu_count() or 1)))
+    shards = [codes[start : start + step] for start in range(0, len(codes), step)]
+    return iscc_cluster_shards(shards, thresholds, workers)
+
+
+def iscc_cluster_shards(shards, thresholds=None, workers=None):
+    # type: (Iterable[Shard], Optional[Dict[int, float]], Optional[int]) -> dict
+    """
+    Cluster near-duplicate ISCCs from a sequence of shards.
+
+    Rows of all shards are numbered consecutively. Two rows are linked if any of their units
+    with a MainType listed in `thresholds` are within the normalized hamming distance of that
+    threshold (default: Content-Code and Data-Code within 0.1, equal Instance-Codes). Units
+    are only compared with units of the same header (MainType, SubType, Version, Length).
+    Clusters are the connected components of the links. Rows without links form singleton
+    clusters.
+
+    Shards given as ISCC file paths (see `IsccFileWriter`) are loaded one at a time by each
+    task. Their rows are numbered in the order of `IsccFile.array()`. IsccArray shards are
+    copied to the workers, so paths are cheaper for large collections. Worker memory is
+    bounded by the shard size (see module documentation).
+
+    :param shards: IsccArrays or paths of ISCC files
+    :param thresholds: Maximum normalized hamming distance by MainType for units to be linked
+    :param int workers: Number of worker processes (default: number of CPUs)
+    :return: Cluster id per row as `labels` and the lowest row of each cluster as
+        `representatives` (cluster ids are numbered in order of their representatives)
+    :rtype: dict
+    """
+    shards = list(shards)
+    thresholds = THRESHOLDS if thresholds is None else thresholds
+    offsets = [0]
+    for shard in shards:
+        offsets.append(offsets[-1] + _shard_size(shard))
+    tasks = [
+        (ic.MT(mt), shards[i:], offsets[i:-1], threshold)
+        for mt, threshold in sorted(thresholds.items())
+        for i in range(len(shards))
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_cluster_links, *zip(*tasks)))
+    else:
+        results = [_cluster_links(*task) for task in tasks]
+    forest = _UnionFind(offsets[-1])
+    for links in results:
+        for i in range(0, len(links), 2):
+            forest.union(links[i], links[i + 1])
+    labels, representatives = array("Q"), array("Q")
+    for row in range(len(forest)):
+        root = forest.find(row)
+        if root == row:
+            labels.append(len(representatives))
+            representatives.append(row)
+        else:
+            labels.append(labels[root])
+    return dict(labels=labels, representatives=representatives)
+
+
+def _cluster_links(mtype, shards, offsets, threshold):
+    # type: (ic.MT, List[Shard], List[int], float) -> array
+    """
+    Spanning forest links (flat pairs of rows) between units of one MainType.
+
+    Units of the first shard are linked among each other and with units of all later shards.
+    """
+    links = array("Q")
+    codes = _shard_array(shards[0])
+    size = len(codes)
+    partitions = {}  # type: Dict[tuple, Tuple[MihIndex, Dict[int, int], int]]
+    forest = _UnionFind(size)
+    for row, header, body in _shard_units(codes, mtype):
+        partition = partitions.get(header)
+        if partition is None:
+            bits = header[-1] * 8
+            partition = partitions[header] = (MihIndex(bits), {}, int(threshold * bits))
+        for other in _near(partition, body):
+            if forest.union(other, row):
+                links.extend((offsets[0] + other, offsets[0] + row))
+        index, seen, _ = partition
+        if body not in seen:
+            seen[body] = row
+            index._add_body(body, body)
+    for shard, offset in zip(shards[1:], offsets[1:]):
+        codes = _shard_array(shard)
+        forest = _UnionFind(size + len(codes))
+        for row, header, body in _shard_units(codes, mtype):
+            partition = partitions.get(header)
+            if partition is None:
+                continue
+            for other in _near(partition, body):
+                if forest.union(other, size + row):
+                    links.extend((offsets[0] + other, offset + row))
+    return links
+
+
+def _near(partition, body):
+    # type: (Tuple[MihIndex, Dict[int, int], int], int) -> List[int]
+    """
+    First rows of indexed units within the radius of a partition.
+
+    Units equal to an indexed unit only return its first row, as all units near that row are
+    already linked to it.
+    """
+    index, seen, radius = partition
+    other = seen.get(body)
+    if other is not None:
+        return [other]
+    if not radius:
+        return []
+    return [seen[near] for near, _ in index._query_body(body, radius)]
+
+
+def _shard_units(codes, mtype):
+    # type: (IsccArray, ic.MT) -> Iterator[Tuple[int, Tuple[int, int, int, int], int]]
+    """Units of one MainType of a shard (see `_unit_rows`)."""
+    units = codes.decompose().get(mtype)
+    return _unit_rows(*units) if units is not None else iter(())
+
+
+def _unit_rows(rows, units):
+    # type: (array, IsccArray) -> Iterator[Tuple[int, Tuple[int, int, int, int], int]]
+    """Source row, header (SubType, Version, Length, body size) and integer body per unit."""
+    width = units.width
+    columns = (units.subtype, units.version, units.length, units.sizes)
+    for row, header, body in zip(rows, zip(*columns), units.ints()):
+        yield row, header, body >> (width - header[-1]) * 8
+
+
+def _shard_array(shard):
+    # type: (Shard) -> IsccArray
+    """Load a shard as IsccArray."""
+    if isinstance(shard, IsccArray):
+        return shard
+    with IsccFile(shard) as isccfile:
+        return isccfile.array()
+
+
+def _shard_size(shard):
+    # type: (Shard) -> int
+    """Number of rows of a shard."""
+    if isinstance(shard, IsccArray):
+        return len(shard)
+    with IsccFile(shard) as isccfile:
+        return len(isccfile)
+
+
+class _UnionFind:
+    """Disjoint-set forest over row numbers whose roots are the lowest row of each set."""
+
+    def __init__(self, size=0):
+        # type: (int) -> None
+        self.parent = array("Q", range(size))
+
+    def __len__(self):
+        return len(self.parent)
+
+    def grow(self, size):
+        # type: (int) -> None
+        """Add singleton sets up to `size` rows."""
+        self.parent.extend(range(len(self.parent), size))
+
+    def find(self, row):
+        # type: (int) -> int
+        """Root of the set of a row (with path halving)."""
+        parent = self.parent
+        while parent[row] != row:
+            parent[row] = row = parent[parent[row]]
+        return row
+
+    def union(self, a, b):
+        # type: (int, int) -> bool
+        """Merge the sets of two rows and return whether they were disjoint."""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if a > b:
+            a, b = b, a
+        self.parent[b] = a
+        return True
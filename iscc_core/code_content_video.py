@@ -16,7 +16,9 @@ The relevant frame signatures can be parsed from the following elements in sig.x
     But the format requires a custom binary parser to decode the frame signaturs.
 """
 
-from typing import Sequence, Tuple
+from array import array
+from operator import add, sub
+from typing import List, Optional, Sequence, Tuple
 import iscc_core as ic
 
 
@@ -73,3 +75,85 @@ def soft_hash_video_v0(frame_sigs, bits=ic.core_opts.video_bits):
     vecsum = [sum(col) for col in zip(*sigs)]
     video_hash_digest = ic.alg_wtahash(vecsum, bits)
     return video_hash_digest
+
+
+def soft_hash_video_segments_v0(
+    frame_sigs,
+    cuts=None,
+    window=ic.core_opts.video_window,
+    step=ic.core_opts.video_step,
+    bits=ic.core_opts.video_bits,
+):
+    # type: (Sequence[ic.FrameSig], Optional[Sequence[int]], int, int, int) -> dict
+    """
+    Compute granular video hashes v0 for segments of MP7 frame signatures.
+
+    Segments are either sliding windows of `window` frames advancing by `step` frames or, if
+    `cuts` are given, the shots between the supplied scene cut frame indices. The digest of
+    each segment is identical to `soft_hash_video_v0` applied to the frames of that segment,
+    so segment digests can be indexed and matched against Video-Codes of short clips.
+
+    All segments are computed in a single pass. Column sums of the unique frame signatures
+    are updated incrementally as frames enter and leave the current segment.
+
+    :param ic.FrameSig frame_sigs: 2D matrix of MP7 frame signatures
+    :param Optional[Sequence[int]] cuts: Frame indices at which new shots start (optional)
+    :param int window: Number of frames per sliding window (ignored if `cuts` is given)
+    :param int step: Number of frames to advance per sliding window (ignored if `cuts` is given)
+    :param int bits: Bit-length of resulting segment digests (multiple of 64)
+    :return: Segment records as packed columns: `starts` and (exclusive) `ends` frame indices
+        as `array("Q")` and the concatenated segment `digests` (bits // 8 bytes each)
+    :rtype: dict
+    :raises ValueError: If frame_sigs is empty or window/step are not positive
+    """
+    if not frame_sigs:
+        raise ValueError("frame_sigs cannot be empty")
+
+    if not isinstance(frame_sigs[0], tuple):
+        frame_sigs = [tuple(sig) for sig in frame_sigs]
+
+    segments = _video_segments(len(frame_sigs), cuts, window, step)
+
+    counts = {}  # Occurrences of unique frame signatures within the current segment
+    vecsum = [0] * len(frame_sigs[0])
+    head = tail = 0
+    starts, ends, digests = array("Q"), array("Q"), bytearray()
+    for start, end in segments:
+        while tail < end:
+            sig = frame_sigs[tail]
+            n = counts.get(sig, 0)
+            if not n:
+                vecsum = list(map(add, vecsum, sig))
+            counts[sig] = n + 1
+            tail += 1
+        while head < start:
+            sig = frame_sigs[head]
+            n = counts.pop(sig)
+            if n == 1:
+                vecsum = list(map(sub, vecsum, sig))
+            else:
+                counts[sig] = n - 1
+            head += 1
+        starts.append(start)
+        ends.append(end)
+        digests += ic.alg_wtahash(vecsum, bits)
+    return dict(starts=starts, ends=ends, digests=bytes(digests))
+
+
+def _video_segments(nframes, cuts, window, step):
+    # type: (int, Optional[Sequence[int]], int, int) -> List[Tuple[int, int]]
+    """Compute ordered (start, end) frame ranges for granular video hashing."""
+    if cuts is not None:
+        bounds = [0] + sorted({c for c in cuts if 0 < c < nframes}) + [nframes]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    if window < 1 or step < 1:
+        raise ValueError("window and step must be positive")
+
+    segments = []
+    for start in range(0, nframes, step):
+        end = min(start + window, nframes)
+        segments.append((start, end))
+        if end == nframes:
+            break
+    return segments
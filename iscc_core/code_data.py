@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """*A similarity perserving hash for binary data (soft hash).*"""
 
+from itertools import accumulate
 from typing import Optional
 import xxhash
 import iscc_core as ic
@@ -14,26 +15,31 @@ __all__ = [
 ]
 
 
-def gen_data_code(stream, bits=ic.core_opts.data_bits):
-    # type: (ic.Stream, int) -> dict
+def gen_data_code(stream, bits=ic.core_opts.data_bits, granular=False):
+    # type: (ic.Stream, int, bool) -> dict
     """
     Create a similarity preserving ISCC Data-Code with the latest standard algorithm.
 
     :param Stream stream: Input data stream.
     :param int bits: Bit-length of ISCC Data-Code (default 64).
+    :param bool granular: Include chunk `offsets`, `sizes` and `features` in the result.
     :return: ISCC Data-Code
     :rtype: dict
     """
-    return gen_data_code_v0(stream, bits)
+    return gen_data_code_v0(stream, bits, granular)
 
 
-def gen_data_code_v0(stream, bits=ic.core_opts.data_bits):
-    # type: (ic.Stream, int) -> dict
+def gen_data_code_v0(stream, bits=ic.core_opts.data_bits, granular=False):
+    # type: (ic.Stream, int, bool) -> dict
     """
     Create an ISCC Data-Code with algorithm v0.
 
+    With `granular=True` the result also holds the byte `offsets`, `sizes` and xxh32
+    `features` of all content defined chunks of the stream (see `ChunkIndex`).
+
     :param Stream stream: Input data stream.
     :param int bits: Bit-length of ISCC Data-Code (default 64).
+    :param bool granular: Include chunk `offsets`, `sizes` and `features` in the result.
     :return: ISCC object with Data-Code
     :rtype: dict
     """
@@ -47,6 +53,8 @@ def gen_data_code_v0(stream, bits=ic.core_opts.data_bits):
 
     data_code = hasher.code(bits=bits)
     iscc = "ISCC:" + data_code
+    if granular:
+        return dict(iscc=iscc, **hasher.granular())
     return dict(iscc=iscc)
 
 
@@ -123,6 +131,20 @@ class DataHasherV0:
         )
         return data_code
 
+    def granular(self):
+        # type: () -> dict
+        """
+        Chunk level features of the hashed data in stream order.
+
+        :return: Lists of chunk byte `offsets`, chunk `sizes` and xxh32 chunk `features`
+        :rtype: dict
+        """
+        self._finalize()
+        offsets = [0] + list(accumulate(self.chunk_sizes[:-1]))
+        return dict(
+            offsets=offsets, sizes=list(self.chunk_sizes), features=list(self.chunk_features)
+        )
+
     def _finalize(self):
         if self.tail is not None:
             if self.tail:  # Append non-empty tail
@@ -35,19 +35,20 @@ is compatible with UUID.
 """
 
 import os
+import sys
+import threading
 import time
-from collections import Counter
-from typing import Optional
+from array import array
+from typing import Dict, List, Optional, Tuple, Union
 import iscc_core as ic
 
 __all__ = [
     "gen_flake_code",
     "gen_flake_code_v0",
     "uid_flake_v0",
+    "FlakeGenerator",
 ]
 
-_COUNTER = Counter()
-
 
 def gen_flake_code(bits=ic.core_opts.flake_bits):
     # type: (int) -> dict
@@ -83,29 +84,122 @@ def uid_flake_v0(ts=None, bits=ic.core_opts.flake_bits):
     """
     Generate time and randomness based Flake-Hash
 
+    Uses one shared `FlakeGenerator` per bit-length (see `FlakeGenerator.next`).
+
     :param Optional[float] ts: Unix timestamp (defaults to current time)
     :param int bits: Bit-length resulting Flake-Code (multiple of 32)
     :return: Flake-Hash digest
     :rtype: bytes
     """
-    if not 64 <= bits <= 256:
-        raise ValueError(f"{bits} bits for flake outside 64 - 256 bits")
-    if bits % 32:
-        raise ValueError(f"{bits} bits for flake is not divisible by 32")
-
-    nbytes_rnd = (bits // 8) - 6
-
-    ts = time.time() if ts is None else ts
-    milliseconds = int(ts * 1000)
-    timedata = milliseconds.to_bytes(6, "big", signed=False)
-    counter = _COUNTER[timedata]
-    if counter == 0:
-        # Init counter with random value
-        counterdata = os.urandom(nbytes_rnd)
-        startcount = int.from_bytes(counterdata, "big", signed=False)
-        _COUNTER[timedata] = startcount
-        counter = startcount
-    counterdata = counter.to_bytes(nbytes_rnd, "big", signed=False)
-    _COUNTER.update([timedata])
-    flake_digest = timedata + counterdata
-    return flake_digest
+    generator = _GENERATORS.get(bits)
+    if generator is None:
+        generator = _GENERATORS.setdefault(bits, FlakeGenerator(bits))
+    return generator.next(ts)
+
+
+class FlakeGenerator:
+    """
+    Thread-safe generator of unique, increasing Flake-Hash digests.
+
+    A Flake-Hash is a 48-bit millisecond timestamp followed by a counter that starts at a
+    random value for each millisecond. The start value is drawn from the lower half of the
+    counter range, so every millisecond has room for at least half of all counter values. The
+    generator only keeps the state of the last millisecond, separately for calls with the
+    current time and with explicit timestamps. If the counter of a millisecond is exhausted,
+    generation continues in the next millisecond, so digests for the current time are strictly
+    increasing even if the system clock steps back.
+    """
+
+    def __init__(self, bits=ic.core_opts.flake_bits):
+        # type: (int) -> None
+        """
+        Create a FlakeGenerator.
+
+        :param int bits: Bit-length of generated Flake-Hashes (64 - 256, multiple of 32)
+        """
+        if not 64 <= bits <= 256:
+            raise ValueError(f"{bits} bits for flake outside 64 - 256 bits")
+        if bits % 32:
+            raise ValueError(f"{bits} bits for flake is not divisible by 32")
+        self.bits = bits
+        self._nbytes = bits // 8
+        self._counter_bytes = self._nbytes - 6
+        self._counter_limit = 1 << (self._counter_bytes * 8)
+        self._lock = threading.Lock()
+        self._clock = [-1, 0]  # [millisecond, next counter] of calls with the current time
+        self._fixed = [-1, 0]  # [millisecond, next counter] of calls with explicit timestamps
+
+    def next(self, ts=None):
+        # type: (Optional[float]) -> bytes
+        """
+        Generate a Flake-Hash digest.
+
+        :param Optional[float] ts: Unix timestamp (defaults to current time). Explicit
+            timestamps are used as given and do not affect digests for the current time.
+            Only consecutive calls with the same explicit millisecond share a counter.
+        :return: Flake-Hash digest
+        :rtype: bytes
+        """
+        ((value, _),) = self._reserve(1, ts)
+        return value.to_bytes(self._nbytes, "big")
+
+    def next_batch(self, n, ts=None, packed=False):
+        # type: (int, Optional[float], bool) -> Union[List[bytes], bytes]
+        """
+        Generate `n` increasing Flake-Hash digests with a single lock acquisition.
+
+        :param int n: Number of digests
+        :param Optional[float] ts: Unix timestamp (defaults to current time)
+        :param bool packed: Return one buffer of concatenated digests instead of a list
+        :return: List of Flake-Hash digests or packed digests
+        :rtype: Union[List[bytes], bytes]
+        """
+        size = self._nbytes
+        if size == 8:
+            words = array("Q")
+            for value, count in self._reserve(n, ts):
+                words.extend(range(value, value + count))
+            if sys.byteorder == "little":
+                words.byteswap()
+            data = words.tobytes()
+        else:
+            values = (
+                value.to_bytes(size, "big")
+                for start, count in self._reserve(n, ts)
+                for value in range(start, start + count)
+            )
+            data = b"".join(values)
+        if packed:
+            return data
+        return [data[i : i + size] for i in range(0, len(data), size)]
+
+    def _reserve(self, n, ts):
+        # type: (int, Optional[float]) -> List[Tuple[int, int]]
+        """Reserve `n` consecutive counter values as (first digest integer, count) runs."""
+        now = ts is None
+        ms = int((time.time() if now else ts) * 1000)
+        shift, limit = self._counter_bytes * 8, self._counter_limit
+        runs = []
+        state = self._clock if now else self._fixed
+        with self._lock:
+            last, counter = state
+            if ms > last if now else ms != last:
+                last, counter = ms, self._random_counter()
+            while n:
+                count = min(n, limit - counter)
+                if count:
+                    runs.append(((last << shift) | counter, count))
+                    counter += count
+                    n -= count
+                else:
+                    last, counter = last + 1, self._random_counter()
+            state[:] = last, counter
+        return runs
+
+    def _random_counter(self):
+        # type: () -> int
+        """Random start value in the lower half of the counter range of a new millisecond."""
+        return int.from_bytes(os.urandom(self._counter_bytes), "big") >> 1
+
+
+_GENERATORS = {}  # type: Dict[int, FlakeGenerator]
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 import math
+import operator
+from array import array
 import uvarint
-from typing import List, Tuple
+from typing import Callable, List, Sequence, Tuple
 import base58
 from bitarray import bitarray
-from bitarray.util import int2ba, ba2int
+from bitarray.util import int2ba, ba2int, ba2base
 from base64 import b32encode, b32decode
 from pybase64 import urlsafe_b64encode, urlsafe_b64decode
 from iscc_core.constants import *
@@ -65,6 +67,15 @@ def encode_header(mtype, stype, version=0, length=1):
     :rtype: bytes
 
     """
+    header = _HEADER_ENCODE.get((mtype, stype, version, length))
+    if header is not None:
+        return header
+    return _encode_header_varnibble(mtype, stype, version, length)
+
+
+def _encode_header_varnibble(mtype, stype, version, length):
+    # type: (MainType, SubType, Version, Length) -> bytes
+    """Encode header values bit by bit (used for headers missing from the lookup table)."""
     header = bitarray()
     for n in (mtype, stype, version, length):
         header += encode_varnibble(n)
@@ -117,6 +128,16 @@ def decode_header(data):
     :return: (MainType, SubType, Version, length, TailData)
     :rtype: IsccTuple
     """
+    data = bytes(data)
+    fields = _HEADER_DECODE.get(data[:2])
+    if fields is not None:
+        return fields + (data[2:],)
+    return _decode_header_varnibble(data)
+
+
+def _decode_header_varnibble(data):
+    # type: (bytes) -> IsccTuple
+    """Decode header values bit by bit (used for headers missing from the lookup table)."""
     result = []
     ba = bitarray()
     ba.frombytes(data)
@@ -166,6 +187,33 @@ def decode_varnibble(b):
         raise ValueError(f"Invalid prefix pattern '{prefix}' - must be one of: 0, 10, 110, 1110")
 
 
+def _header_tables():
+    # type: () -> Tuple[dict, dict]
+    """
+    Precompute encoded headers for all valid combinations of header values.
+
+    All header values of valid ISCCs fit into single nibbles, so their headers are exactly
+    2 bytes long. As varnibble encoding is prefix-free, a valid header is identified
+    unambiguously by looking up the first 2 bytes of an ISCC in the decoding table.
+
+    :return: Encoding table (header values -> bytes) and decoding table (bytes -> header values)
+    :rtype: Tuple[dict, dict]
+    """
+    encode_table, decode_table = {}, {}
+    for (mtype, version), subtypes in SUBTYPE_MAP.items():
+        lengths = range(5) if mtype == MT.ID else range(8)
+        for stype in subtypes:
+            for length in lengths:
+                fields = (int(mtype), int(stype), int(version), length)
+                header = _encode_header_varnibble(*fields)
+                encode_table[fields] = header
+                decode_table[header] = fields
+    return encode_table, decode_table
+
+
+_HEADER_ENCODE, _HEADER_DECODE = _header_tables()
+
+
 def encode_units(units):
     # type: (Tuple[MT, ...]) -> int
     """
@@ -297,11 +345,108 @@ def decode_base32(code):
     """
     Standard RFC4648 base32 decoding without padding and with casefolding.
     """
-    # python stdlib does not support base32 without padding, so we have to re-pad.
-    cl = len(code)
-    pad_length = math.ceil(cl / 8) * 8 - cl
+    nchars = len(code)
+    if "=" in code:
+        # Explicitly padded input, leave strict padding checks to the stdlib
+        return bytes(b32decode(code + "=" * (-nchars % 8), casefold=True))
+    if nchars % 8 in (1, 3, 6):
+        raise ValueError("Incorrect padding")
+    if not nchars:
+        return b""
+    pad = -nchars % 8
+    number = _b32_to_int(code + "A" * pad)
+    return number.to_bytes((nchars + pad) * 5 // 8, "big")[: nchars * 5 // 8]
+
+
+def encode_base32_many(data, size):
+    # type: (Data, int) -> List[str]
+    """
+    Batch RFC4648 base32 encoding without padding for a buffer of fixed-size records.
+
+    All records are encoded with a single base32 pass over one contiguous buffer.
+
+    :param Data data: Contiguous buffer of concatenated records (e.g. raw ISCC-UNITs)
+    :param int size: Size of each record in number of bytes
+    :return: List of base32 encoded records
+    :rtype: List[str]
+    """
+    if size < 1 or len(data) % size:
+        raise ValueError(f"Buffer of {len(data)} bytes is not a multiple of record size {size}")
+    if not data:
+        return []
+    pad = -size % 5
+    if pad:
+        # Zero-pad each record to a multiple of 5 bytes with one strided copy per byte column
+        data = memoryview(data)
+        padded = bytearray(len(data) // size * (size + pad))
+        for i in range(size):
+            padded[i :: size + pad] = data[i::size]
+        data = padded
+    bits = bitarray()
+    bits.frombytes(data)
+    encoded = ba2base(32, bits)
+    width = (size + pad) * 8 // 5
+    nchars = math.ceil(size * 8 / 5)
+    return [encoded[i : i + nchars] for i in range(0, len(encoded), width)]
+
+
+def decode_base32_many(codes):
+    # type: (Sequence[str]) -> bytes
+    """
+    Batch RFC4648 base32 decoding without padding and with casefolding for fixed-length codes.
+
+    Codes may be given with or without the `ISCC:` prefix but must all be of equal length
+    otherwise. All codes are decoded with a single pass into one contiguous output buffer.
+    Each record in the buffer is `len(code) * 5 // 8` bytes long.
+
+    :param Sequence[str] codes: Base32 encoded codes of equal length
+    :return: Concatenated raw bytes of all decoded codes
+    :rtype: bytes
+    """
+    if not codes:
+        return b""
+    codes = list(map(_strip_scheme, codes))
+    lengths = set(map(len, codes))
+    if len(lengths) != 1:
+        raise ValueError(f"Codes must be of equal length (got lengths {sorted(lengths)})")
+    nchars = lengths.pop()
+    if nchars % 8 in (1, 3, 6):
+        raise ValueError("Incorrect padding")
+    size = nchars * 5 // 8
+    pad = -nchars % 8
+    joined = ("A" * pad).join(codes) + "A" * pad
+    decoded = _b32_to_int(joined).to_bytes(len(joined) * 5 // 8, "big")
+    if not pad:
+        return decoded
+    width = (nchars + pad) * 5 // 8
+    decoded = memoryview(decoded)
+    return b"".join([decoded[i : i + size] for i in range(0, len(decoded), width)])
+
+
+def _strip_scheme(code):
+    # type: (str) -> str
+    """Remove a leading (case-insensitive) `ISCC:` scheme."""
+    if code[4:5] == ":" and code[:4].upper() == "ISCC":
+        return code[5:]
+    return code
+
+
+def _b32_to_int(chars):
+    # type: (str) -> int
+    """Parse (case-insensitive) base32 characters as one big-endian integer."""
+    if not chars.isascii():
+        raise ValueError("Non-base32 digit found")
+    # Python parses base32hex digits natively, so we translate and decode as one big integer
+    try:
+        return int(chars.translate(_B32_TO_HEX_CASEFOLD), 32)
+    except ValueError:
+        raise ValueError("Non-base32 digit found")
+
 
-    return bytes(b32decode(code + "=" * pad_length, casefold=True))
+#: Translation of (case-insensitive) base32 to base32hex with invalid characters mapped to "!"
+_B32_TO_HEX_CASEFOLD = {i: "!" for i in range(128)}
+_B32_TO_HEX_CASEFOLD.update({i: chr(c) for i, c in b32_to_hex.items()})
+_B32_TO_HEX_CASEFOLD.update({ord(chr(i).lower()): chr(c) for i, c in b32_to_hex.items()})
 
 
 def encode_base64(data):
@@ -351,28 +496,34 @@ def normalize_multiformat(iscc_code):
     Normalize a multiformat encoded ISCC to standard base32 encoding.
     Returns the input unchanged (but cleaned) if it's not multiformat encoded.
     """
-    decoders = {
-        MULTIBASE.base16.value: bytes.fromhex,  # f
-        MULTIBASE.base32.value: decode_base32,  # b
-        MULTIBASE.base32hex.value: decode_base32hex,  # v
-        MULTIBASE.base58btc.value: base58.b58decode,  # z
-        MULTIBASE.base64url.value: decode_base64,  # u
-    }
-
     # Clean the ISCC code first
     iscc_code = iscc_clean(iscc_code)
 
     # Check for multibase prefix
-    multibase_prefix = iscc_code[0]
-    if multibase_prefix in decoders.keys():
-        decoder = decoders[multibase_prefix]
-        decoded = decoder(iscc_code[1:])
-        if not decoded.startswith(MC_PREFIX):
-            raise ValueError(f"Malformed multiformat codec: {decoded[:2]}")
-        return encode_base32(decoded[2:])
+    decoder = _MF_DECODERS.get(iscc_code[0])
+    if decoder is not None:
+        return encode_base32(_decode_multiformat(decoder, iscc_code))
     return iscc_code
 
 
+def _decode_multiformat(decoder, iscc_code):
+    # type: (Callable, str) -> bytes
+    """Decode a cleaned multiformat encoded ISCC to raw ISCC bytes (without multicodec prefix)."""
+    decoded = decoder(iscc_code[1:])
+    if not decoded.startswith(MC_PREFIX):
+        raise ValueError(f"Malformed multiformat codec: {decoded[:2]}")
+    return decoded[2:]
+
+
+_MF_DECODERS = {
+    MULTIBASE.base16.value: bytes.fromhex,  # f
+    MULTIBASE.base32.value: decode_base32,  # b
+    MULTIBASE.base32hex.value: decode_base32hex,  # v
+    MULTIBASE.base58btc.value: base58.b58decode,  # z
+    MULTIBASE.base64url.value: decode_base64,  # u
+}
+
+
 def iscc_decompose(iscc_code):
     # type: (str) -> List[str]
     """
@@ -454,28 +605,84 @@ def iscc_normalize(iscc_code):
     :return: Normalized ISCC
     :rtype: str
     """
+    return "ISCC:" + encode_base32(_iscc_normalize_bytes(iscc_code))
+
+
+def iscc_normalize_many(iscc_codes):
+    # type: (Sequence[str]) -> List[str]
+    """
+    Normalize a batch of ISCCs to their canonical form.
+
+    Same as calling `iscc_normalize` for each code, but normalized codes of equal size are
+    base32 encoded together in a single pass.
+
+    :param Sequence[str] iscc_codes: Valid ISCC strings
+    :return: Normalized ISCCs
+    :rtype: List[str]
+    """
+    raws = [_iscc_normalize_bytes(iscc_code) for iscc_code in iscc_codes]
+    sizes = set(map(len, raws))
+    if len(sizes) == 1:
+        encoded = encode_base32_many(b"".join(raws), sizes.pop())
+    else:
+        encoded = [encode_base32(raw) for raw in raws]
+    return ["ISCC:" + code for code in encoded]
+
+
+def _iscc_normalize_bytes(iscc_code):
+    # type: (str) -> bytes
+    """
+    Normalize an ISCC to the raw bytes of its canonical form.
+
+    Well-formed ISCC-UNITs and ISCC-CODEs are parsed once and, for ISCC-CODEs, only the header
+    is rewritten. Sequences of ISCC-UNITs and non-canonical input are decomposed and recomposed.
+
+    :param str iscc_code: Any valid ISCC string
+    :return: Raw bytes (header and body) of normalized ISCC
+    :rtype: bytes
+    """
     from iscc_core.iscc_code import gen_iscc_code_v0
 
-    # Handle multiformat encoding first
-    iscc_code = normalize_multiformat(iscc_code)
+    iscc_code = iscc_clean(iscc_code)
+    decoder = _MF_DECODERS.get(iscc_code[0])
+    if decoder is None:
+        prefix = iscc_code[:2].upper()
+        raw = None
+    else:
+        raw = _decode_multiformat(decoder, iscc_code)
+        prefix = encode_base32(raw[:2])[:2]
 
     # Validate prefix (2 characters - note: MA and ME are ambiguous between V0 and V1)
-    prefix = iscc_code.upper()[:2]
-    if prefix not in PREFIXES:
+    if prefix not in _PREFIXES:
         raise ValueError(f"ISCC starts with invalid prefix {prefix}")
 
-    # Check if this is a WIDE ISCC code
-    cleaned_code = iscc_clean(iscc_code)
-    header = decode_header(decode_base32(cleaned_code))
-    is_wide = header[0] == MT.ISCC and header[1] == ST_ISCC.WIDE
+    if raw is None:
+        raw = decode_base32(iscc_code)
+
+    mt, st, vs, ln, body = decode_header(raw)
+    is_wide = mt == MT.ISCC and st == ST_ISCC.WIDE
+
+    if raw[:2] in _HEADER_DECODE:
+        # Fast path for ISCC-UNITs with complete body
+        if mt != MT.ISCC:
+            if len(body) == decode_length(mt, ln) // 8:
+                return raw
+        # Fast path for ISCC-CODEs with complete body (rewrite header in place)
+        else:
+            units = () if is_wide else decode_units(ln)
+            if len(body) == (32 if is_wide else len(units) * 8 + 16):
+                if not (is_wide or MT.SEMANTIC in units or MT.CONTENT in units):
+                    st = ST_ISCC.NONE if units else ST_ISCC.SUM
+                return encode_header(MT.ISCC, st, VS.V0, ln if units else 0) + body
+
+    decomposed = iscc_decompose(encode_base32(raw))
+    if len(decomposed) == 1:
+        return decode_base32(decomposed[0])
+    recomposed = gen_iscc_code_v0(decomposed, wide=is_wide)["iscc"]
+    return decode_base32(iscc_clean(recomposed))
 
-    decomposed = iscc_decompose(iscc_code)
-    recomposed = (
-        gen_iscc_code_v0(decomposed, wide=is_wide)["iscc"]
-        if len(decomposed) >= 2
-        else decomposed[0]
-    )
-    return f"ISCC:{recomposed}" if not recomposed.startswith("ISCC:") else recomposed
+
+_PREFIXES = frozenset(PREFIXES)
 
 
 ########################################################################################
@@ -492,9 +699,7 @@ def iscc_decode(iscc):
     :return: ISCC decoded to a tuple
     :rtype: IsccTuple
     """
-    iscc = iscc_clean(iscc_normalize(iscc))
-    data = decode_base32(iscc)
-    return decode_header(data)
+    return decode_header(_iscc_normalize_bytes(iscc))
 
 
 def iscc_explain(iscc):
@@ -622,6 +827,72 @@ def iscc_validate(iscc, strict=True):
     return True
 
 
+def iscc_validate_many(iscc_codes):
+    # type: (Sequence[str]) -> Tuple[bitarray, array]
+    """
+    Validate a batch of ISCC strings for being *strictly well-formed* (see `iscc_validate`).
+
+    Codes are grouped by length and base32 decoded together. Headers are resolved via the
+    precomputed header lookup table. Instead of raising, the reason for an invalid code is
+    reported with a `VR` reason code per row.
+
+    :param Sequence[str] iscc_codes: ISCC strings
+    :return: Mask of valid rows (1 = valid) and array of `VR` reason codes (0 = valid)
+    :rtype: Tuple[bitarray, array]
+    """
+    reasons = array("B", bytes(len(iscc_codes)))
+    groups = {}  # Row indices by code length
+    for idx, iscc in enumerate(iscc_codes):
+        if not CANONICAL_REGEX.match(iscc):
+            reasons[idx] = VR.FORMAT
+        elif (len(iscc) - 5) % 8 in (1, 3, 6):
+            reasons[idx] = VR.BASE32
+        elif iscc[5:7] not in _PREFIXES:
+            reasons[idx] = VR.PREFIX
+        else:
+            groups.setdefault(len(iscc), []).append(idx)
+
+    body_sizes = {}  # Expected body size in bytes by canonical header
+    for nchars, rows in groups.items():
+        size = (nchars - 5) * 5 // 8
+        decoded = decode_base32_many([iscc_codes[idx] for idx in rows])
+        for offset, idx in zip(range(0, len(decoded), size), rows):
+            header = decoded[offset : offset + 2]
+            fields = _HEADER_DECODE.get(header)
+            if fields is None:
+                reasons[idx] = _validate_noncanonical(decoded[offset : offset + size])
+                continue
+            nbytes = body_sizes.get(header)
+            if nbytes is None:
+                m, s, v, l = fields
+                nbytes = body_sizes[header] = _body_size(m, l, s)
+            if nbytes != size - 2:
+                reasons[idx] = VR.LENGTH
+
+    return bitarray(map(operator.not_, reasons)), reasons
+
+
+def _validate_noncanonical(data):
+    # type: (bytes) -> VR
+    """Validate raw ISCC with a header that is not in the header lookup table."""
+    try:
+        m, s, v, l, t = _decode_header_varnibble(data)
+    except ValueError:
+        return VR.HEADER
+    if (m, v) not in SUBTYPE_MAP:
+        return VR.VERSION
+    return VR.VALID if _body_size(m, l, s) == len(t) else VR.LENGTH
+
+
+def _body_size(mtype, length, subtype):
+    # type: (MainType, Length, SubType) -> int
+    """Body size in bytes for header values (-1 if the length value is invalid)."""
+    try:
+        return decode_length(mtype, length, subtype).value // 8
+    except (ValueError, IndexError):
+        return -1
+
+
 def iscc_validate_mf(iscc, strict=True):
     # type: (str, bool) -> bool
     """
@@ -641,6 +912,9 @@ def iscc_validate_mf(iscc, strict=True):
         return False
 
 
+_MULTIBASE_CHARS = frozenset(mb.value for mb in MULTIBASE)
+
+
 def iscc_clean(iscc):
     # type: (str) -> str
     """
@@ -656,7 +930,7 @@ def iscc_clean(iscc):
     if len(split) == 1:
         code = split[0]
         # remove dashes if not multiformat
-        if code[0] not in list(MULTIBASE):
+        if code[0] not in _MULTIBASE_CHARS:
             code = code.replace("-", "")
         return code
     elif len(split) == 2:
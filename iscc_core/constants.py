@@ -194,6 +194,32 @@ class LN(enum.IntEnum):
     L320 = 320
 
 
+class VR(enum.IntEnum):
+    """
+    ## VR - Validation Result
+
+    Reason codes for ISCC validation.
+
+    | Uint | Symbol   | Purpose                                                            |
+    |----- |:---------|--------------------------------------------------------------------|
+    | 0    | VALID    | Strictly well-formed ISCC                                          |
+    | 1    | FORMAT   | String does not match ^ISCC:[A-Z2-7]{10,68}$                       |
+    | 2    | BASE32   | Invalid base32 encoding                                            |
+    | 3    | PREFIX   | Header starts with invalid sequence                                |
+    | 4    | HEADER   | Header can not be decoded                                          |
+    | 5    | VERSION  | Invalid Version for MainType                                       |
+    | 6    | LENGTH   | Body length does not match length declared in header               |
+    """
+
+    VALID = 0
+    FORMAT = 1
+    BASE32 = 2
+    PREFIX = 3
+    HEADER = 4
+    VERSION = 5
+    LENGTH = 6
+
+
 class MULTIBASE(str, enum.Enum):
     """
     Supported Multibase encodings.
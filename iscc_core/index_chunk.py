@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""*Inverted index of Data-Code chunk features for partial file matching.*
+
+The Data-Code is a MinHash over the xxh32 features of content defined chunks. It estimates the
+similarity of whole files but cannot tell whether one file is embedded in or truncated from
+another. This index keeps postings of (file, offset) per chunk feature (see
+`gen_data_code(..., granular=True)`) and answers which files share how many bytes with a query.
+
+Content defined chunking resynchronizes shortly after an insertion or a cut. Embedded and
+truncated copies therefore share all but a few chunks at their boundaries.
+
+Features with more than `max_postings` postings (e.g. chunks of zero bytes or file format
+boilerplate) carry little information but make queries slow. They are pruned as stop-features
+and ignored from then on.
+"""
+
+from array import array
+from collections import Counter
+from itertools import accumulate
+from typing import Dict, Hashable, List, Set, Tuple
+
+__all__ = [
+    "ChunkIndex",
+]
+
+
+class ChunkIndex:
+    """In-memory inverted index from chunk features to (file, offset) postings."""
+
+    def __init__(self, max_postings=1000):
+        # type: (int) -> None
+        """
+        Create an empty index.
+
+        :param int max_postings: Number of postings above which a feature becomes a stop-feature
+        """
+        self.max_postings = max_postings
+        self.stop_features = set()  # type: Set[int]
+        self._postings = {}  # type: Dict[int, List[Tuple[Hashable, int]]]
+        self._files = {}  # type: Dict[Hashable, Tuple[array, array]]
+
+    def __len__(self):
+        return len(self._files)
+
+    def __contains__(self, key):
+        return key in self._files
+
+    def add(self, granular, key):
+        # type: (dict, Hashable) -> None
+        """
+        Add the chunk features of a file to the index.
+
+        :param dict granular: Result of `gen_data_code(..., granular=True)` or
+            `DataHasher.granular()` with chunk `sizes` and `features`
+        :param key: Unique key of the file (e.g. an ISCC-ID or database id)
+        """
+        features, sizes = self._chunks(granular)
+        if key in self._files:
+            self.remove(key)
+        self._files[key] = (features, sizes)
+        for feature, offset, size in zip(features, self._offsets(sizes), sizes):
+            if not size or feature in self.stop_features:
+                continue
+            postings = self._postings.setdefault(feature, [])
+            postings.append((key, offset))
+            if len(postings) > self.max_postings:
+                del self._postings[feature]
+                self.stop_features.add(feature)
+
+    def remove(self, key):
+        # type: (Hashable) -> None
+        """
+        Remove a file from the index.
+
+        Stop-features stay pruned.
+
+        :param key: Key of the file
+        :raise KeyError: If the key is not in the index
+        """
+        features, _ = self._files.pop(key)
+        for feature in set(features):
+            postings = self._postings.get(feature)
+            if postings is None:
+                continue
+            postings[:] = [posting for posting in postings if posting[0] != key]
+            if not postings:
+                del self._postings[feature]
+
+    def query(self, granular, min_share=0.0, limit=10):
+        # type: (dict, float, int) -> List[dict]
+        """
+        Find files that share chunks with the query.
+
+        Each result has the file `key`, the number of `shared` bytes, the `containment` (share
+        of query bytes found in the file) and the `coverage` (share of file bytes found in the
+        query). A truncated copy of a file has a containment near 1.0. A file embedded in the
+        query has a coverage near 1.0.
+
+        :param dict granular: Chunk `sizes` and `features` of the query
+        :param float min_share: Minimum of the larger of containment and coverage
+        :param int limit: Maximum number of results
+        :return: Results sorted by descending number of shared bytes
+        :rtype: List[dict]
+        """
+        features, sizes = self._chunks(granular)
+        total = sum(sizes)
+        counts = Counter()  # type: Counter
+        chunk_sizes = {}  # type: Dict[int, int]
+        for feature, size in zip(features, sizes):
+            if size and feature in self._postings:
+                counts[feature] += 1
+                chunk_sizes[feature] = size
+        shared = Counter()  # type: Counter
+        for feature, count in counts.items():
+            in_files = Counter(key for key, _ in self._postings[feature])
+            for key, n in in_files.items():
+                shared[key] += min(n, count) * chunk_sizes[feature]
+        results = []
+        for key, nbytes in shared.items():
+            file_size = sum(self._files[key][1])
+            containment, coverage = nbytes / total, nbytes / file_size
+            if max(containment, coverage) >= min_share:
+                results.append(
+                    dict(key=key, shared=nbytes, containment=containment, coverage=coverage)
+                )
+        results.sort(key=lambda result: -result["shared"])
+        return results[:limit]
+
+    def locate(self, granular, key):
+        # type: (dict, Hashable) -> List[Tuple[int, int, int]]
+        """
+        Find the byte ranges that the query shares with an indexed file.
+
+        Consecutive matching chunks are merged into runs. Stop-features are not matched.
+
+        :param dict granular: Chunk `sizes` and `features` of the query
+        :param key: Key of the indexed file
+        :return: List of (query offset, file offset, length) runs in query order
+        :raise KeyError: If the key is not in the index
+        """
+        features, sizes = self._files[key]
+        positions = {}  # type: Dict[int, List[int]]
+        for feature, offset, size in zip(features, self._offsets(sizes), sizes):
+            if size and feature not in self.stop_features:
+                positions.setdefault(feature, []).append(offset)
+        runs = []  # type: List[List[int]]
+        features, sizes = self._chunks(granular)
+        for feature, offset, size in zip(features, self._offsets(sizes), sizes):
+            found = positions.get(feature)
+            if not found or not size:
+                continue
+            if runs and runs[-1][0] + runs[-1][2] == offset:
+                expected = runs[-1][1] + runs[-1][2]
+                if expected in found:
+                    runs[-1][2] += size
+                    continue
+            runs.append([offset, found[0], size])
+        return [tuple(run) for run in runs]
+
+    @staticmethod
+    def _chunks(granular):
+        # type: (dict) -> Tuple[array, array]
+        """Compact chunk features and sizes of granular Data-Code results."""
+        features, sizes = granular["features"], granular["sizes"]
+        if len(features) != len(sizes):
+            raise ValueError("Number of chunk features and sizes don´t match")
+        return array("I", features), array("I", sizes)
+
+    @staticmethod
+    def _offsets(sizes):
+        # type: (array) -> List[int]
+        """Byte offsets of chunks from their sizes."""
+        return list(accumulate(sizes, initial=0))[:-1]
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""*Time-sorted store of ISCC-IDv1s for time range queries.*
+
+The 64-bit body of an ISCC-IDv1 is its microsecond timestamp shifted left by 12 bits and
+combined with the HUB-ID. Sorting the bodies therefore sorts the ISCC-IDs by time. The store
+keeps the bodies of one realm in a single sorted `array("Q")` (8 bytes per ISCC-ID) and answers
+time range queries with two binary searches.
+
+ISCC-IDs are issued in time order, so batches of new ISCC-IDs are usually appended at the end.
+Late batches are merged with the stored ISCC-IDs that are newer than their oldest ISCC-ID.
+"""
+
+from array import array
+from bisect import bisect_left
+from itertools import compress, repeat
+from typing import Iterable, List, Optional, Union
+import iscc_core as ic
+
+__all__ = [
+    "IsccIdIndex",
+]
+
+IsccIds = Union[array, Iterable[int], Iterable[str]]
+
+MAX_INSERTS = 64  # Maximum number of late ISCC-IDs inserted one by one instead of merged
+
+
+class IsccIdIndex:
+    """In-memory sorted set of ISCC-IDv1 bodies of one realm."""
+
+    def __init__(self, iscc_ids=(), realm_id=0):
+        # type: (IsccIds, int) -> None
+        """
+        Create a store.
+
+        :param iscc_ids: Initial ISCC-IDv1 strings or 64-bit bodies
+        :param int realm_id: Realm ID of the stored ISCC-IDs (0 for testnet, 1 for mainnet)
+        """
+        if realm_id not in (0, 1):
+            raise ValueError("Realm-ID must be 0 (test) or 1 (operational)")
+        self.realm_id = realm_id
+        self._bodies = array("Q")
+        self.add_many(iscc_ids)
+
+    def __len__(self):
+        return len(self._bodies)
+
+    def __contains__(self, iscc_id):
+        body = iscc_id if isinstance(iscc_id, int) else self._bodies_of([iscc_id])[0]
+        pos = bisect_left(self._bodies, body)
+        return pos < len(self._bodies) and self._bodies[pos] == body
+
+    @property
+    def bodies(self):
+        # type: () -> array
+        """Sorted 64-bit bodies of all stored ISCC-IDs (read only)."""
+        return self._bodies
+
+    def add(self, iscc_id):
+        # type: (Union[str, int]) -> None
+        """
+        Add an ISCC-ID (ignored if already stored).
+
+        :param iscc_id: ISCC-IDv1 string or 64-bit body
+        """
+        self.add_many([iscc_id])
+
+    def add_many(self, iscc_ids):
+        # type: (IsccIds) -> None
+        """
+        Add many ISCC-IDs (already stored ISCC-IDs are ignored).
+
+        :param iscc_ids: ISCC-IDv1 strings or 64-bit bodies
+        """
+        batch = self._bodies_of(iscc_ids)
+        if not batch:
+            return
+        if any(map(int.__ge__, batch, batch[1:])):
+            batch = array("Q", sorted(set(batch)))
+        bodies = self._bodies
+        pos = bisect_left(bodies, batch[0])
+        if pos == len(bodies):
+            bodies.extend(batch)
+            return
+        batch = array("Q", (body for body in batch if body not in self))
+        if len(batch) <= MAX_INSERTS:
+            for body in batch:
+                bodies.insert(bisect_left(bodies, body), body)
+        else:
+            merged = array("Q", sorted(bodies[pos:] + batch))
+            del bodies[pos:]
+            bodies.extend(merged)
+
+    def query(self, start=None, end=None, hub_id=None, packed=False):
+        # type: (Optional[int], Optional[int], Optional[int], bool) -> Union[List[str], array]
+        """
+        Find the ISCC-IDs minted in a time range.
+
+        Without `hub_id` the cost only depends on the size of the result. With `hub_id` all
+        ISCC-IDs in the time range are filtered.
+
+        :param int start: Minimum timestamp in microseconds (inclusive, default: unbounded)
+        :param int end: Maximum timestamp in microseconds (exclusive, default: unbounded)
+        :param int hub_id: Only ISCC-IDs issued by this HUB-ID (default: all HUB-IDs)
+        :param bool packed: Return 64-bit bodies as `array("Q")` instead of ISCC-ID strings
+        :return: ISCC-IDs in time order
+        :rtype: Union[List[str], array]
+        """
+        bodies = self._bodies[slice(*self._positions(start, end))]
+        if hub_id is not None:
+            hubs = map((2**12 - 1).__and__, bodies)
+            bodies = array("Q", compress(bodies, map(hub_id.__eq__, hubs)))
+        return bodies if packed else ic.iscc_id_v1_from_bodies(bodies, self.realm_id)
+
+    def count(self, start=None, end=None):
+        # type: (Optional[int], Optional[int]) -> int
+        """
+        Number of ISCC-IDs minted in a time range (see `query`).
+
+        :param int start: Minimum timestamp in microseconds (inclusive, default: unbounded)
+        :param int end: Maximum timestamp in microseconds (exclusive, default: unbounded)
+        :return: Number of ISCC-IDs
+        :rtype: int
+        """
+        lo, hi = self._positions(start, end)
+        return max(hi - lo, 0)
+
+    def _positions(self, start, end):
+        # type: (Optional[int], Optional[int]) -> tuple
+        """Slice positions of the sorted bodies for a timestamp range."""
+        bodies = self._bodies
+        lo = 0 if start is None else bisect_left(bodies, max(start, 0) << 12)
+        hi = len(bodies) if end is None else bisect_left(bodies, max(end, 0) << 12)
+        return lo, hi
+
+    def _bodies_of(self, iscc_ids):
+        # type: (IsccIds) -> array
+        """64-bit bodies of ISCC-IDv1 strings or integers."""
+        if isinstance(iscc_ids, array):
+            return array("Q", iscc_ids)
+        iscc_ids = list(iscc_ids)
+        if iscc_ids and isinstance(iscc_ids[0], str):
+            return ic.iscc_id_v1_bodies(iscc_ids, self.realm_id)
+        return array("Q", iscc_ids)
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""*Exact-match index for Instance-Codes and datahashes.*
+
+Instance-Code bodies are prefixes of BLAKE3 digests and therefore uniformly distributed. The
+index uses the first 8 bytes of a body as hash and stores bodies in an open addressing table
+(linear probing) of packed columns. A blocked Bloom filter in front of the table answers
+most misses with a single word lookup without touching the table.
+
+Bodies longer than the configured size of the index are truncated, so an index of 64-bit
+bodies also matches 128- or 256-bit Instance-Codes and full datahashes by prefix.
+
+Serialized layout (all integers little-endian):
+
+| Part         | Size            | Content                                                   |
+|:-------------|:----------------|:----------------------------------------------------------|
+| Header       | 40 bytes        | magic, version, body size, bloom bits, count, capacity    |
+| Bloom filter | words * 8       | blocked Bloom filter words                                |
+| Occupancy    | capacity / 8    | one bit per used slot                                     |
+| Prefixes     | capacity * 8    | first 8 body bytes per slot (big-endian integer)          |
+| Tails        | capacity * rest | remaining body bytes per slot                             |
+| Values       | capacity * 8    | unsigned 64-bit value per slot                            |
+"""
+
+import math
+import random
+import struct
+import sys
+from array import array
+from functools import lru_cache
+from typing import Iterable, List, Optional, Union
+from bitarray import bitarray
+import iscc_core as ic
+from iscc_core.iscc_array import IsccArray
+from iscc_core.iscc_file import IsccFile
+
+__all__ = [
+    "InstanceIndex",
+]
+
+MAGIC = b"ISCCINST"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHHHHQQQ")  # magic, version, size, bloom bits, reserved, counts
+MAX_LOAD = 0.5  # Maximum ratio of used slots before the table is grown
+BLOOM_HASHES = 6  # Number of bits set per entry in the blocked Bloom filter
+
+
+class InstanceIndex:
+    """In-memory exact-match index of Instance-Code bodies with unsigned 64-bit values."""
+
+    def __init__(self, bits=64, capacity=0, bloom_bits=10):
+        # type: (int, int, int) -> None
+        """
+        Create an empty index.
+
+        :param int bits: Number of body bits stored and compared (64 - 256)
+        :param int capacity: Number of entries to reserve space for
+        :param int bloom_bits: Bloom filter bits per entry (0 disables the Bloom filter)
+        """
+        if bits % 64 or not 64 <= bits <= 256:
+            raise ValueError(f"Instance index bits must be 64, 128, 192 or 256 not {bits}")
+        self.bits = bits
+        self.bloom_bits = bloom_bits
+        self._size = bits // 8
+        self._allocate(capacity)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, code):
+        return self.get(code) is not None
+
+    def add(self, code, value):
+        # type: (Union[ic.IsccAny, bytes], int) -> None
+        """
+        Add an Instance-Code (or replace its value).
+
+        :param code: Instance-Code, datahash or raw body (digest bytes without ISCC header)
+        :param int value: Unsigned 64-bit value (e.g. a row number or ISCC-ID body)
+        """
+        self._insert(self._body(code), value)
+
+    def add_many(self, codes, values):
+        # type: (Union[IsccArray, Iterable[ic.IsccAny]], Iterable[int]) -> None
+        """
+        Add many Instance-Codes with pre-sized table and Bloom filter.
+
+        :param codes: IsccArray or iterable of Instance-Codes, datahashes or raw bodies
+        :param values: Unsigned 64-bit value per code
+        """
+        bodies = self._bodies(codes)
+        self._reserve(self._count + len(bodies))
+        for body, value in zip(bodies, values):
+            self._insert(body, value)
+
+    def get(self, code, default=None):
+        # type: (Union[ic.IsccAny, bytes], Optional[int]) -> Optional[int]
+        """
+        Value of an Instance-Code.
+
+        :param code: Instance-Code, datahash or raw body
+        :param default: Value returned if the code is not in the index
+        :return: Stored value or `default`
+        """
+        if type(code) is bytes and len(code) >= self._size:
+            slot = self._find(code[: self._size])
+        else:
+            slot = self._find(self._body(code))
+        return default if slot is None else self._values[slot]
+
+    def get_many(self, codes):
+        # type: (Union[IsccArray, Iterable[ic.IsccAny]]) -> List[Optional[int]]
+        """
+        Values of many Instance-Codes (None for codes not in the index).
+
+        :param codes: IsccArray or iterable of Instance-Codes, datahashes or raw bodies
+        :return: Stored value or None per code
+        """
+        values, find = self._values, self._find
+        return [None if slot is None else values[slot] for slot in map(find, self._bodies(codes))]
+
+    @classmethod
+    def from_iscc_file(cls, path, bits=64, bloom_bits=10):
+        # type: (str, int, int) -> InstanceIndex
+        """
+        Bulk load the Instance-Codes of a binary ISCC file.
+
+        Instance-Codes are collected from ISCC-UNITs and ISCC-CODEs. Values are the row
+        numbers of the ISCCs in the order of `IsccFile.array()`.
+
+        :param str path: Path of an ISCC file written with `IsccFileWriter`
+        :param int bits: Number of body bits stored and compared
+        :param int bloom_bits: Bloom filter bits per entry
+        :return: Loaded index
+        :rtype: InstanceIndex
+        """
+        with IsccFile(path) as iscc_file:
+            units = iscc_file.array().decompose()
+        rows, instances = units.get(ic.MT.INSTANCE, (array("Q"), IsccArray()))
+        index = cls(bits, bloom_bits=bloom_bits)
+        size = index._size
+        keep = [n for n, body_size in enumerate(instances.sizes) if body_size >= size]
+        index.add_many(instances.take(keep), map(rows.__getitem__, keep))
+        return index
+
+    def save(self, path):
+        # type: (str) -> None
+        """
+        Serialize the index to a file.
+
+        :param str path: File path
+        """
+        columns = [array("Q", col) for col in (self._filter, self._prefixes, self._values)]
+        if sys.byteorder == "big":  # pragma: no cover
+            for col in columns:
+                col.byteswap()
+        fields = (MAGIC, FORMAT_VERSION, self._size, self.bloom_bits, 0)
+        fields += (self._count, self._capacity, len(self._filter))
+        with open(path, "wb") as outfile:
+            outfile.write(HEADER.pack(*fields))
+            outfile.write(columns[0].tobytes())
+            outfile.write(self._used.tobytes())
+            outfile.write(columns[1].tobytes())
+            outfile.write(self._tails)
+            outfile.write(columns[2].tobytes())
+
+    @classmethod
+    def load(cls, path):
+        # type: (str) -> InstanceIndex
+        """
+        Load an index serialized with `save`.
+
+        :param str path: File path
+        :return: Loaded index
+        :rtype: InstanceIndex
+        """
+        with open(path, "rb") as infile:
+            data = infile.read()
+        magic, version, size, bloom_bits, _, count, capacity, words = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"Not an Instance-Code index file: {path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported Instance-Code index version {version}")
+        index = cls(size * 8, bloom_bits=bloom_bits)
+        lengths = (words * 8, capacity // 8, capacity * 8, capacity * (size - 8), capacity * 8)
+        parts, offset = [], HEADER.size
+        for length in lengths:
+            parts.append(data[offset : offset + length])
+            offset += length
+        index._filter, index._prefixes, index._values = (array("Q", parts[i]) for i in (0, 2, 4))
+        if sys.byteorder == "big":  # pragma: no cover
+            for col in (index._filter, index._prefixes, index._values):
+                col.byteswap()
+        index._used = bitarray(endian="little")
+        index._used.frombytes(parts[1])
+        index._tails = bytearray(parts[3])
+        index._count, index._capacity = count, capacity
+        return index
+
+    def _body(self, code):
+        # type: (Union[ic.IsccAny, bytes]) -> bytes
+        """Body prefix of an Instance-Code, datahash or raw body."""
+        if isinstance(code, str) and code.startswith("1e20"):
+            body = bytes.fromhex(code[4:])
+        elif isinstance(code, bytes):
+            body = code
+        else:
+            code = code if isinstance(code, ic.Code) else ic.Code(code)
+            if code.maintype != ic.MT.INSTANCE:
+                raise ValueError(f"Instance-Code expected not {code.maintype.name}-Code")
+            body = code.hash_bytes
+        if len(body) < self._size:
+            raise ValueError(f"Expected at least {self.bits} bits not {len(body) * 8}")
+        return body[: self._size]
+
+    def _bodies(self, codes):
+        # type: (Union[IsccArray, Iterable[ic.IsccAny]]) -> List[bytes]
+        """Body prefixes of many codes (column based for IsccArrays)."""
+        if not isinstance(codes, IsccArray):
+            return [self._body(code) for code in codes]
+        if len(codes) and set(codes.maintype) != {ic.MT.INSTANCE}:
+            raise ValueError("Instance-Codes expected")
+        if len(codes) and min(codes.sizes) < self._size:
+            raise ValueError(f"Expected at least {self.bits} bits")
+        body, width, size = bytes(codes.body), codes.width, self._size
+        return [body[i : i + size] for i in range(0, len(body), width)] if width else []
+
+    def _allocate(self, entries):
+        # type: (int) -> None
+        """Create empty table and Bloom filter for a number of entries."""
+        self._capacity = 1 << max(math.ceil(math.log2(max(entries, 1) / MAX_LOAD)), 3)
+        self._prefixes = array("Q", bytes(self._capacity * 8))
+        self._tails = bytearray(self._capacity * (self._size - 8))
+        self._values = array("Q", bytes(self._capacity * 8))
+        self._used = bitarray(self._capacity, endian="little")
+        self._used.setall(0)
+        words = max(entries, 1) * self.bloom_bits / 64
+        self._filter = array("Q", bytes(8 << max(math.ceil(math.log2(words)), 0)) if words else b"")
+        self._count = 0
+
+    def _reserve(self, entries):
+        # type: (int) -> None
+        """Grow table and Bloom filter to hold `entries` and reinsert all entries."""
+        if entries <= self._capacity * MAX_LOAD:
+            return
+        old = [
+            (self._body_at(slot), self._values[slot])
+            for slot in self._used.search(bitarray("1", endian="little"))
+        ]
+        self._allocate(max(entries, self._capacity))
+        for body, value in old:
+            self._insert(body, value)
+
+    def _body_at(self, slot):
+        # type: (int) -> bytes
+        """Body stored in a slot."""
+        tail = self._size - 8
+        return (
+            self._prefixes[slot].to_bytes(8, "big") + self._tails[slot * tail : (slot + 1) * tail]
+        )
+
+    def _insert(self, body, value):
+        # type: (bytes, int) -> None
+        slot = self._find(body, probe_only=True)
+        if self._used[slot]:
+            self._values[slot] = value
+            return
+        if self._count + 1 > self._capacity * MAX_LOAD:
+            self._reserve(self._count + 1)
+            slot = self._find(body, probe_only=True)
+        prefix, tail = int.from_bytes(body[:8], "big"), self._size - 8
+        self._prefixes[slot] = prefix
+        self._tails[slot * tail : (slot + 1) * tail] = body[8:]
+        self._values[slot] = value
+        self._used[slot] = 1
+        self._count += 1
+        if self.bloom_bits:
+            self._filter[prefix >> 32 & len(self._filter) - 1] |= _patterns()[prefix >> 20 & 0xFFF]
+
+    def _find(self, body, probe_only=False):
+        # type: (bytes, bool) -> Optional[int]
+        """
+        Slot of a body or None.
+
+        The Bloom filter is blocked: each body sets a pattern of bits (selected by bits 20-31
+        of the prefix) in a single 64-bit word (selected by the upper 32 bits of the prefix).
+        The table slot is selected by the lower bits of the prefix. With `probe_only` the
+        Bloom filter is skipped and the slot of the body or the empty slot where it belongs
+        is returned.
+        """
+        prefix = int.from_bytes(body[:8], "big")
+        if not probe_only and self.bloom_bits:
+            pattern = _patterns()[prefix >> 20 & 0xFFF]
+            if self._filter[prefix >> 32 & len(self._filter) - 1] & pattern != pattern:
+                return None
+        prefixes, used, mask = self._prefixes, self._used, self._capacity - 1
+        tail = self._size - 8
+        slot = prefix & mask
+        while True:
+            other = prefixes[slot]
+            if other == prefix and used[slot]:
+                if not tail or self._tails[slot * tail : (slot + 1) * tail] == body[8:]:
+                    return slot
+            elif not other and not used[slot]:
+                return slot if probe_only else None
+            slot = (slot + 1) & mask
+
+
+@lru_cache(maxsize=None)
+def _patterns():
+    # type: () -> array
+    """Bloom filter bit patterns with `BLOOM_HASHES` of 64 bits set (deterministic)."""
+    rgen = random.Random(BLOOM_HASHES)
+    return array(
+        "Q", (sum(1 << bit for bit in rgen.sample(range(64), BLOOM_HASHES)) for _ in range(4096))
+    )
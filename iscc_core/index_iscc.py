@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""*Search index for ISCC-CODEs with per-unit indexes and fused scoring.*
+
+Indexed ISCCs are decomposed into their ISCC-UNITs once. Similarity preserving units (Meta,
+Content, Data ...) are stored in one `MihIndex` per unit type (MainType, SubType, Version) and
+Instance-Codes in an exact-match table. Both are keyed by the first 64 bits of the unit bodies,
+so units of different length (e.g. the 64-bit units of an ISCC-CODE and a 256-bit Data-Code)
+meet in the same index. A query decomposes the query ISCC, collects candidates from all unit
+indexes within the configured distance thresholds (over the 64-bit prefix) and ranks them by a
+weighted average of the per-unit similarities over the common prefix of the bodies.
+"""
+
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+import iscc_core as ic
+from iscc_core.index_mih import MihIndex
+from iscc_core.models import _popcount
+
+__all__ = [
+    "IsccIndex",
+]
+
+PREFIX_BITS = 64  # Number of leading body bits by which units are indexed
+
+
+class IsccIndex:
+    """In-memory search index for ISCC-CODEs and ISCC-UNITs."""
+
+    def __init__(self, weights=None, thresholds=None, instance_shortcut=True):
+        # type: (Optional[Dict[int, float]], Optional[Dict[int, float]], bool) -> None
+        """
+        Create an empty index.
+
+        :param weights: Weights of unit similarities by MainType for fused scoring
+            (default 1.0 for all units)
+        :param thresholds: Maximum normalized hamming distance by MainType for a unit to
+            produce a candidate (default 0.2 for all units)
+        :param bool instance_shortcut: Only return exact Instance-Code matches if there are any
+        """
+        self.weights = dict(weights or {})  # type: Dict[int, float]
+        self.thresholds = dict(thresholds or {})  # type: Dict[int, float]
+        self.instance_shortcut = instance_shortcut
+        self._indexes = {}  # type: Dict[Tuple[int, ...], MihIndex]
+        self._instances = {}  # type: Dict[Tuple[int, ...], Set[Hashable]]
+        self._entries = {}  # type: Dict[Hashable, List[ic.Code]]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def add(self, iscc, key):
+        # type: (ic.IsccAny, Hashable) -> None
+        """
+        Add an ISCC-CODE or ISCC-UNIT to the index.
+
+        :param iscc: ISCC to be indexed
+        :param key: Unique key of the entry (e.g. an ISCC-ID or database id)
+        """
+        units = self._decompose(iscc)
+        if key in self._entries:
+            self.remove(key)
+        for unit in units:
+            if unit.maintype == ic.MT.INSTANCE:
+                self._instances.setdefault(self._prefix_key(unit), set()).add(key)
+                continue
+            unit_type = tuple(unit)[:3]
+            index = self._indexes.get(unit_type)
+            if index is None:
+                index = self._indexes[unit_type] = MihIndex(PREFIX_BITS)
+            index._add_body(self._prefix(unit), key)
+        self._entries[key] = units
+
+    def remove(self, key):
+        # type: (Hashable) -> None
+        """
+        Remove an entry from the index.
+
+        :param key: Key of the entry
+        :raise KeyError: If the key is not in the index
+        """
+        for unit in self._entries.pop(key):
+            if unit.maintype == ic.MT.INSTANCE:
+                prefix_key = self._prefix_key(unit)
+                keys = self._instances[prefix_key]
+                keys.discard(key)
+                if not keys:
+                    del self._instances[prefix_key]
+            else:
+                self._indexes[tuple(unit)[:3]].remove(key)
+
+    def query(self, iscc, limit=10, min_score=0.0):
+        # type: (ic.IsccAny, int, float) -> List[dict]
+        """
+        Find similar entries ranked by fused unit similarity.
+
+        Each result has the entry `key`, the fused `score` (0.0 - 1.0) and the unit level
+        results in the format of `iscc_compare` (`meta_dist`, `content_dist`, `data_dist`,
+        `instance_match` ...). Units of different length are compared over their common
+        prefix. Candidates are selected by the distance of the first 64 body bits.
+
+        :param iscc: Query ISCC-CODE or ISCC-UNIT
+        :param int limit: Maximum number of results
+        :param float min_score: Minimum fused score of results
+        :return: Results sorted by descending score
+        :rtype: List[dict]
+        """
+        units = self._decompose(iscc)
+        candidates = set()  # type: Set[Hashable]
+        for unit in units:
+            if unit.maintype == ic.MT.INSTANCE:
+                candidates.update(self._instances.get(self._prefix_key(unit), ()))
+        if not (candidates and self.instance_shortcut):
+            for unit in units:
+                index = self._indexes.get(tuple(unit)[:3])
+                if index is not None:
+                    radius = int(self.thresholds.get(unit.maintype, 0.2) * PREFIX_BITS)
+                    hits = index._query_body(self._prefix(unit), radius)
+                    candidates.update(key for key, _ in hits)
+        results = [self._score(units, key) for key in candidates]
+        results = [result for result in results if result["score"] >= min_score]
+        results.sort(key=lambda result: -result["score"])
+        return results[:limit]
+
+    def _score(self, units, key):
+        # type: (List[ic.Code], Hashable) -> dict
+        """Compare query units with the units of an entry and fuse their similarities."""
+        result = {"key": key}
+        fused = total = 0.0
+        for unit in units:
+            for other in self._entries[key]:
+                if tuple(unit)[:3] != tuple(other)[:3]:
+                    continue
+                size = min(len(unit.hash_bytes), len(other.hash_bytes))
+                a, b = unit.hash_bytes[:size], other.hash_bytes[:size]
+                if unit.maintype == ic.MT.INSTANCE:
+                    result["instance_match"] = a == b
+                    similarity = float(a == b)
+                else:
+                    distance = _popcount(int.from_bytes(a, "big") ^ int.from_bytes(b, "big"))
+                    result[unit.maintype.name.lower() + "_dist"] = distance
+                    similarity = 1 - distance / (size * 8)
+                weight = self.weights.get(unit.maintype, 1.0)
+                fused += similarity * weight
+                total += weight
+        result["score"] = fused / total if total else 0.0
+        return result
+
+    @staticmethod
+    def _prefix(unit):
+        # type: (ic.Code) -> int
+        """First 64 bits of a unit body as integer."""
+        return int.from_bytes(unit.hash_bytes[: PREFIX_BITS // 8], "big")
+
+    @staticmethod
+    def _prefix_key(unit):
+        # type: (ic.Code) -> Tuple[int, ...]
+        """Exact-match key of a unit (unit type and first 64 bits of its body)."""
+        return tuple(unit)[:3] + (IsccIndex._prefix(unit),)
+
+    @staticmethod
+    def _decompose(iscc):
+        # type: (ic.IsccAny) -> List[ic.Code]
+        """Decompose an ISCC into unit Code objects."""
+        if not isinstance(iscc, str):
+            iscc = ic.Code(iscc).code
+        units = [ic.Code(unit) for unit in ic.iscc_decompose(iscc)]
+        for unit in units:
+            if unit.maintype == ic.MT.ID:
+                raise ValueError("ISCC-IDs are not supported for similarity search")
+        return units
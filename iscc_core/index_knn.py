@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""*Exact k-nearest neighbor search over sorted ISCC-UNIT bodies.*
+
+The index sorts the packed bodies of a collection of codes and groups them into buckets by
+their leading `prefix_bits`. The hamming distance of a query prefix to a bucket prefix is a
+lower bound for the distance of all bodies in the bucket. A query visits buckets in order of
+increasing lower bound (by flipping increasing numbers of prefix bits) and stops as soon as the
+lower bound exceeds the distance of the current k-th best result kept in a heap.
+
+For bodies longer than 64 bits, the distances of the leading 64-bit words are calculated first
+and only bodies whose leading word distance does not exceed the current k-th best are
+compared in full.
+"""
+
+import heapq
+import operator
+from functools import lru_cache
+from itertools import chain, combinations, compress, groupby, repeat, starmap
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import iscc_core as ic
+from iscc_core.iscc_array import IsccArray
+from iscc_core.models import _popcount
+
+__all__ = [
+    "KnnIndex",
+]
+
+Distance = Union[int, float]
+
+
+class KnnIndex:
+    """Immutable index for exact k-NN queries with early termination."""
+
+    def __init__(self, codes, prefix_bits=None):
+        # type: (Union[IsccArray, Sequence[ic.IsccAny]], Optional[int]) -> None
+        """
+        Build an index over a collection of codes.
+
+        All codes must have the same MainType, SubType and Version. Their lengths may differ
+        for queries with NPH semantics (see `knn`).
+
+        :param codes: IsccArray or sequence of codes (rows are numbered in input order)
+        :param int prefix_bits: Number of leading bits per bucket (default: about 16 bodies
+            per bucket, at most 16)
+        """
+        codes = codes if isinstance(codes, IsccArray) else IsccArray(codes)
+        headers = set(zip(codes.maintype, codes.subtype, codes.version))
+        if len(headers) > 1:
+            raise ValueError(f"ISCC headers don´t match: {sorted(headers)}")
+        self.header = headers.pop() if headers else None
+        if self.header and self.header[0] == ic.MT.ID and self.header[2] == ic.VS.V1:
+            raise ValueError("Similarity comparison not supported for ISCC-IDv1")
+        self.width = codes.width
+        sizes = codes.sizes
+        if prefix_bits is None:
+            prefix_bits = max(len(codes).bit_length() - 4, 1)
+        self.prefix_bits = min(prefix_bits, 16, min(sizes, default=0) * 8)
+        bits = self.width * 8
+        ints = codes.ints()
+        order = sorted(range(len(ints)), key=ints.__getitem__)
+        self._rows = order
+        self._ints = [ints[row] for row in order]
+        self._sizes = [sizes[row] for row in order]
+        self._uniform = len(set(sizes)) <= 1
+        self._lead_shift = max(bits - 64, 0)
+        self._leads = [body >> self._lead_shift for body in self._ints]
+        self._buckets = {}  # type: Dict[int, Tuple[int, int]]
+        shift, start = bits - self.prefix_bits, 0
+        for prefix, group in groupby(self._ints, key=lambda body: body >> shift):
+            end = start + sum(1 for _ in group)
+            self._buckets[prefix] = (start, end)
+            start = end
+
+    def __len__(self):
+        return len(self._rows)
+
+    def knn(self, code, k=10, nph=False):
+        # type: (ic.IsccAny, int, bool) -> List[Tuple[int, Distance]]
+        """
+        Find the `k` nearest codes.
+
+        By default the query and all indexed codes must have the same length and distances
+        are hamming distances. With `nph=True` codes of different lengths are compared by
+        Normalized Prefix Hamming Distance over their common prefix (see
+        `iscc_nph_distance_bytes`).
+
+        :param code: Query code
+        :param int k: Number of nearest codes
+        :param bool nph: Use Normalized Prefix Hamming Distance
+        :return: List of (row, distance) tuples sorted by distance and row
+        """
+        return [(row, dist) for _, row, dist in self.knn_shards([self], code, k, nph)]
+
+    @staticmethod
+    def knn_shards(shards, code, k=10, nph=False):
+        # type: (Sequence[KnnIndex], ic.IsccAny, int, bool) -> List[Tuple[int, int, Distance]]
+        """
+        Find the `k` nearest codes over multiple indexes.
+
+        Shards are scanned with one shared heap, so the k-th best distance found in earlier
+        shards prunes the buckets of later shards.
+
+        :param shards: Indexes to search
+        :param code: Query code
+        :param int k: Number of nearest codes
+        :param bool nph: Use Normalized Prefix Hamming Distance
+        :return: List of (shard, row, distance) tuples sorted by distance, shard and row
+        """
+        code = code if isinstance(code, ic.Code) else ic.Code(code)
+        heap = []  # type: List[Tuple[Distance, int, int]]
+        if k > 0:
+            for shard, index in enumerate(shards):
+                index._search(code, k, nph, shard, heap)
+        return [(-s, -r, -d) for d, s, r in sorted(heap, reverse=True)]
+
+    def _search(self, code, k, nph, shard, heap):
+        # type: (ic.Code, int, bool, int, list) -> None
+        """Push the nearest codes of this index into a shared max-heap of size `k`."""
+        body = code.hash_bytes
+        if self.header is None:
+            return
+        if tuple(code)[:3] != self.header:
+            raise ValueError(f"ISCC headers don´t match: {tuple(code)[:3]} vs {self.header}")
+        if not nph and not (self._uniform and len(body) == self.width):
+            raise AssertionError(f"Hash diggest of unequal length: {len(body)} vs {self.width}")
+        query = int.from_bytes(body[: self.width].ljust(self.width, b"\x00"), "big")
+        qbits = len(body) * 8
+        scale = min(qbits, self.width * 8) if nph else 1
+        prefix = query >> (self.width * 8 - self.prefix_bits)
+        for weight, masks in enumerate(_flip_masks(self.prefix_bits)):
+            if len(heap) == k and weight / scale > -heap[0][0]:
+                break
+            buckets = filter(None, map(self._buckets.get, map(prefix.__xor__, masks)))
+            ids = list(chain.from_iterable(starmap(range, buckets)))
+            self._scan(query, qbits, ids, k, nph, shard, heap)
+
+    def _scan(self, query, qbits, ids, k, nph, shard, heap):
+        # type: (int, int, Sequence[int], int, bool, int, list) -> None
+        """Compare the query with the bodies at sorted positions `ids` and update the heap."""
+        if nph:
+            dists = map(self._nph_distance, repeat(query), repeat(qbits), ids)
+        else:
+            if len(heap) == k and self._lead_shift:
+                lead = query >> self._lead_shift
+                leads = map(_popcount, map(lead.__xor__, map(self._leads.__getitem__, ids)))
+                ids = list(compress(ids, map(operator.le, leads, repeat(-heap[0][0]))))
+            dists = map(_popcount, map(query.__xor__, map(self._ints.__getitem__, ids)))
+        items = zip(ids, dists)
+        if len(heap) == k:
+            dists = list(dists)
+            keep = map(operator.le, dists, repeat(-heap[0][0]))
+            items = compress(zip(ids, dists), keep)
+        rows = self._rows
+        for i, dist in items:
+            item = (-dist, -shard, -rows[i])
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+    def _nph_distance(self, query, qbits, i):
+        # type: (int, int, int) -> float
+        """Normalized prefix hamming distance of the query to the body at sorted position `i`."""
+        common = min(qbits, self._sizes[i] * 8)
+        return _popcount((query ^ self._ints[i]) >> (self.width * 8 - common)) / common
+
+
+@lru_cache(maxsize=None)
+def _flip_masks(bits):
+    # type: (int) -> List[List[int]]
+    """Prefix xor masks grouped by number of flipped bits."""
+    return [
+        [sum(1 << bit for bit in flips) for flips in combinations(range(bits), weight)]
+        for weight in range(bits + 1)
+    ]
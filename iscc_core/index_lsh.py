@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""*Locality sensitive hashing (LSH) index for MinHash based ISCC-UNITs.*
+
+Data-Code and Text-Code bodies are b-bit MinHash signatures: `alg_minhash_compress` stores
+the `lsb` least significant bits of 64 minhash values as bit-planes (all first bits, then all
+second bits ...). The index splits the 64 minhash positions into `bands` of `rows` positions
+and keeps one hash table per band. Two signatures become candidates if all rows of at least
+one band are equal, which happens with probability `1 - (1 - p ** rows) ** bands` where `p` is
+the probability of two minhash positions colliding. Candidates are verified by estimating
+their Jaccard similarity from the full signatures.
+
+Uncompressed 64-dimensional minhash vectors (see `alg_minhash`) are indexed with all 32 bits
+per minhash value.
+"""
+
+from typing import Dict, Hashable, List, Optional, Sequence, Set, Tuple, Union
+import iscc_core as ic
+from iscc_core.minhash import alg_minhash_compress
+from iscc_core.models import _popcount
+
+__all__ = [
+    "LshIndex",
+]
+
+DIMENSIONS = 64  # Number of minhash values per signature
+MASK = (1 << DIMENSIONS) - 1
+
+Signature = Union[ic.IsccAny, Sequence[int]]
+
+
+class LshIndex:
+    """In-memory banded LSH index for near-duplicate search with Jaccard estimates."""
+
+    def __init__(self, bands=16, rows=4):
+        # type: (int, int) -> None
+        """
+        Create an empty index.
+
+        All signatures of an index must have the same number of bits per minhash value. It is
+        bound by the first signature added to the index. Use `LshIndex.optimal` to choose
+        `bands` and `rows` for a target similarity threshold.
+
+        :param int bands: Number of bands (hash tables)
+        :param int rows: Number of minhash values per band
+        """
+        if bands < 1 or rows < 1 or bands * rows > DIMENSIONS:
+            raise ValueError(f"bands * rows must be between 1 and {DIMENSIONS}")
+        self.bands = bands
+        self.rows = rows
+        self.lsb = None  # type: Optional[int]
+        self._tables = [{} for _ in range(bands)]  # type: List[Dict[int, Set[Hashable]]]
+        self._signatures = {}  # type: Dict[Hashable, int]
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, key):
+        return key in self._signatures
+
+    @staticmethod
+    def probability(jaccard, bands, rows, lsb=32):
+        # type: (float, int, int, int) -> float
+        """
+        Probability that two signatures with a given Jaccard similarity become candidates.
+
+        :param float jaccard: Jaccard similarity of the underlying feature sets
+        :param int bands: Number of bands
+        :param int rows: Number of minhash values per band
+        :param int lsb: Number of bits per minhash value
+        :return: Candidate probability
+        :rtype: float
+        """
+        collision = jaccard + (1 - jaccard) / 2**lsb
+        return 1 - (1 - collision**rows) ** bands
+
+    @classmethod
+    def optimal(cls, threshold, lsb=32, fp_weight=0.5):
+        # type: (float, int, float) -> LshIndex
+        """
+        Create an index with bands and rows tuned for a Jaccard similarity threshold.
+
+        Minimizes the weighted sum of the false positive area (below `threshold`) and the
+        false negative area (above `threshold`) of the candidate probability curve.
+
+        :param float threshold: Target Jaccard similarity threshold
+        :param int lsb: Number of bits per minhash value of the indexed signatures
+        :param float fp_weight: Weight of false positives vs. false negatives (0.0 - 1.0)
+        :return: Empty index
+        :rtype: LshIndex
+        """
+        steps = 100
+
+        def area(lo, hi, bands, rows, positive):
+            width = (hi - lo) / steps
+            points = (lo + (i + 0.5) * width for i in range(steps))
+            probs = (cls.probability(j, bands, rows, lsb) for j in points)
+            return sum(p if positive else 1 - p for p in probs) * width
+
+        best = None
+        for bands in range(1, DIMENSIONS + 1):
+            for rows in range(1, DIMENSIONS // bands + 1):
+                fp = area(0.0, threshold, bands, rows, True)
+                fn = area(threshold, 1.0, bands, rows, False)
+                error = fp * fp_weight + fn * (1 - fp_weight)
+                if best is None or error < best[0]:
+                    best = (error, bands, rows)
+        return cls(best[1], best[2])
+
+    def add(self, signature, key):
+        # type: (Signature, Hashable) -> None
+        """
+        Add a signature to the index.
+
+        :param signature: Data-Code, Text-Code or 64-dimensional minhash vector
+        :param key: Unique key of the entry (e.g. an ISCC-ID or database id)
+        """
+        planes = self._planes(signature, bind=True)
+        if key in self._signatures:
+            self.remove(key)
+        self._signatures[key] = planes
+        for table, band in zip(self._tables, self._band_keys(planes)):
+            table.setdefault(band, set()).add(key)
+
+    def remove(self, key):
+        # type: (Hashable) -> None
+        """
+        Remove an entry from the index.
+
+        :param key: Key of the entry
+        :raise KeyError: If the key is not in the index
+        """
+        planes = self._signatures.pop(key)
+        for table, band in zip(self._tables, self._band_keys(planes)):
+            bucket = table[band]
+            bucket.discard(key)
+            if not bucket:
+                del table[band]
+
+    def candidates(self, signature):
+        # type: (Signature) -> Set[Hashable]
+        """
+        Keys of all entries that share at least one band with the signature.
+
+        :param signature: Data-Code, Text-Code or 64-dimensional minhash vector
+        :return: Candidate keys
+        """
+        planes = self._planes(signature)
+        found = set()  # type: Set[Hashable]
+        if self.lsb is None:
+            return found
+        for table, band in zip(self._tables, self._band_keys(planes)):
+            found.update(table.get(band, ()))
+        return found
+
+    def query(self, signature, threshold=0.0):
+        # type: (Signature, float) -> List[Tuple[Hashable, float]]
+        """
+        Find candidate near-duplicates with their estimated Jaccard similarity.
+
+        :param signature: Data-Code, Text-Code or 64-dimensional minhash vector
+        :param float threshold: Minimum estimated Jaccard similarity
+        :return: List of (key, jaccard) tuples sorted by descending similarity
+        """
+        planes = self._planes(signature)
+        results = []
+        for key in self.candidates(planes):
+            jaccard = self.jaccard(planes, self._signatures[key])
+            if jaccard >= threshold:
+                results.append((key, jaccard))
+        results.sort(key=lambda item: -item[1])
+        return results
+
+    def jaccard(self, a, b):
+        # type: (Signature, Signature) -> float
+        """
+        Estimate the Jaccard similarity of two signatures.
+
+        Corrects the fraction of equal minhash values for accidental collisions of b-bit
+        values (see: Li & König - b-Bit Minwise Hashing).
+
+        :param a: Data-Code, Text-Code, minhash vector or bit-planes
+        :param b: Data-Code, Text-Code, minhash vector or bit-planes
+        :return: Estimated Jaccard similarity (0.0 - 1.0)
+        :rtype: float
+        """
+        (a, a_lsb), (b, b_lsb) = self._decode(a), self._decode(b)
+        lsb = self.lsb or a_lsb or b_lsb
+        if lsb is None:
+            raise ValueError("Bits per minhash value of bit-planes integers are unknown")
+        for other in (a_lsb, b_lsb):
+            if other is not None and other != lsb:
+                raise ValueError(f"Expected {lsb} bits per minhash value not {other}")
+        xor = a ^ b
+        mismatch = 0
+        for _ in range(lsb):
+            mismatch |= xor & MASK
+            xor >>= DIMENSIONS
+        equal = 1 - _popcount(mismatch) / DIMENSIONS
+        chance = 1 / 2**lsb
+        return max(equal - chance, 0.0) / (1 - chance)
+
+    def _planes(self, signature, bind=False):
+        # type: (Union[Signature, int], bool) -> int
+        """Convert a signature to its bit-planes integer and check its width."""
+        planes, lsb = self._decode(signature)
+        if lsb is None:
+            return planes
+        if self.lsb is None and bind:
+            self.lsb = lsb
+        if self.lsb is not None and lsb != self.lsb:
+            raise ValueError(f"Expected {self.lsb} bits per minhash value not {lsb}")
+        return planes
+
+    @staticmethod
+    def _decode(signature):
+        # type: (Union[Signature, int]) -> Tuple[int, Optional[int]]
+        """Bit-planes integer and bits per minhash value (None for bit-planes integers)."""
+        if isinstance(signature, int):
+            return signature, None
+        if isinstance(signature, (list, tuple)) and len(signature) == DIMENSIONS:
+            body = alg_minhash_compress(signature, 32)
+        else:
+            code = signature if isinstance(signature, ic.Code) else ic.Code(signature)
+            is_text = code.maintype == ic.MT.CONTENT and code.subtype == ic.ST_CC.TEXT
+            if code.maintype != ic.MT.DATA and not is_text:
+                raise ValueError(f"MinHash based Data-Code or Text-Code expected not {code}")
+            body = code.hash_bytes
+        lsb, rest = divmod(len(body) * 8, DIMENSIONS)
+        if rest or not lsb:
+            raise ValueError(f"Signature must have a multiple of {DIMENSIONS} bits")
+        return int.from_bytes(body, "big"), lsb
+
+    def _band_keys(self, planes):
+        # type: (int) -> List[int]
+        """Hash table keys of all bands (concatenated row values of all bit-planes)."""
+        rows, mask = self.rows, (1 << self.rows) - 1
+        segments = []
+        for _ in range(self.lsb):
+            plane = planes & MASK
+            segments.append(
+                [(plane >> (DIMENSIONS - (i + 1) * rows)) & mask for i in range(self.bands)]
+            )
+            planes >>= DIMENSIONS
+        return [sum(seg << (rows * j) for j, seg in enumerate(band)) for band in zip(*segments)]
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""*Multi-index hashing (MIH) similarity index for similarity preserving ISCC-UNITs.*
+
+The index splits the body of each code into `m` disjoint substrings and keeps one exact-match
+hash table per substring position. By the pigeonhole principle two codes within hamming
+distance `r` must share at least one substring within hamming distance `r // m`. A radius
+query therefore probes each table with all substring values close to the substrings of the
+query and verifies the candidates by popcount of the full bodies.
+
+See: Norouzi, Punjani & Fleet - Fast Exact Search in Hamming Space with Multi-Index Hashing
+"""
+
+import sys
+from itertools import combinations
+from math import comb
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+import iscc_core as ic
+from iscc_core.models import _popcount
+
+__all__ = [
+    "MihIndex",
+]
+
+
+class MihIndex:
+    """In-memory multi-index hashing index for exact hamming radius and k-NN queries."""
+
+    def __init__(self, bits=64, m=None):
+        # type: (int, Optional[int]) -> None
+        """
+        Create an empty index for codes with a body of `bits` length.
+
+        All codes of an index must have the same header (MainType, SubType, Version, Length).
+        The header is bound by the first code added to the index.
+
+        :param int bits: Body length of indexed codes in number of bits
+        :param int m: Number of substrings (default: substrings of 16 bits)
+        """
+        m = m or max(bits // 16, 1)
+        if bits % m:
+            raise ValueError(f"Body length {bits} is not divisible by {m} substrings")
+        self.bits = bits
+        self.m = m
+        self.header = None  # type: Optional[Tuple[int, ...]]
+        self._sub_bits = bits // m
+        self._sub_mask = (1 << self._sub_bits) - 1
+        self._tables = [{} for _ in range(m)]  # type: List[Dict[int, Set[int]]]
+        self._bodies = {}  # type: Dict[int, List[Hashable]]
+        self._keys = {}  # type: Dict[Hashable, int]
+        self._flips = [[0]]  # Substring xor masks by number of flipped bits
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def add(self, code, key):
+        # type: (ic.IsccAny, Hashable) -> None
+        """
+        Add a code to the index.
+
+        :param code: Code to be indexed
+        :param key: Unique key of the entry (e.g. an ISCC-ID or database id)
+        """
+        self._add_body(self._body(code, bind=True), key)
+
+    def remove(self, key):
+        # type: (Hashable) -> None
+        """
+        Remove an entry from the index.
+
+        :param key: Key of the entry
+        :raise KeyError: If the key is not in the index
+        """
+        body = self._keys.pop(key)
+        keys = self._bodies[body]
+        keys.remove(key)
+        if keys:
+            return
+        del self._bodies[body]
+        for table, sub in zip(self._tables, self._split(body)):
+            bucket = table[sub]
+            bucket.discard(body)
+            if not bucket:
+                del table[sub]
+
+    def query(self, code, radius):
+        # type: (ic.IsccAny, int) -> List[Tuple[Hashable, int]]
+        """
+        Find all entries within a hamming distance of `radius` bits.
+
+        :param code: Query code
+        :param int radius: Maximum hamming distance
+        :return: List of (key, distance) tuples sorted by distance
+        """
+        return self._query_body(self._body(code), radius)
+
+    def knn(self, code, k=10):
+        # type: (ic.IsccAny, int) -> List[Tuple[Hashable, int]]
+        """
+        Find the `k` nearest entries.
+
+        Searches with increasing radius and only probes substring values not already probed
+        in smaller radii. Stops as soon as `k` entries are verified within the current radius.
+
+        :param code: Query code
+        :param int k: Number of nearest entries
+        :return: List of (key, distance) tuples sorted by distance
+        """
+        body = self._body(code)
+        candidates = {}  # type: Dict[int, int]
+        probed = [-1] * self.m
+        for radius in range(self.bits + 1):
+            self._probe(body, self._sub_radii(radius), probed, candidates)
+            if len(candidates) == len(self._bodies):
+                break
+            found = sum(len(self._bodies[c]) for c, dist in candidates.items() if dist <= radius)
+            if found >= k:
+                break
+        return self._results(candidates, self.bits)[:k]
+
+    def memory(self):
+        # type: () -> dict
+        """
+        Approximate memory usage of the index in bytes (walks all entries).
+
+        :return: Bytes used by the substring tables, the entries and in total
+        :rtype: dict
+        """
+        size = sys.getsizeof
+        tables = sum(size(t) + sum(size(s) + size(b) for s, b in t.items()) for t in self._tables)
+        entries = size(self._bodies) + size(self._keys)
+        entries += sum(size(b) + size(keys) for b, keys in self._bodies.items())
+        return dict(tables=tables, entries=entries, total=tables + entries)
+
+    def _add_body(self, body, key):
+        # type: (int, Hashable) -> None
+        """Add an integer body without header checks."""
+        if key in self._keys:
+            self.remove(key)
+        self._keys[key] = body
+        keys = self._bodies.get(body)
+        if keys is not None:
+            keys.append(key)
+            return
+        self._bodies[body] = [key]
+        for table, sub in zip(self._tables, self._split(body)):
+            table.setdefault(sub, set()).add(body)
+
+    def _query_body(self, body, radius):
+        # type: (int, int) -> List[Tuple[Hashable, int]]
+        """Radius query for an integer body without header checks."""
+        candidates = {}  # type: Dict[int, int]
+        self._probe(body, self._sub_radii(radius), [-1] * self.m, candidates)
+        return self._results(candidates, radius)
+
+    def _body(self, code, bind=False):
+        # type: (ic.IsccAny, bool) -> int
+        """Check code compatibility and return its body as integer."""
+        code = code if isinstance(code, ic.Code) else ic.Code(code)
+        header = tuple(code)[:4]
+        if self.header is None and bind:
+            if code.maintype == ic.MT.ID and code.version == ic.VS.V1:
+                raise ValueError("Similarity comparison not supported for ISCC-IDv1")
+            self.header = header
+        if self.header is not None and header != self.header:
+            raise ValueError(f"ISCC headers don´t match: {self.header} vs {header}")
+        if len(code.hash_bytes) * 8 != self.bits:
+            raise ValueError(f"Expected body of {self.bits} bits not {len(code.hash_bytes) * 8}")
+        return code.hash_uint
+
+    def _split(self, body):
+        # type: (int) -> List[int]
+        """Split body into substrings (most significant first)."""
+        sub_bits, mask = self._sub_bits, self._sub_mask
+        return [(body >> (i * sub_bits)) & mask for i in range(self.m - 1, -1, -1)]
+
+    def _sub_radii(self, radius):
+        # type: (int) -> List[int]
+        """
+        Substring search radii that guarantee to find all codes within `radius`.
+
+        With r = radius // m and a = radius % m the first a + 1 substrings are searched with
+        radius r and the remaining substrings with radius r - 1.
+        """
+        radius = min(radius, self.bits)
+        r, a = divmod(radius, self.m)
+        return [min(r if i <= a else r - 1, self._sub_bits) for i in range(self.m)]
+
+    def _flip_masks(self, weight):
+        # type: (int) -> List[int]
+        """Substring xor masks with exactly `weight` bits set."""
+        while len(self._flips) <= weight:
+            ones = len(self._flips)
+            masks = [sum(1 << bit for bit in c) for c in combinations(range(self._sub_bits), ones)]
+            self._flips.append(masks)
+        return self._flips[weight]
+
+    def _probe_cost(self, radii, probed):
+        # type: (List[int], List[int]) -> int
+        """Number of table lookups needed to extend the probed substring radii to `radii`."""
+        bits = self._sub_bits
+        return sum(comb(bits, w) for p, r in zip(probed, radii) for w in range(p + 1, r + 1))
+
+    def _probe(self, body, radii, probed, candidates):
+        # type: (int, List[int], List[int], Dict[int, int]) -> None
+        """
+        Collect and verify candidates for substring radii not yet probed.
+
+        Falls back to a linear scan of all entries if that needs fewer lookups than probing.
+        """
+        if self._probe_cost(radii, probed) > len(self._bodies):
+            for other in self._bodies.keys() - candidates.keys():
+                candidates[other] = _popcount(body ^ other)
+            probed[:] = [self._sub_bits] * self.m
+            return
+        for i, (table, sub) in enumerate(zip(self._tables, self._split(body))):
+            for weight in range(probed[i] + 1, radii[i] + 1):
+                buckets = map(table.get, map(sub.__xor__, self._flip_masks(weight)))
+                for bucket in filter(None, buckets):
+                    for other in bucket:
+                        if other not in candidates:
+                            candidates[other] = _popcount(body ^ other)
+            probed[i] = max(probed[i], radii[i])
+
+    def _results(self, candidates, radius):
+        # type: (Dict[int, int], int) -> List[Tuple[Hashable, int]]
+        """Expand verified candidates within `radius` to (key, distance) tuples."""
+        hits = sorted((dist, body) for body, dist in candidates.items() if dist <= radius)
+        return [(key, dist) for dist, body in hits for key in self._bodies[body]]
@@ -0,0 +1,496 @@
+# -*- coding: utf-8 -*-
+"""*Persistent memory-mapped multi-index hashing (MIH) similarity index.*
+
+The index is a directory of immutable segment files and a `manifest.json` listing the active
+segments. New entries are collected in an in-memory `MihIndex` and written as a new segment
+on `flush`. Deletes are written as tombstones into the next segment and hide entries of all
+older segments. `compact` merges all segments into one and drops deleted entries. The
+manifest is replaced atomically, so any number of read-only processes can open the index
+while one writer process appends to and compacts it.
+
+Segment layout (all integers little-endian, parts start at 8-byte aligned offsets):
+
+| Part       | Size             | Content                                                   |
+|:-----------|:-----------------|:----------------------------------------------------------|
+| Header     | 48 bytes         | magic, version, m, body size, substring bits, ISCC header |
+| Bodies     | count * size     | raw code bodies ordered by key                            |
+| Keys       | count * 8        | sorted unsigned 64-bit keys                               |
+| Tables     | m * count * 2-12 | per substring: sorted substring values and their rows     |
+| Tombstones | deleted * 8      | keys deleted from older segments                          |
+
+Opening an index only parses headers and tombstones. Substring tables are searched with
+binary search on the memory-mapped columns.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+import iscc_core as ic
+from iscc_core.index_mih import MihIndex
+from iscc_core.models import _popcount
+
+__all__ = [
+    "MmapIndex",
+]
+
+MAGIC = b"ISCCMIH\x00"
+FORMAT_VERSION = 1
+SEGMENT = struct.Struct("<8sHHHHBBBBIQQQ")  # ..., header fields, reserved, generation, counts
+MANIFEST = "manifest.json"
+MAX_KEY = 2**64 - 1
+
+
+class MmapIndex:
+    """On-disk similarity index for ISCC-UNITs with append-only segments and tombstones."""
+
+    def __init__(self, path, bits=64, m=None, readonly=False):
+        # type: (str, int, Optional[int], bool) -> None
+        """
+        Open an index directory (creates a new index if it does not exist).
+
+        The `bits` and `m` parameters are only used for new indexes and are read from the
+        manifest of existing indexes.
+
+        :param str path: Index directory
+        :param int bits: Body length of indexed codes in number of bits
+        :param int m: Number of substrings (default: substrings of 16 bits)
+        :param bool readonly: Open the index for searching only
+        """
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.RLock()
+        self._compacting = threading.Lock()
+        manifest = self._read_manifest()
+        if manifest is None:
+            if readonly:
+                raise FileNotFoundError(f"No index found at {path}")
+            os.makedirs(path, exist_ok=True)
+            mem = MihIndex(bits, m)
+            manifest = dict(version=FORMAT_VERSION, bits=bits, m=mem.m, header=None)
+            manifest.update(next=1, segments=[])
+            self._write_manifest(manifest)
+        if manifest["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format version {manifest['version']}")
+        self.bits = manifest["bits"]
+        self.m = manifest["m"]
+        if self.bits // self.m > 64:
+            raise ValueError("Substrings of more than 64 bits are not supported")
+        self._mem = MihIndex(self.bits, self.m)
+        self._pending = set()  # Keys deleted since the last flush
+        self._segments = []  # type: List[_Segment]
+        self._tombs = {}  # type: Dict[int, float]
+        self._load(manifest)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            total = len(self._mem) + sum(seg.count for seg in self._segments)
+            for key, generation in self._tombs.items():
+                total -= sum(
+                    1 for seg in self._segments if seg.generation < generation and key in seg
+                )
+            return total
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._mem or self._find(key) is not None
+
+    def add(self, code, key):
+        # type: (ic.IsccAny, int) -> None
+        """
+        Add or replace an entry (visible to other processes after `flush`).
+
+        :param code: Code to be indexed
+        :param int key: Unsigned 64-bit integer key of the entry
+        """
+        if not isinstance(key, int) or not 0 <= key <= MAX_KEY:
+            raise ValueError(f"Keys must be unsigned 64-bit integers not {key!r}")
+        with self._lock:
+            self._check_writable()
+            self._mem.add(code, key)
+            if self._find(key) is not None:
+                self._delete(key)
+
+    def remove(self, key):
+        # type: (int) -> None
+        """
+        Remove an entry (visible to other processes after `flush`).
+
+        :param int key: Key of the entry
+        :raise KeyError: If the key is not in the index
+        """
+        with self._lock:
+            self._check_writable()
+            found = key in self._mem
+            if found:
+                self._mem.remove(key)
+            if self._find(key) is not None:
+                self._delete(key)
+                found = True
+            if not found:
+                raise KeyError(key)
+
+    def query(self, code, radius):
+        # type: (ic.IsccAny, int) -> List[Tuple[int, int]]
+        """
+        Find all entries within a hamming distance of `radius` bits.
+
+        :param code: Query code
+        :param int radius: Maximum hamming distance
+        :return: List of (key, distance) tuples sorted by distance
+        """
+        with self._lock:
+            search = _Search(self, code)
+            search.extend(radius)
+            return search.results(radius)
+
+    def knn(self, code, k=10):
+        # type: (ic.IsccAny, int) -> List[Tuple[int, int]]
+        """
+        Find the `k` nearest entries.
+
+        :param code: Query code
+        :param int k: Number of nearest entries
+        :return: List of (key, distance) tuples sorted by distance
+        """
+        with self._lock:
+            search = _Search(self, code)
+            for radius in range(self.bits + 1):
+                search.extend(radius)
+                if search.exhausted() or len(search.results(radius)) >= k:
+                    break
+            return search.results(self.bits)[:k]
+
+    def flush(self):
+        # type: () -> None
+        """Write added entries and tombstones as a new segment and publish it."""
+        with self._lock:
+            self._check_writable()
+            if not len(self._mem) and not self._pending:
+                return
+            manifest = self._read_manifest()
+            generation = manifest["next"]
+            name = f"{generation:08d}.seg"
+            entries = sorted(self._mem._keys.items())
+            header = self._mem.header or manifest["header"]
+            self._write_segment(name, generation, header, entries, sorted(self._pending))
+            manifest.update(header=header, next=generation + 1)
+            manifest["segments"].append(name)
+            self._write_manifest(manifest)
+            self._mem = MihIndex(self.bits, self.m)
+            self._pending.clear()
+            self._load(manifest)
+
+    def compact(self):
+        # type: () -> None
+        """
+        Merge all segments into one segment without deleted entries.
+
+        Searches and updates of other threads continue on the current segments while the
+        merged segment is written. Readers in other processes switch on `refresh`.
+        """
+        with self._compacting:
+            with self._lock:
+                self.flush()
+                manifest = self._read_manifest()
+                segments = list(self._segments)
+                tombs = dict(self._tombs)
+                name = f"{manifest['next']:08d}.seg"
+                manifest["next"] += 1
+                self._write_manifest(manifest)
+            if len(segments) < 2 and not any(len(seg.tombstones) for seg in segments):
+                return
+            entries = []
+            for seg in segments:
+                alive = (
+                    row for row, key in enumerate(seg.keys) if tombs.get(key, 0) <= seg.generation
+                )
+                entries.extend((seg.keys[row], seg.body(row)) for row in alive)
+            entries.sort()
+            generation = max(seg.generation for seg in segments)
+            self._write_segment(name, generation, manifest["header"], entries, [])
+            with self._lock:
+                merged = {seg.name for seg in segments}
+                manifest = self._read_manifest()
+                manifest["segments"] = [name] + [n for n in manifest["segments"] if n not in merged]
+                self._write_manifest(manifest)
+                self._load(manifest)
+                for old in merged:
+                    try:
+                        os.remove(os.path.join(self.path, old))
+                    except OSError:  # pragma: no cover
+                        pass  # Still mapped by another process on some platforms
+
+    def refresh(self):
+        # type: () -> None
+        """Reload the manifest to pick up segments published by the writer."""
+        with self._lock:
+            self._load(self._read_manifest())
+
+    def close(self):
+        # type: () -> None
+        """Flush pending updates (writers only) and close all segments."""
+        with self._lock:
+            if not self.readonly:
+                self.flush()
+            for seg in self._segments:
+                seg.close()
+            self._segments = []
+
+    def _check_writable(self):
+        if self.readonly:
+            raise PermissionError("Index is opened read-only")
+
+    def _delete(self, key):
+        # type: (int) -> None
+        """Hide entries with `key` in all segments."""
+        self._pending.add(key)
+        self._tombs[key] = float("inf")
+
+    def _find(self, key):
+        # type: (int) -> Optional[Tuple[_Segment, int]]
+        """Locate the live segment entry of a key."""
+        for seg in self._segments:
+            row = seg.find(key)
+            if row is not None and self._tombs.get(key, 0) <= seg.generation:
+                return seg, row
+        return None
+
+    def _load(self, manifest):
+        # type: (dict) -> None
+        """
+        Open new segments, close dropped segments and collect tombstones.
+
+        Segments of a manifest may be deleted by a `compact` of another process before they
+        are opened. The manifest is re-read in that case (compaction publishes the merged
+        segment before it deletes the old ones).
+        """
+        opened = {seg.name: seg for seg in self._segments}
+        while True:
+            segments, new = [], []
+            try:
+                for name in manifest["segments"]:
+                    seg = opened.get(name)
+                    if seg is None:
+                        seg = _Segment(self.path, name)
+                        new.append(seg)
+                    segments.append(seg)
+                break
+            except FileNotFoundError:
+                for seg in new:
+                    seg.close()
+                latest = self._read_manifest()
+                if latest is None or latest == manifest:
+                    raise
+                manifest = latest
+        if manifest["header"] is not None:
+            self._mem.header = tuple(manifest["header"])
+        self._segments = segments
+        for name, seg in opened.items():
+            if name not in manifest["segments"]:
+                seg.close()
+        self._tombs = {}
+        for seg in self._segments:
+            for key in seg.tombstones:
+                self._tombs[key] = max(self._tombs.get(key, 0), seg.generation)
+        for key in self._pending:
+            self._tombs[key] = float("inf")
+
+    def _read_manifest(self):
+        # type: () -> Optional[dict]
+        try:
+            with open(os.path.join(self.path, MANIFEST), "rt", encoding="utf-8") as infile:
+                return json.load(infile)
+        except FileNotFoundError:
+            return None
+
+    def _write_manifest(self, manifest):
+        # type: (dict) -> None
+        """Atomically replace the manifest."""
+        path = os.path.join(self.path, MANIFEST)
+        with open(path + ".tmp", "wt", encoding="utf-8") as outfile:
+            json.dump(manifest, outfile)
+        os.replace(path + ".tmp", path)
+
+    def _write_segment(self, name, generation, header, entries, tombstones):
+        # type: (str, int, Optional[List[int]], List[Tuple[int, int]], List[int]) -> None
+        """Write a segment file from (key, body) entries sorted by key."""
+        size = self.bits // 8
+        mt, st, vs, ln = header or (0, 0, 0, 0)
+        fields = (MAGIC, FORMAT_VERSION, self.m, size, self.bits // self.m, mt, st, vs, ln, 0)
+        fields += (generation, len(entries), len(tombstones))
+        keys = array("Q", (key for key, _ in entries))
+        bodies = [body for _, body in entries]
+        path = os.path.join(self.path, name)
+        with open(path + ".tmp", "wb") as outfile:
+            outfile.write(SEGMENT.pack(*fields))
+            outfile.write(b"".join(body.to_bytes(size, "big") for body in bodies))
+            _write_column(outfile, keys)
+            subs = [self._mem._split(body) for body in bodies]
+            for values in zip(*subs) if subs else [()] * self.m:
+                rows = sorted(range(len(values)), key=values.__getitem__)
+                _write_column(
+                    outfile, array(_value_type(self.bits // self.m), map(values.__getitem__, rows))
+                )
+                _write_column(outfile, array("I", rows))
+            _write_column(outfile, array("Q", tombstones))
+        os.replace(path + ".tmp", path)
+
+
+class _Segment:
+    """Read-only memory-mapped index segment."""
+
+    def __init__(self, path, name):
+        # type: (str, str) -> None
+        self.name = name
+        with open(os.path.join(path, name), "rb") as infile:
+            self._mmap = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        fields = SEGMENT.unpack_from(self._mmap)
+        magic, version, m, self.size, sub_bits = fields[:5]
+        self.generation, self.count, deleted = fields[-3:]
+        if magic != MAGIC:
+            raise ValueError(f"Not an ISCC index segment: {name}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported index segment version {version}")
+        view = memoryview(self._mmap)
+        offset = SEGMENT.size
+        self.bodies = view[offset : offset + self.count * self.size]
+        offset += _aligned(self.count * self.size)
+        self.keys, offset = _read_column(view, offset, self.count, "Q")
+        self.tables = []
+        for _ in range(m):
+            values, offset = _read_column(view, offset, self.count, _value_type(sub_bits))
+            rows, offset = _read_column(view, offset, self.count, "I")
+            self.tables.append((values, rows))
+        self.tombstones, offset = _read_column(view, offset, deleted, "Q")
+
+    def __contains__(self, key):
+        return self.find(key) is not None
+
+    def find(self, key):
+        # type: (int) -> Optional[int]
+        """Row of a key or None."""
+        row = bisect_left(self.keys, key)
+        if row < self.count and self.keys[row] == key:
+            return row
+        return None
+
+    def body(self, row):
+        # type: (int) -> int
+        """Body of a row as integer."""
+        return int.from_bytes(self.bodies[row * self.size : (row + 1) * self.size], "big")
+
+    def close(self):
+        # type: () -> None
+        self.bodies = self.keys = self.tombstones = None
+        self.tables = []
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # Views are still referenced and keep the map alive until collected
+
+
+class _Search:
+    """Incremental multi-index hashing search over the in-memory and mapped segments."""
+
+    def __init__(self, index, code):
+        # type: (MmapIndex, ic.IsccAny) -> None
+        self.index = index
+        self.mem = index._mem
+        self.body = self.mem._body(code)
+        self.subs = self.mem._split(self.body)
+        self.mem_probed = [-1] * index.m
+        self.mem_candidates = {}  # type: Dict[int, int]
+        self.probed = [[-1] * index.m for _ in index._segments]
+        self.candidates = [{} for _ in index._segments]  # type: List[Dict[int, int]]
+
+    def extend(self, radius):
+        # type: (int) -> None
+        """Verify all entries that may be within `radius`."""
+        radii = self.mem._sub_radii(radius)
+        self.mem._probe(self.body, radii, self.mem_probed, self.mem_candidates)
+        for seg, probed, candidates in zip(self.index._segments, self.probed, self.candidates):
+            if self.mem._probe_cost(radii, probed) > seg.count:
+                rows = range(seg.count)
+                probed[:] = [self.index.bits // self.index.m] * self.index.m
+            else:
+                rows = self._lookup(seg, radii, probed)
+            body = self.body
+            for row in rows:
+                if row not in candidates:
+                    candidates[row] = _popcount(body ^ seg.body(row))
+
+    def _lookup(self, seg, radii, probed):
+        # type: (_Segment, List[int], List[int]) -> Iterable[int]
+        """Rows of all substring neighbours not probed yet."""
+        for i, (values, rows) in enumerate(seg.tables):
+            for weight in range(probed[i] + 1, radii[i] + 1):
+                for mask in self.mem._flip_masks(weight):
+                    value = self.subs[i] ^ mask
+                    lo = bisect_left(values, value)
+                    yield from rows[lo : bisect_right(values, value, lo)]
+            probed[i] = max(probed[i], radii[i])
+
+    def exhausted(self):
+        # type: () -> bool
+        """All entries verified."""
+        seen = len(self.mem_candidates) + sum(map(len, self.candidates))
+        return seen == len(self.mem._bodies) + sum(seg.count for seg in self.index._segments)
+
+    def results(self, radius):
+        # type: (int) -> List[Tuple[int, int]]
+        """Live entries within `radius` as (key, distance) tuples sorted by distance."""
+        hits = self.mem._results(self.mem_candidates, radius)
+        tombs = self.index._tombs
+        for seg, candidates in zip(self.index._segments, self.candidates):
+            for row, dist in candidates.items():
+                key = seg.keys[row]
+                if dist <= radius and tombs.get(key, 0) <= seg.generation:
+                    hits.append((key, dist))
+        hits.sort(key=lambda hit: hit[1])
+        return hits
+
+
+def _value_type(sub_bits):
+    # type: (int) -> str
+    """Array type code for substring values."""
+    return "H" if sub_bits <= 16 else "I" if sub_bits <= 32 else "Q"
+
+
+def _aligned(size):
+    # type: (int) -> int
+    return size + (-size % 8)
+
+
+def _write_column(outfile, column):
+    # type: (..., array) -> None
+    """Write an array little-endian and pad to 8 bytes."""
+    if sys.byteorder == "big":  # pragma: no cover
+        column.byteswap()
+    data = column.tobytes()
+    outfile.seek(_aligned(outfile.tell()))
+    outfile.write(data)
+    outfile.write(b"\x00" * (-len(data) % 8))
+
+
+def _read_column(view, offset, count, typecode):
+    # type: (memoryview, int, int, str) -> Tuple[memoryview, int]
+    """Map a little-endian column and return it with the offset of the next column."""
+    offset = _aligned(offset)
+    size = count * array(typecode).itemsize
+    column = view[offset : offset + size].cast(typecode)
+    if sys.byteorder == "big":  # pragma: no cover
+        column = array(typecode, column)
+        column.byteswap()
+    return column, offset + _aligned(size)
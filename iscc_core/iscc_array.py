@@ -0,0 +1,530 @@
+# -*- coding: utf-8 -*-
+"""*Columnar container for large collections of ISCCs.*
+
+An `IsccArray` stores the header fields (MainType, SubType, Version, Length) and the bodies of
+many ISCCs in contiguous typed buffers instead of one Python object per code. Header fields
+are kept in one `array` column each. Bodies are kept as fixed-width records in a single bytes
+buffer. Bodies that are shorter than the widest body in the array are zero-padded on the
+right and their actual size is tracked in a separate column.
+"""
+
+import sys
+from array import array
+from itertools import compress, repeat
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import iscc_core as ic
+from iscc_core.codec import _HEADER_DECODE, _HEADER_ENCODE, _body_size, _strip_scheme
+
+__all__ = [
+    "IsccArray",
+]
+
+
+class IsccArray:
+    """
+    Columnar container for ISCC-UNITs and ISCC-CODEs.
+
+    Initialize from an iterable of ISCC strings (canonical base32 with or without `ISCC:`
+    prefix), raw ISCC bytes or `Code` objects, or from one buffer of concatenated raw ISCCs.
+    """
+
+    __slots__ = ("_mt", "_st", "_vs", "_ln", "_size", "_body", "_width")
+
+    def __init__(self, codes=()):
+        # type: (Union[Iterable[ic.IsccAny], ic.Data]) -> None
+        """
+        Initialize an IsccArray.
+
+        :param codes: Iterable of ISCCs or a buffer of concatenated raw ISCCs.
+        """
+        if isinstance(codes, (bytes, bytearray, memoryview)):
+            self._set_rows(_split_raw(codes))
+            return
+        codes = list(codes)
+        columns = _parse_uniform(codes)
+        if columns is not None:
+            self._mt, self._st, self._vs, self._ln, self._size, self._body, self._width = columns
+            return
+        self._set_rows(_parse_codes(codes))
+
+    @classmethod
+    def from_columns(cls, mtypes, stypes, versions, lengths, sizes, body, width):
+        # type: (array, array, array, array, array, ic.Data, int) -> IsccArray
+        """
+        Create an IsccArray from prepared columns without copying.
+
+        Columns may be `array` or `memoryview` objects (e.g. backed by a memory-mapped file).
+
+        :param mtypes: MainType per row
+        :param stypes: SubType per row
+        :param versions: Version per row
+        :param lengths: Header length value per row
+        :param sizes: Body size in number of bytes per row
+        :param Data body: Buffer of fixed-width (zero-padded) bodies
+        :param int width: Number of bytes per body record
+        :return: IsccArray backed by the given columns
+        :rtype: IsccArray
+        """
+        nrows = len(mtypes)
+        if not len(stypes) == len(versions) == len(lengths) == len(sizes) == nrows:
+            raise ValueError("All header columns must have the same number of rows")
+        if len(body) != nrows * width:
+            raise ValueError(f"Body buffer of {len(body)} bytes does not match {nrows} rows")
+        obj = cls.__new__(cls)
+        obj._mt, obj._st, obj._vs, obj._ln, obj._size = mtypes, stypes, versions, lengths, sizes
+        obj._body, obj._width = body, width
+        return obj
+
+    @classmethod
+    def uniform(cls, mtype, stype, version, length, body, size):
+        # type: (int, int, int, int, ic.Data, int) -> IsccArray
+        """
+        Create an IsccArray of rows that share the same header without copying the body.
+
+        Header columns are represented by constant columns that do not allocate memory per
+        row, so wrapping e.g. a memory-mapped body buffer is an O(1) operation.
+
+        :param int mtype: MainType of all rows
+        :param int stype: SubType of all rows
+        :param int version: Version of all rows
+        :param int length: Header length value of all rows
+        :param Data body: Buffer of concatenated bodies
+        :param int size: Body size in number of bytes of all rows
+        :return: IsccArray backed by the given body buffer
+        :rtype: IsccArray
+        """
+        if size < 1 or len(body) % size:
+            raise ValueError(f"Body buffer of {len(body)} bytes is not a multiple of {size}")
+        nrows = len(body) // size
+        cols = [_Constant(value, nrows) for value in (mtype, stype, version, length, size)]
+        return cls.from_columns(*cols, body, size)
+
+    @classmethod
+    def fromfile(cls, file):
+        # type: (Union[str, Iterable[str]]) -> IsccArray
+        """
+        Load an IsccArray from newline-delimited ISCC strings.
+
+        :param file: File path or text file object
+        :return: IsccArray with one row per non-empty line
+        :rtype: IsccArray
+        """
+        if isinstance(file, str):
+            with open(file, "rt", encoding="ascii") as infile:
+                return cls([line.strip() for line in infile if line.strip()])
+        return cls([line.strip() for line in file if line.strip()])
+
+    @classmethod
+    def concat(cls, arrays):
+        # type: (Iterable[IsccArray]) -> IsccArray
+        """Concatenate multiple IsccArrays into a single IsccArray."""
+        return cls._from_rows([row for arr in arrays for row in arr._rows()])
+
+    def __len__(self):
+        return len(self._mt)
+
+    def __repr__(self):
+        return f"<IsccArray rows={len(self)} width={self._width}>"
+
+    def __reduce__(self):
+        # Columns backed by memoryviews (slices, memory-mapped files) are pickled as copies
+        cols = (self._mt, self._st, self._vs, self._ln, self._size)
+        cols = [array(col.format, col) if isinstance(col, memoryview) else col for col in cols]
+        return IsccArray.from_columns, (*cols, bytes(self._body), self._width)
+
+    def __iter__(self):
+        # type: () -> Iterator[ic.Code]
+        for row in self._rows():
+            yield ic.Code(row)
+
+    def __getitem__(self, item):
+        # type: (Union[int, slice]) -> Union[ic.Code, IsccArray]
+        """Get a single row as `Code` or a slice of rows as `IsccArray`."""
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return self.take(range(start, stop, step))
+            width = self._width
+            body = memoryview(self._body)[start * width : stop * width]
+            cols = (col[start:stop] for col in (self._mt, self._st, self._vs, self._ln, self._size))
+            return IsccArray.from_columns(*cols, body, width)
+        idx = range(len(self))[item]
+        offset = idx * self._width
+        body = bytes(self._body[offset : offset + self._size[idx]])
+        return ic.Code((self._mt[idx], self._st[idx], self._vs[idx], self._ln[idx], body))
+
+    @property
+    def maintype(self):
+        # type: () -> array
+        """MainType per row."""
+        return self._mt
+
+    @property
+    def subtype(self):
+        # type: () -> array
+        """SubType per row."""
+        return self._st
+
+    @property
+    def version(self):
+        # type: () -> array
+        """Version per row."""
+        return self._vs
+
+    @property
+    def length(self):
+        # type: () -> array
+        """Body length in number of bits per row."""
+        return array("H", [size * 8 for size in self._size])
+
+    @property
+    def sizes(self):
+        # type: () -> array
+        """Body size in number of bytes per row."""
+        return self._size
+
+    @property
+    def width(self):
+        # type: () -> int
+        """Number of bytes per (zero-padded) body record."""
+        return self._width
+
+    @property
+    def body(self):
+        # type: () -> memoryview
+        """Contiguous buffer of fixed-width body records."""
+        return memoryview(self._body)
+
+    def ints(self):
+        # type: () -> List[int]
+        """Bodies as unsigned big-endian integers (zero-padded to `width` bytes)."""
+        width = self._width
+        if width == 8:
+            words = array("Q")
+            words.frombytes(self._body)
+            if sys.byteorder == "little":
+                words.byteswap()
+            return words.tolist()
+        if not width:
+            return [0] * len(self)
+        body = memoryview(self._body)
+        return [int.from_bytes(body[i : i + width], "big") for i in range(0, len(body), width)]
+
+    def take(self, indices):
+        # type: (Iterable[int]) -> IsccArray
+        """Select rows by index."""
+        indices = list(indices)
+        cols = (self._mt, self._st, self._vs, self._ln, self._size)
+        cols = [array("B", map(col.__getitem__, indices)) for col in cols]
+        width = self._width
+        body = memoryview(self._body)
+        body = b"".join([body[i * width : i * width + width] for i in indices])
+        return IsccArray.from_columns(*cols, body, width)
+
+    def filter(self, mask):
+        # type: (Iterable[bool]) -> IsccArray
+        """Select rows by boolean mask (e.g. the mask returned by `iscc_validate_many`)."""
+        return self.take(compress(range(len(self)), mask))
+
+    def select(self, mtype, stype=None, version=None):
+        # type: (ic.MT, Optional[int], Optional[int]) -> IsccArray
+        """
+        Select rows by unit type.
+
+        :param MT mtype: MainType of rows to select
+        :param Optional[int] stype: SubType of rows to select (default: any)
+        :param Optional[int] version: Version of rows to select (default: any)
+        :return: IsccArray with matching rows
+        :rtype: IsccArray
+        """
+        mask = [mt == mtype for mt in self._mt]
+        if stype is not None:
+            mask = [m and st == stype for m, st in zip(mask, self._st)]
+        if version is not None:
+            mask = [m and vs == version for m, vs in zip(mask, self._vs)]
+        return self.filter(mask)
+
+    def groups(self):
+        # type: () -> Dict[Tuple[int, int, int], array]
+        """Row indices grouped by unit type (MainType, SubType, Version)."""
+        result = {}
+        for idx, key in enumerate(zip(self._mt, self._st, self._vs)):
+            rows = result.get(key)
+            if rows is None:
+                rows = result[key] = array("Q")
+            rows.append(idx)
+        return result
+
+    def decompose(self):
+        # type: () -> Dict[ic.MT, Tuple[array, IsccArray]]
+        """
+        Decompose ISCC-CODEs into per-unit columns.
+
+        ISCC-UNIT rows are passed through as they are.
+
+        :return: Mapping of MainType to source row indices and IsccArray of ISCC-UNITs
+        :rtype: Dict[MT, Tuple[array, IsccArray]]
+        """
+        units = {}
+        layouts = {}
+        for idx, (mt, st, vs, ln, body) in enumerate(self._rows()):
+            if mt != ic.MT.ISCC:
+                units.setdefault(mt, ([], []))
+                units[mt][0].append(idx)
+                units[mt][1].append((mt, st, vs, ln, body))
+                continue
+            key = (st, vs, ln, len(body))
+            layout = layouts.get(key)
+            if layout is None:
+                layout = layouts[key] = _unit_layout(*key)
+            for umt, ust, uvs, uln, start, end in layout:
+                rows, unit_rows = units.setdefault(umt, ([], []))
+                rows.append(idx)
+                unit_rows.append((umt, ust, uvs, uln, body[start:end]))
+        return {
+            ic.MT(mt): (array("Q", rows), IsccArray._from_rows(unit_rows))
+            for mt, (rows, unit_rows) in sorted(units.items())
+        }
+
+    def tobytes(self):
+        # type: () -> bytes
+        """Concatenated raw ISCCs (inverse of initializing from a buffer)."""
+        records = self._records()
+        if records is not None:
+            return records
+        return b"".join([_encode_header(*row[:4]) + row[4] for row in self._rows()])
+
+    def tolist(self):
+        # type: () -> List[str]
+        """Canonical ISCC strings (with `ISCC:` prefix) per row."""
+        records = self._records()
+        if records is not None:
+            return ["ISCC:" + code for code in ic.encode_base32_many(records, self._width + 2)]
+        raws = [_encode_header(*row[:4]) + row[4] for row in self._rows()]
+        result = [None] * len(raws)
+        by_size = {}
+        for idx, raw in enumerate(raws):
+            by_size.setdefault(len(raw), []).append(idx)
+        for size, rows in by_size.items():
+            data = b"".join([raws[idx] for idx in rows])
+            for idx, code in zip(rows, ic.encode_base32_many(data, size)):
+                result[idx] = "ISCC:" + code
+        return result
+
+    def _records(self):
+        # type: () -> Optional[bytes]
+        """
+        Raw ISCCs as fixed-size records if all rows have equal body size and canonical headers.
+
+        Canonical headers are 2 bytes with one nibble per header field. The records are
+        assembled column by column with strided slice assignments.
+        """
+        nrows, width = len(self), self._width
+        if not nrows or min(self._size) != width:
+            return None
+        cols = (self._mt, self._st, self._vs, self._ln)
+        if not set(zip(*cols)).issubset(_HEADER_ENCODE):
+            return None
+        size = width + 2
+        records = bytearray(nrows * size)
+        records[0::size] = _nibbles(self._mt, self._st, nrows)
+        records[1::size] = _nibbles(self._vs, self._ln, nrows)
+        body = bytes(self._body)
+        for pos in range(width):
+            records[pos + 2 :: size] = body[pos::width]
+        return bytes(records)
+
+    def _rows(self):
+        # type: () -> Iterator[ic.IsccTuple]
+        """Iterate over rows as tuples of header fields and unpadded body."""
+        width = self._width
+        body = bytes(self._body)
+        offsets = range(0, len(body), width) if width else [0] * len(self)
+        for mt, st, vs, ln, size, offset in zip(
+            self._mt, self._st, self._vs, self._ln, self._size, offsets
+        ):
+            yield mt, st, vs, ln, body[offset : offset + size]
+
+    @classmethod
+    def _from_rows(cls, rows):
+        # type: (List[ic.IsccTuple]) -> IsccArray
+        obj = cls.__new__(cls)
+        obj._set_rows(rows)
+        return obj
+
+    def _set_rows(self, rows):
+        # type: (List[ic.IsccTuple]) -> None
+        self._mt = array("B", [row[0] for row in rows])
+        self._st = array("B", [row[1] for row in rows])
+        self._vs = array("B", [row[2] for row in rows])
+        self._ln = array("B", [row[3] for row in rows])
+        self._size = array("B", [len(row[4]) for row in rows])
+        width = self._width = max(self._size, default=0)
+        self._body = b"".join([row[4].ljust(width, b"\x00") for row in rows])
+
+
+class _Constant:
+    """Read-only column with the same value in every row."""
+
+    __slots__ = ("value", "count")
+
+    def __init__(self, value, count):
+        # type: (int, int) -> None
+        self.value = value
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return repeat(self.value, self.count)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return _Constant(self.value, len(range(self.count)[item]))
+        range(self.count)[item]  # raises IndexError if out of range
+        return self.value
+
+    def __repr__(self):
+        return f"_Constant({self.value}, {self.count})"
+
+    def tolist(self):
+        # type: () -> List[int]
+        return [self.value] * self.count
+
+
+def _encode_header(mtype, stype, version, length):
+    # type: (int, int, int, int) -> bytes
+    header = _HEADER_ENCODE.get((mtype, stype, version, length))
+    if header is None:
+        header = ic.encode_header(mtype, stype, version, length)
+    return header
+
+
+def _decode_raw(raw):
+    # type: (bytes) -> ic.IsccTuple
+    fields = _HEADER_DECODE.get(raw[:2])
+    if fields is not None:
+        return fields + (raw[2:],)
+    return ic.decode_header(raw)
+
+
+def _parse_uniform(codes):
+    # type: (List[ic.IsccAny]) -> Optional[tuple]
+    """Parse equal-length ISCC strings with canonical headers straight into columns."""
+    if not codes or set(map(type, codes)) != {str}:
+        return None
+    try:
+        data = ic.decode_base32_many(codes)
+    except ValueError:
+        return None
+    return _split_records(data, len(data) // len(codes))
+
+
+def _split_records(data, size):
+    # type: (bytes, int) -> Optional[tuple]
+    """
+    Split fixed-size raw ISCC records into columns if all records have canonical headers.
+
+    Header fields are the high and low nibbles of the first two bytes of each record. Header
+    and body columns are extracted with strided slices instead of per-record Python code.
+    """
+    if size < 3:
+        return None
+    first, second = data[0::size], data[1::size]
+    if not all(bytes(pair) in _HEADER_DECODE for pair in set(zip(first, second))):
+        return None
+    body = bytearray(data)
+    del body[0::size]
+    del body[0 :: size - 1]
+    columns = (first.translate(_HIGH), first.translate(_LOW))
+    columns += (second.translate(_HIGH), second.translate(_LOW))
+    width = size - 2
+    sizes = array("B", [width]) * len(first)
+    return tuple(array("B", col) for col in columns) + (sizes, bytes(body), width)
+
+
+def _nibbles(high, low, nrows):
+    # type: (array, array, int) -> bytes
+    """Combine two columns of 4-bit values into one byte per row."""
+    number = int.from_bytes(high, "big") << 4 | int.from_bytes(low, "big")
+    return number.to_bytes(nrows, "big")
+
+
+_HIGH = bytes(b >> 4 for b in range(256))
+_LOW = bytes(b & 15 for b in range(256))
+
+
+def _parse_codes(codes):
+    # type: (List[ic.IsccAny]) -> List[ic.IsccTuple]
+    """Parse ISCCs to rows of header fields and body. Strings are base32 decoded in batches."""
+    rows = [None] * len(codes)
+    by_len = {}  # Row indices and strings grouped by number of characters
+    for idx, code in enumerate(codes):
+        if isinstance(code, str):
+            code = _strip_scheme(code)
+            group = by_len.get(len(code))
+            if group is None:
+                group = by_len[len(code)] = ([], [])
+            group[0].append(idx)
+            group[1].append(code)
+        elif isinstance(code, ic.Code):
+            rows[idx] = code._head + (code.hash_bytes,)
+        elif isinstance(code, (bytes, bytearray, memoryview)):
+            rows[idx] = _decode_raw(bytes(code))
+        else:
+            raise ValueError(f"Code must be str, bytes or Code not {type(code)}")
+    lookup = _HEADER_DECODE.get
+    for nchars, (indices, strings) in by_len.items():
+        size = nchars * 5 // 8
+        data = ic.decode_base32_many(strings)
+        for idx, offset in zip(indices, range(0, len(data), size)):
+            fields = lookup(data[offset : offset + 2])
+            if fields is None:
+                rows[idx] = ic.decode_header(data[offset : offset + size])
+            else:
+                rows[idx] = fields + (data[offset + 2 : offset + size],)
+    return rows
+
+
+def _split_raw(data):
+    # type: (ic.Data) -> List[ic.IsccTuple]
+    """Split a buffer of concatenated raw ISCCs into rows of header fields and body."""
+    data = bytes(data)
+    rows = []
+    pos = 0
+    while pos < len(data):
+        fields = _HEADER_DECODE.get(data[pos : pos + 2])
+        if fields is not None:
+            header_size = 2
+        else:
+            fields = ic.decode_header(data[pos:])
+            header_size = len(data) - pos - len(fields[-1])
+            fields = fields[:4]
+        mt, st, vs, ln = fields
+        size = _body_size(mt, ln, st)
+        start = pos + header_size
+        if size < 0 or start + size > len(data):
+            raise ValueError(f"Invalid or truncated ISCC at byte offset {pos}")
+        rows.append((mt, st, vs, ln, data[start : start + size]))
+        pos = start + size
+    return rows
+
+
+def _unit_layout(stype, version, length, size):
+    # type: (int, int, int, int) -> List[Tuple[int, int, int, int, int, int]]
+    """Header fields and body slice (start, end) of ISCC-UNITs embedded in an ISCC-CODE body."""
+    if stype == ic.ST_ISCC.WIDE:
+        ln = ic.encode_length(ic.MT.DATA, 128)
+        layout = [
+            (ic.MT.DATA, ic.ST.NONE, version, ln, 0, 16),
+            (ic.MT.INSTANCE, ic.ST.NONE, version, ln, 16, 32),
+        ]
+    else:
+        layout = []
+        for idx, mtype in enumerate(ic.decode_units(length)):
+            ustype = ic.ST.NONE if mtype == ic.MT.META else stype
+            layout.append((mtype, ustype, version, 1, idx * 8, idx * 8 + 8))
+        layout.append((ic.MT.DATA, ic.ST.NONE, version, 1, size - 16, size - 8))
+        layout.append((ic.MT.INSTANCE, ic.ST.NONE, version, 1, size - 8, size))
+    return [tuple(int(v) for v in unit[:4]) + unit[4:] for unit in layout]
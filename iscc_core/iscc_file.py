@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""*Binary on-disk format for large collections of ISCCs.*
+
+An ISCC file stores ISCCs as fixed-width binary records grouped into sections. All records in
+a section share the same header (MainType, SubType, Version, Length), so the header is stored
+once per section and each record is just the raw body. Each section may be followed by an
+optional sidecar of fixed-size keys (e.g. ISCC-IDv1 or Flake-Code bodies), one per record.
+
+File layout (all integers little-endian):
+
+| Part          | Size     | Content                                                         |
+|:--------------|:---------|:----------------------------------------------------------------|
+| File header   | 32 bytes | magic, format version, key size, number and offset of sections  |
+| Sections      | variable | records (count * body size bytes), keys (count * key size bytes) |
+| Section table | 32 * n   | mtype, stype, version, length, body size, count, offset         |
+
+Sections start at 8-byte aligned offsets. Records keep their insertion order within each
+section. Files are written in streaming mode with bounded memory and opened via `mmap` as
+zero-copy `IsccArray` views.
+"""
+
+import mmap
+import operator
+import struct
+from itertools import compress, repeat
+from typing import Iterable, List, Optional, Tuple, Union
+import iscc_core as ic
+from iscc_core.iscc_array import IsccArray
+
+__all__ = [
+    "IsccFile",
+    "IsccFileWriter",
+]
+
+MAGIC = b"ISCCFILE"
+FORMAT_VERSION = 1
+FILE_HEADER = struct.Struct("<8sHHIQQ")  # magic, version, key size, reserved, count, offset
+SECTION = struct.Struct("<HHHHIIQQ")  # header fields, size, reserved, count, offset
+
+
+class IsccFileWriter:
+    """Streaming writer for the binary ISCC file format."""
+
+    def __init__(self, path, key_size=0, buffer_size=2**24):
+        # type: (str, int, int) -> None
+        """
+        Create a new ISCC file (overwrites existing files).
+
+        :param str path: File path
+        :param int key_size: Size of sidecar keys in number of bytes (0 = no keys)
+        :param int buffer_size: Number of buffered bytes before sections are flushed to disk
+        """
+        self.key_size = key_size
+        self.buffer_size = buffer_size
+        self._file = open(path, "wb")
+        self._file.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION, key_size, 0, 0, 0))
+        self._sections = []  # type: List[Tuple[int, ...]]
+        self._buffers = {}  # Buffered bodies and keys by (mtype, stype, version, length, size)
+        self._buffered = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, codes, keys=None):
+        # type: (Union[IsccArray, Iterable[ic.IsccAny]], Optional[ic.Data]) -> None
+        """
+        Append ISCCs (and their keys) to the file.
+
+        :param codes: IsccArray or iterable of ISCCs
+        :param keys: Buffer of concatenated keys (required if the file has a key size)
+        """
+        codes = codes if isinstance(codes, IsccArray) else IsccArray(codes)
+        if bool(self.key_size) != (keys is not None):
+            raise ValueError("Keys must be given if and only if key_size is set")
+        keys = memoryview(b"" if keys is None else keys)
+        if len(keys) != len(codes) * self.key_size:
+            raise ValueError(f"Expected {len(codes) * self.key_size} bytes of keys")
+        if not len(codes):
+            return
+        cols = (codes.maintype, codes.subtype, codes.version, codes._ln, codes.sizes)
+        rows = list(zip(*cols))
+        sections = list(dict.fromkeys(rows))
+        if any(not section[-1] for section in sections):
+            raise ValueError("ISCCs without body can not be stored")
+        if len(sections) == 1 and codes.width == sections[0][-1]:
+            self._buffer(sections[0], codes.body, keys)
+        else:
+            # Split once into records and select them per section with C-level iteration
+            width, body, ksize = codes.width, bytes(codes.body), self.key_size
+            records = [body[i : i + width] for i in range(0, len(body), width)]
+            keys = bytes(keys)
+            key_records = [keys[i : i + ksize] for i in range(0, len(keys), ksize)] if ksize else []
+            for section in sections:
+                mask = list(map(operator.eq, rows, repeat(section)))
+                size = section[-1]
+                selected = compress(records, mask)
+                if size != width:
+                    selected = (record[:size] for record in selected)
+                self._buffer(section, b"".join(selected), b"".join(compress(key_records, mask)))
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def _buffer(self, section, records, keys):
+        # type: (Tuple[int, ...], ic.Data, ic.Data) -> None
+        buffers = self._buffers.setdefault(section, (bytearray(), bytearray()))
+        buffers[0].extend(records)
+        buffers[1].extend(keys)
+        self._buffered += len(records) + len(keys)
+
+    def flush(self):
+        # type: () -> None
+        """Write buffered records to disk as new sections."""
+        for section, (records, keys) in self._buffers.items():
+            offset = self._file.tell()
+            self._file.write(records)
+            self._file.write(keys)
+            self._file.write(b"\x00" * (-self._file.tell() % 8))
+            self._sections.append(section + (len(records) // section[-1], offset))
+        self._buffers.clear()
+        self._buffered = 0
+
+    def close(self):
+        # type: () -> None
+        """Flush buffered records, write the section table and close the file."""
+        if self._file.closed:
+            return
+        self.flush()
+        table_offset = self._file.tell()
+        for mtype, stype, version, length, size, count, offset in self._sections:
+            self._file.write(SECTION.pack(mtype, stype, version, length, size, 0, count, offset))
+        self._file.seek(0)
+        header = (MAGIC, FORMAT_VERSION, self.key_size, 0, len(self._sections), table_offset)
+        self._file.write(FILE_HEADER.pack(*header))
+        self._file.close()
+
+
+class IsccFile:
+    """Read-only memory-mapped view of a binary ISCC file."""
+
+    def __init__(self, path):
+        # type: (str) -> None
+        """
+        Open an ISCC file. Only the file header and section table are parsed.
+
+        :param str path: File path
+        """
+        with open(path, "rb") as infile:
+            self._mmap = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            key_size, entries = self._parse(path)
+        except ValueError:
+            self._mmap.close()
+            raise
+        self.key_size = key_size
+        view = memoryview(self._mmap)
+        self.sections = []  # type: List[Tuple[IsccArray, Optional[memoryview]]]
+        for mtype, stype, vs, length, size, _, nrows, offset in entries:
+            records = view[offset : offset + nrows * size]
+            codes = IsccArray.uniform(mtype, stype, vs, length, records, size)
+            keys = None
+            if key_size:
+                start = offset + nrows * size
+                keys = view[start : start + nrows * key_size]
+            self.sections.append((codes, keys))
+
+    def _parse(self, path):
+        # type: (str) -> Tuple[int, List[Tuple[int, ...]]]
+        """Parse and validate the file header and section table against the file size."""
+        magic, version, key_size, _, count, table_offset = FILE_HEADER.unpack_from(
+            self._mmap[: FILE_HEADER.size].ljust(FILE_HEADER.size, b"\x00")
+        )
+        if magic != MAGIC:
+            raise ValueError(f"Not an ISCC file: {path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported ISCC file format version {version}")
+        if not FILE_HEADER.size <= table_offset <= len(self._mmap) - count * SECTION.size:
+            raise ValueError(f"Section table exceeds ISCC file size: {path}")
+        entries = []
+        for idx in range(count):
+            entry = SECTION.unpack_from(self._mmap, table_offset + idx * SECTION.size)
+            size, nrows, offset = entry[4], entry[6], entry[7]
+            if not FILE_HEADER.size <= offset <= table_offset - nrows * (size + key_size):
+                raise ValueError(f"Section {idx} exceeds ISCC file bounds: {path}")
+            entries.append(entry)
+        return key_size, entries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return sum(len(codes) for codes, _ in self.sections)
+
+    def array(self):
+        # type: () -> IsccArray
+        """All ISCCs of the file as one (in-memory) IsccArray."""
+        return IsccArray.concat(codes for codes, _ in self.sections)
+
+    def keys(self):
+        # type: () -> bytes
+        """Concatenated keys of all sections (in the same order as `array`)."""
+        return b"".join(keys for _, keys in self.sections if keys is not None)
+
+    def close(self):
+        # type: () -> None
+        """
+        Close the memory map.
+
+        If views of the file are still referenced elsewhere (e.g. sliced IsccArrays), the
+        memory map stays valid and is closed after the last view is garbage collected.
+        """
+        self.sections = []
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
@@ -20,16 +20,33 @@ The module also contains legacy support for the older v0 ISCC-ID format that was
 blockchain wallet addresses and similarity-hashes of ISCC-CODE units.
 """
 
+import json
+import operator
+import os
+import sys
+import threading
 import time
+from array import array
+from functools import lru_cache
 from hashlib import sha256
-from typing import Optional
+from itertools import repeat
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
 import uvarint
 import iscc_core as ic
+from iscc_core.codec import _body_size
+from iscc_core.iscc_array import IsccArray
 
 __all__ = [
     "gen_iscc_id",
     "gen_iscc_id_v0",
     "gen_iscc_id_v1",
+    "IsccIdIssuer",
+    "iscc_id_v1_bodies",
+    "iscc_id_v1_from_bodies",
+    "iscc_id_v1_split",
+    "iscc_id_v1_pack",
+    "iscc_id_v1_base32hex",
+    "IsccIdV0Replay",
     "iscc_id_incr",
     "iscc_id_incr_v0",
     "alg_simhash_from_iscc_id",
@@ -150,6 +167,255 @@ def gen_iscc_id_v1(timestamp=None, hub_id=0, realm_id=0):
     return dict(iscc=iscc)
 
 
+class IsccIdIssuer:
+    """
+    Thread-safe issuer of strictly increasing ISCC-IDv1s for one HUB and realm.
+
+    Every issued ISCC-ID gets a timestamp that is larger than all timestamps issued before. If
+    the system clock does not advance between calls or steps back, the issuer continues with
+    the next microsecond after the last issued timestamp. To prevent front-running actual time
+    by more than `max_drift` microseconds, issuing waits for the clock to catch up.
+
+    With a state `path` the issuer persists a high-water mark `reserve` microseconds ahead of
+    the last issued timestamp before handing out timestamps beyond the previous mark. A
+    restarted issuer continues after the persisted mark and never reissues a timestamp.
+    """
+
+    def __init__(self, hub_id=0, realm_id=0, path=None, reserve=1000000, max_drift=1000000):
+        # type: (int, int, Optional[str], int, Optional[int]) -> None
+        """
+        Create an issuer.
+
+        :param int hub_id: HUB-ID of the issuer (0-4095)
+        :param int realm_id: Realm ID (0 for testnet, 1 for mainnet)
+        :param Optional[str] path: JSON file to persist the high-water mark
+        :param int reserve: Microseconds reserved ahead with each write of the high-water mark
+        :param Optional[int] max_drift: Maximum microseconds to issue ahead of the system clock
+            (None for no limit)
+        :raises ValueError: If an input is invalid or the state file belongs to another issuer
+        """
+        if hub_id >= 2**12:
+            raise ValueError("HUB-ID overflow")
+        if realm_id not in (0, 1):
+            raise ValueError("Realm-ID must be 0 (test) or 1 (operational)")
+        self.hub_id = hub_id
+        self.realm_id = realm_id
+        self.path = path
+        self.reserve = reserve
+        self.max_drift = max_drift
+        self._header = ic.encode_header(ic.MT.ID, realm_id, ic.VS.V1, 0)
+        self._lock = threading.Lock()
+        self._last = -1
+        self._mark = -1
+        if path is not None and os.path.exists(path):
+            with open(path, "rt", encoding="utf-8") as infile:
+                state = json.load(infile)
+            if (state["hub_id"], state["realm_id"]) != (hub_id, realm_id):
+                raise ValueError(f"State file {path} belongs to another HUB-ID or realm")
+            self._last = self._mark = state["high_water_mark"]
+
+    @property
+    def last(self):
+        # type: () -> int
+        """Last issued timestamp (or persisted high-water mark after a restart)."""
+        return self._last
+
+    def issue(self):
+        # type: () -> dict
+        """
+        Issue one ISCC-ID.
+
+        :return: Dictionary with the ISCC-ID under the key 'iscc'
+        :rtype: dict
+        """
+        return gen_iscc_id_v1(self._reserve(1), self.hub_id, self.realm_id)
+
+    def issue_batch(self, n, packed=False):
+        # type: (int, bool) -> Union[List[str], array]
+        """
+        Issue `n` ISCC-IDs with consecutive timestamps in one call.
+
+        :param int n: Number of ISCC-IDs
+        :param bool packed: Return the 64-bit ISCC-ID bodies (timestamp and HUB-ID) as
+            `array("Q")` instead of canonical ISCC-ID strings
+        :return: List of ISCC-IDs or array of ISCC-ID bodies
+        :rtype: Union[List[str], array]
+        """
+        if n < 1:
+            return array("Q") if packed else []
+        first = self._reserve(n) << 12 | self.hub_id
+        bodies = array("Q", range(first, first + (n << 12), 1 << 12))
+        return bodies if packed else _encode_ids(bodies, self._header)
+
+    def close(self):
+        # type: () -> None
+        """Persist the last issued timestamp as high-water mark (releases the reservation)."""
+        with self._lock:
+            if self.path is not None and self._last >= 0:
+                self._persist(self._last)
+
+    def _reserve(self, n):
+        # type: (int) -> int
+        """Reserve `n` consecutive timestamps and return the first one."""
+        while True:
+            now = time.time_ns() // 1000
+            with self._lock:
+                start = max(now, self._last + 1)
+                ahead = start - now
+                if self.max_drift is None or ahead <= self.max_drift:
+                    end = start + n - 1
+                    if end >= 2**52:
+                        raise ValueError("Timestamp overflow")
+                    if self.path is not None and end > self._mark:
+                        self._persist(end + self.reserve)
+                    self._last = end
+                    return start
+            time.sleep((ahead - self.max_drift) / 1e6)
+
+    def _persist(self, mark):
+        # type: (int) -> None
+        """Durably and atomically replace the state file and set the high-water mark."""
+        state = dict(hub_id=self.hub_id, realm_id=self.realm_id, high_water_mark=mark)
+        with open(self.path + ".tmp", "wt", encoding="utf-8") as outfile:
+            json.dump(state, outfile)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        os.replace(self.path + ".tmp", self.path)
+        self._mark = mark
+
+
+def iscc_id_v1_bodies(iscc_ids, realm_id=None):
+    # type: (Sequence[str], Optional[int]) -> array
+    """
+    Convert ISCC-IDv1 strings to their 64-bit bodies in one pass.
+
+    The body (timestamp << 12 | HUB-ID) sorts like the timestamp and fits an unsigned 64-bit
+    integer column. The realm of the ISCC-IDs is not part of the body.
+
+    :param Sequence[str] iscc_ids: Canonical ISCC-IDv1 strings (with or without `ISCC:` prefix)
+    :param int realm_id: Required realm of all ISCC-IDs (default: any realm)
+    :return: ISCC-ID bodies
+    :rtype: array
+    :raises ValueError: If a string is not an ISCC-IDv1 (of the required realm)
+    """
+    if realm_id not in (None, 0, 1):
+        raise ValueError("Realm-ID must be 0 (test) or 1 (operational)")
+    data = ic.decode_base32_many(iscc_ids)
+    n = len(iscc_ids)
+    if len(data) != n * 10:
+        raise ValueError("ISCC-IDv1 strings expected")
+    headers = set(zip(data[0::10], data[1::10]))
+    if not headers <= set(_ID_V1_HEADERS):
+        raise ValueError("ISCC-IDv1 strings expected")
+    if realm_id is not None and headers - {_ID_V1_HEADERS[realm_id]}:
+        raise ValueError(f"ISCC-IDv1 strings of realm {realm_id} expected")
+    digests = bytearray(n * 8)
+    for i in range(8):
+        digests[i::8] = data[2 + i :: 10]
+    bodies = array("Q", digests)
+    if sys.byteorder == "little":
+        bodies.byteswap()
+    return bodies
+
+
+def iscc_id_v1_from_bodies(bodies, realm_id=0):
+    # type: (Iterable[int], int) -> List[str]
+    """
+    Convert 64-bit ISCC-IDv1 bodies to canonical ISCC-ID strings in one pass.
+
+    :param Iterable[int] bodies: ISCC-ID bodies (timestamp << 12 | HUB-ID)
+    :param int realm_id: Realm ID of the ISCC-IDs (0 for testnet, 1 for mainnet, default: 0)
+    :return: ISCC-IDv1 strings
+    :rtype: List[str]
+    :raises ValueError: If an input is invalid
+    """
+    if realm_id not in (0, 1):
+        raise ValueError("Realm-ID must be 0 (test) or 1 (operational)")
+    header = ic.encode_header(ic.MT.ID, realm_id, ic.VS.V1, 0)
+    return _encode_ids(array("Q", bodies), header)
+
+
+def iscc_id_v1_split(bodies):
+    # type: (Iterable[int]) -> Tuple[array, array]
+    """
+    Split 64-bit ISCC-IDv1 bodies into timestamps and HUB-IDs.
+
+    :param Iterable[int] bodies: ISCC-ID bodies (timestamp << 12 | HUB-ID)
+    :return: Microsecond timestamps (`array("Q")`) and HUB-IDs (`array("H")`)
+    :rtype: Tuple[array, array]
+    """
+    bodies = array("Q", bodies)
+    timestamps = array("Q", map(operator.rshift, bodies, repeat(12)))
+    return timestamps, array("H", map((2**12 - 1).__and__, bodies))
+
+
+def iscc_id_v1_pack(timestamps, hub_ids):
+    # type: (Iterable[int], Union[int, Iterable[int]]) -> array
+    """
+    Pack timestamps and HUB-IDs into 64-bit ISCC-IDv1 bodies.
+
+    :param Iterable[int] timestamps: Microseconds since 1970-01-01T00:00:00Z (must be < 2^52)
+    :param hub_ids: HUB-ID per timestamp or one HUB-ID for all timestamps (0-4095)
+    :return: ISCC-ID bodies
+    :rtype: array
+    :raises ValueError: If an input is invalid
+    """
+    timestamps = array("Q", timestamps)
+    hub_ids = array("H", repeat(hub_ids, len(timestamps)) if isinstance(hub_ids, int) else hub_ids)
+    if len(hub_ids) != len(timestamps):
+        raise ValueError("Number of timestamps and HUB-IDs don´t match")
+    if timestamps and max(timestamps) >= 2**52:
+        raise ValueError("Timestamp overflow")
+    if hub_ids and max(hub_ids) >= 2**12:
+        raise ValueError("HUB-ID overflow")
+    return array("Q", map(operator.or_, map(operator.lshift, timestamps, repeat(12)), hub_ids))
+
+
+def iscc_id_v1_base32hex(bodies):
+    # type: (Iterable[int]) -> List[str]
+    """
+    Encode 64-bit ISCC-IDv1 bodies as base32hex strings in one pass.
+
+    The 13 character base32hex strings sort lexicographically in the same order as the bodies
+    (and their timestamps).
+
+    :param Iterable[int] bodies: ISCC-ID bodies (timestamp << 12 | HUB-ID)
+    :return: Base32hex encoded bodies
+    :rtype: List[str]
+    """
+    digests = array("Q", bodies)
+    if sys.byteorder == "little":
+        digests.byteswap()
+    encoded = "".join(ic.encode_base32_many(digests.tobytes(), 8))
+    encoded = encoded.encode("ascii").translate(_B32_TO_HEX).decode("ascii")
+    return [encoded[i : i + 13] for i in range(0, len(encoded), 13)]
+
+
+def _encode_ids(bodies, header):
+    # type: (array, bytes) -> List[str]
+    """Canonical ISCC-ID strings of 64-bit bodies with a common ISCC header."""
+    digests = array("Q", bodies)
+    if sys.byteorder == "little":
+        digests.byteswap()
+    digests = digests.tobytes()
+    n, size = len(bodies), len(header) + 8
+    records = bytearray(n * size)
+    for i, byte in enumerate(header):
+        records[i::size] = bytes([byte]) * n
+    for i in range(8):
+        records[len(header) + i :: size] = digests[i::8]
+    return ["ISCC:" + code for code in ic.encode_base32_many(records, size)]
+
+
+#: Byte translation table from base32 to base32hex
+_B32_TO_HEX = bytes.maketrans(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZ234567", b"0123456789ABCDEFGHIJKLMNOPQRSTUV"
+)
+
+#: ISCC headers of ISCC-IDv1 (realms 0 and 1)
+_ID_V1_HEADERS = [tuple(ic.encode_header(ic.MT.ID, realm, ic.VS.V1, 0)) for realm in (0, 1)]
+
+
 ####################################################################################################
 # ISCC-IDv0 - Legacy experimental ISCC-IDv0 kept for backward compatibility                        #
 ####################################################################################################
@@ -224,6 +490,168 @@ def soft_hash_iscc_id_v0(iscc_code, wallet, uc=0):
     return iscc_id_xor_digest
 
 
+def soft_hash_iscc_id_v0_many(iscc_codes, wallets):
+    # type: (Sequence[str], Sequence[str]) -> List[bytes]
+    """
+    Calculate ISCC-ID hash digests without uniqueness counters for many ISCC-CODEs.
+
+    Equivalent to `soft_hash_iscc_id_v0(iscc_code, wallet)` per row. ISCC-CODEs and single
+    ISCC-UNITs are decomposed in one pass with `IsccArray` and the similarity hash of their
+    units is calculated bitwise on 64-bit integers. Sequences of ISCC-UNITs fall back to
+    `soft_hash_iscc_id_v0`. Wallet address hashes are cached.
+
+    :param Sequence[str] iscc_codes: ISCC-CODE per row
+    :param Sequence[str] wallets: Wallet address that signes the ISCC declaration per row
+    :return: 8-byte ISCC-ID digest per row
+    :rtype: List[bytes]
+    """
+    return [digest.to_bytes(8, "big") for digest in _soft_hash_iscc_id_v0_ints(iscc_codes, wallets)]
+
+
+class IsccIdV0Replay:
+    """
+    Replay of ISCC-IDv0 declarations with an in-memory index of uniqueness counters.
+
+    Declarations are resolved in order like `gen_iscc_id_v0` followed by `iscc_id_incr_v0` for
+    as long as the ISCC-ID is already taken. The index keeps the number of issued ISCC-IDs per
+    chain and digest instead of the ISCC-IDs themselves (uniqueness counters are contiguous).
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self._counters = {}  # type: Dict[Tuple[int, int], int]
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, iscc_id):
+        chain_id, digest, uc = self._parse(iscc_id)
+        return uc < self._counters.get((chain_id, digest), 0)
+
+    def add(self, iscc_id):
+        # type: (str) -> None
+        """
+        Register an already issued ISCC-IDv0 (and all lower uniqueness counters of its digest).
+
+        :param str iscc_id: ISCC-IDv0
+        """
+        chain_id, digest, uc = self._parse(iscc_id)
+        issued = self._counters.get((chain_id, digest), 0)
+        if uc >= issued:
+            self._counters[(chain_id, digest)] = uc + 1
+            self._count += uc + 1 - issued
+
+    def replay(self, declarations):
+        # type: (Iterable[Tuple[str, int, str]]) -> List[str]
+        """
+        Issue the ISCC-IDs of declarations in declaration order.
+
+        :param declarations: Rows of (ISCC-CODE, Chain-ID, wallet address)
+        :return: ISCC-ID per declaration
+        :rtype: List[str]
+        """
+        declarations = list(declarations)
+        if not declarations:
+            return []
+        iscc_codes, chain_ids, wallets = zip(*declarations)
+        digests = _soft_hash_iscc_id_v0_ints(iscc_codes, wallets)
+        groups = {}  # type: Dict[Tuple[int, int], Tuple[List[int], bytearray]]
+        counters = self._counters
+        for row, (chain_id, digest) in enumerate(zip(chain_ids, digests)):
+            uc = counters.get((chain_id, digest), 0)
+            counters[(chain_id, digest)] = uc + 1
+            data = digest.to_bytes(8, "big")
+            if uc:
+                data += uvarint.encode(uc)
+            group = groups.get((chain_id, len(data)))
+            if group is None:
+                group = groups[(chain_id, len(data))] = ([], bytearray())
+            group[0].append(row)
+            group[1].extend(_id_v0_header(chain_id, len(data)) + data)
+        self._count += len(digests)
+        iscc_ids = [""] * len(digests)
+        for (chain_id, size), (rows, records) in groups.items():
+            size += len(_id_v0_header(chain_id, size))
+            for row, iscc_id in zip(rows, ic.encode_base32_many(records, size)):
+                iscc_ids[row] = "ISCC:" + iscc_id
+        return iscc_ids
+
+    @staticmethod
+    def _parse(iscc_id):
+        # type: (str) -> Tuple[int, int, int]
+        """Chain-ID, digest and uniqueness counter of an ISCC-IDv0."""
+        mt, st, vs, _, data = ic.decode_header(ic.decode_base32(ic.iscc_clean(iscc_id)))
+        if mt != ic.MT.ID or vs != ic.VS.V0:
+            raise ValueError("ISCC-IDv0 expected")
+        uc = uvarint.decode(data[8:]).integer if len(data) > 8 else 0
+        return st, int.from_bytes(data[:8], "big"), uc
+
+
+def _soft_hash_iscc_id_v0_ints(iscc_codes, wallets):
+    # type: (Sequence[str], Sequence[str]) -> List[int]
+    """ISCC-ID hash digests without uniqueness counters as 64-bit integers."""
+    if len(iscc_codes) != len(wallets):
+        raise ValueError("Number of ISCC-CODEs and wallets don´t match")
+    batch = [row for row, code in enumerate(iscc_codes) if "-" not in code]
+    codes = IsccArray([iscc_codes[row] for row in batch])
+    units = [[] for _ in batch]  # type: List[List[int]]
+    for mtype, (rows, decomposed) in codes.decompose().items():
+        if mtype == ic.MT.ID:
+            raise ValueError("Cannot create ISCC-ID from ISCC-ID")
+        shift = (decomposed.width - 7) * 8
+        headers = zip(decomposed.subtype, decomposed.version, decomposed.length)
+        for row, header, body in zip(rows, headers, decomposed.ints()):
+            # Instance-Codes only count as singular ISCC-UNIT
+            if mtype != ic.MT.INSTANCE or codes.maintype[row] == ic.MT.INSTANCE:
+                units[row].append(_header_byte(mtype, *header) << 56 | body >> shift)
+    digests = [0] * len(iscc_codes)
+    fallback = set(range(len(iscc_codes))).difference(batch)
+    columns = zip(batch, codes.maintype, codes.subtype, codes.length, codes.sizes, units)
+    for row, mt, st, ln, size, digest_units in columns:
+        if mt != ic.MT.ISCC and size != _body_size(mt, ln, st):
+            fallback.add(row)  # Sequence of ISCC-UNITs without separators
+        else:
+            digests[row] = _simhash_ints(digest_units) ^ _wallet_hash(wallets[row])
+    for row in fallback:
+        digest = soft_hash_iscc_id_v0(iscc_codes[row], wallets[row])
+        digests[row] = int.from_bytes(digest, "big")
+    return digests
+
+
+def _simhash_ints(digests):
+    # type: (List[int]) -> int
+    """Bitwise `alg_simhash` of 64-bit integers (bits set in at least half of the digests)."""
+    # at_least[j] holds the bits that are set in at least j of the digests seen so far
+    need = (len(digests) + 1) // 2
+    at_least = [2**64 - 1] + [0] * need
+    for digest in digests:
+        for j in range(need, 0, -1):
+            at_least[j] |= at_least[j - 1] & digest
+    return at_least[need]
+
+
+@lru_cache(maxsize=2**16)
+def _wallet_hash(wallet):
+    # type: (str) -> int
+    """First 8 bytes of the sha2-256 of a wallet address as integer."""
+    return int.from_bytes(sha256(wallet.encode("ascii")).digest()[:8], "big")
+
+
+@lru_cache(maxsize=None)
+def _id_v0_header(chain_id, size):
+    # type: (int, int) -> bytes
+    """Encoded header of an ISCC-IDv0 with a body of `size` bytes."""
+    return ic.encode_header(ic.MT.ID, chain_id, ic.VS.V0, ic.encode_length(ic.MT.ID, size * 8))
+
+
+@lru_cache(maxsize=None)
+def _header_byte(mtype, stype, version, length):
+    # type: (int, int, int, int) -> int
+    """First byte of an encoded ISCC header."""
+    return ic.encode_header(mtype, stype, version, length)[0]
+
+
 def iscc_id_incr(iscc_id):
     # type: (str) -> str
     """
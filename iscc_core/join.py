@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""*Similarity join between two ISCC collections.*
+
+Both sides are decomposed into ISCC-UNITs and partitioned by unit header (MainType, SubType,
+Version, Length). The right side is indexed once per partition (a `MihIndex` for similarity
+thresholds and a hash table for exact matches). The left side is streamed in blocks of rows
+and each block is joined against the partitions with the same header. Matches are yielded
+block by block, so memory is bounded by the right side index and a few blocks in flight.
+
+With multiple workers each worker process builds the right side index once and joins blocks
+of the left side in parallel.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+import iscc_core as ic
+from iscc_core.cluster import THRESHOLDS, Codes, _unit_rows
+from iscc_core.index_mih import MihIndex
+from iscc_core.iscc_array import IsccArray
+
+__all__ = [
+    "iscc_join",
+]
+
+Match = Tuple[int, int, ic.MT, int]
+
+
+def iscc_join(left, right, thresholds=None, workers=None, block_size=10000):
+    # type: (Codes, Codes, Optional[Dict[int, float]], Optional[int], int) -> Iterator[Match]
+    """
+    Find all pairs of similar ISCCs between two collections.
+
+    Two rows match if one of their units with a MainType listed in `thresholds` is within
+    the normalized hamming distance of that threshold (default: Content-Code and Data-Code
+    within 0.1, equal Instance-Codes). Units are only compared with units of the same header.
+    A pair of rows is yielded once per matching unit.
+
+    :param left: IsccArray or iterable of ISCCs (streamed in blocks)
+    :param right: IsccArray or iterable of ISCCs (indexed)
+    :param thresholds: Maximum normalized hamming distance by MainType for units to match
+    :param int workers: Number of worker processes (default: number of CPUs)
+    :param int block_size: Number of left rows joined per block
+    :return: Generator of (left row, right row, MainType, distance) tuples ordered by left row
+    """
+    left = left if isinstance(left, IsccArray) else IsccArray(left)
+    right = right if isinstance(right, IsccArray) else IsccArray(right)
+    thresholds = THRESHOLDS if thresholds is None else thresholds
+    blocks = (
+        (start, left.take(range(start, min(start + block_size, len(left)))))
+        for start in range(0, len(left), block_size)
+    )
+    workers = min(workers or os.cpu_count() or 1, -(-len(left) // block_size))
+    if workers <= 1:
+        joiner = _Joiner(right, thresholds)
+        for offset, block in blocks:
+            yield from joiner.join(block, offset)
+        return
+    with ProcessPoolExecutor(workers, initializer=_init, initargs=(right, thresholds)) as pool:
+        pending = deque()
+        for offset, block in blocks:
+            pending.append(pool.submit(_join, block, offset))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+class _Joiner:
+    """Index of the right side partitions of a join."""
+
+    def __init__(self, right, thresholds):
+        # type: (IsccArray, Dict[int, float]) -> None
+        self.partitions = {}  # type: Dict[tuple, Tuple[Optional[MihIndex], dict, int]]
+        for mtype, units in right.decompose().items():
+            if mtype not in thresholds:
+                continue
+            for row, header, body in _unit_rows(*units):
+                key = (mtype,) + header
+                partition = self.partitions.get(key)
+                if partition is None:
+                    bits = header[-1] * 8
+                    radius = int(thresholds[mtype] * bits)
+                    index = MihIndex(bits) if radius else None
+                    partition = self.partitions[key] = (index, {}, radius)
+                index, bodies, _ = partition
+                rows = bodies.get(body)
+                if rows is None:
+                    rows = bodies[body] = []
+                    if index is not None:
+                        index._add_body(body, body)
+                rows.append(row)
+
+    def join(self, block, offset):
+        # type: (IsccArray, int) -> List[Match]
+        """Matches of a block of left rows sorted by left row."""
+        matches = []
+        for mtype, units in block.decompose().items():
+            for row, header, body in _unit_rows(*units):
+                partition = self.partitions.get((mtype,) + header)
+                if partition is None:
+                    continue
+                index, bodies, radius = partition
+                if index is None:
+                    hits = [(body, 0)] if body in bodies else []
+                else:
+                    hits = index._query_body(body, radius)
+                for other, dist in hits:
+                    matches.extend((offset + row, match, mtype, dist) for match in bodies[other])
+        matches.sort()
+        return matches
+
+
+_joiner = None  # type: Optional[_Joiner]
+
+
+def _init(right, thresholds):
+    # type: (IsccArray, Dict[int, float]) -> None
+    """Build the right side index once per worker process."""
+    global _joiner
+    _joiner = _Joiner(right, thresholds)
+
+
+def _join(block, offset):
+    # type: (IsccArray, int) -> List[Match]
+    """Join a block of left rows in a worker process."""
+    return _joiner.join(block, offset)
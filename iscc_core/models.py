@@ -4,8 +4,7 @@ import datetime
 import random
 from typing import List, Union
 import base58
-from bitarray import bitarray, frozenbitarray
-from bitarray.util import ba2hex, ba2int, count_xor
+from bitarray import frozenbitarray
 
 from iscc_core import core_opts
 from iscc_core.constants import (
@@ -45,11 +44,25 @@ __all__ = [
 ]
 
 
+if sys.version_info >= (3, 10):
+    _popcount = int.bit_count
+else:  # pragma: no cover
+
+    def _popcount(num):
+        # type: (int) -> int
+        return bin(num).count("1")
+
+
 class Code:
     """
     Convenience class to handle different representations of an ISCC.
+
+    Stores the decoded header fields and raw body bytes only. The bitarray representation of
+    the body is materialized on first access of `hash_ba` and cached.
     """
 
+    __slots__ = ("_head", "_data", "_ba")
+
     def __init__(self, code):
         # type: (IsccAny) -> None
         """
@@ -57,11 +70,8 @@ class Code:
 
         :param AnyISCC code: Any valid representation of an ISCC
         """
-        self._head = None
-        self._body = None
-
         if isinstance(code, Code):
-            code_fields = code._head + (code.hash_bytes,)
+            code_fields = code._head + (code._data,)
         elif isinstance(code, str):
             code = iscc_clean(code)
             code_fields = decode_header(decode_base32(code))
@@ -72,10 +82,9 @@ class Code:
         else:
             raise ValueError(f"Code must be str, bytes, tuple or Code not {type(code)}")
 
-        self._head = code_fields[:-1]
-        body = bitarray()
-        body.frombytes(code_fields[-1])
-        self._body = frozenbitarray(body)
+        self._head = tuple(code_fields[:-1])
+        self._data = bytes(code_fields[-1])
+        self._ba = None
 
     def __str__(self):
         return self.code
@@ -104,7 +113,7 @@ class Code:
     @property
     def bytes(self) -> bytes:
         """Raw bytes of code (including header)."""
-        return self.header_bytes + self._body.tobytes()
+        return self.header_bytes + self._data
 
     @property
     def hex(self) -> str:
@@ -134,12 +143,12 @@ class Code:
     @property
     def hash_bytes(self) -> bytes:
         """Byte representation of code (without header)"""
-        return self._body.tobytes()
+        return self._data
 
     @property
     def hash_hex(self) -> str:
         """Hex string representation of code (without header)."""
-        return ba2hex(self._body)
+        return self._data.hex()
 
     @property
     def hash_base32(self) -> str:
@@ -154,22 +163,24 @@ class Code:
     @property
     def hash_bits(self) -> str:
         """String of 0,1 representing the bits of the code (without header)."""
-        return self._body.to01()
+        return self.hash_ba.to01()
 
     @property
     def hash_ints(self) -> List[int]:
         """List of 0,1 integers representing the bits of the code (without header)."""
-        return self._body.tolist()
+        return self.hash_ba.tolist()
 
     @property
     def hash_uint(self) -> int:
         """Unsinged integer representation of the code (without header)."""
-        return ba2int(self._body, signed=False)
+        return int.from_bytes(self._data, "big", signed=False)
 
     @property
     def hash_ba(self) -> frozenbitarray:
         """Bitarray object of the code (without header)."""
-        return self._body
+        if self._ba is None:
+            self._ba = frozenbitarray(buffer=self._data)
+        return self._ba
 
     @property
     def header_bytes(self) -> bytes:
@@ -297,11 +308,14 @@ class Code:
 
     def __xor__(self, other) -> int:
         """Use XOR operator for hamming distance calculation."""
-        return count_xor(self._body, other._body)
+        a, b = self._data, other._data
+        if len(a) != len(b):
+            raise ValueError("codes of equal length expected")
+        return _popcount(int.from_bytes(a, "big") ^ int.from_bytes(b, "big"))
 
     def __eq__(self, other):
         # type: (Code) -> bool
-        return self.code == other.code
+        return self.bytes == other.bytes
 
     def __hash__(self):
         return self.uint
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""*Batch Normalized Prefix Hamming (NPH) comparison against a reference set.*
+
+`iscc_nph_compare` decomposes both ISCCs and compares their units pair by pair on every call.
+`NphEngine` decomposes a set of reference ISCCs once and keeps their units grouped by unit
+type (MainType, SubType, Version) as packed integer bodies. A query is decomposed once and each
+of its units is compared with all reference units of the same type in one pass.
+"""
+
+from array import array
+from itertools import repeat
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+import iscc_core as ic
+from iscc_core.iscc_array import IsccArray
+from iscc_core.utils import _nph_distances
+
+__all__ = [
+    "NphEngine",
+]
+
+
+class NphEngine:
+    """Scores query ISCCs against a pre-decomposed set of reference ISCCs."""
+
+    def __init__(self, references):
+        # type: (Union[IsccArray, Iterable[ic.IsccAny]]) -> None
+        """
+        Decompose and group the units of a reference set.
+
+        ISCC-ID rows are ignored.
+
+        :param references: IsccArray or iterable of ISCC-UNITs and ISCC-CODEs
+        """
+        if not isinstance(references, IsccArray):
+            references = IsccArray(references)
+        self.size = len(references)
+        self._groups = {}  # type: Dict[Tuple[int, int, int], tuple]
+        for mtype, (rows, units) in references.decompose().items():
+            if mtype == ic.MT.ID:
+                continue
+            for key, positions in units.groups().items():
+                group = units.take(positions)
+                group_rows = array("Q", map(rows.__getitem__, positions))
+                self._groups[key] = (group_rows, group.ints(), group.width, group.sizes)
+
+    def __len__(self):
+        return self.size
+
+    def compare(self, iscc):
+        # type: (ic.IsccAny) -> Dict[str, dict]
+        """
+        Compare a query ISCC with all references.
+
+        Results are keyed like `iscc_nph_compare` by "{MAINTYPE}_{SUBTYPE}_{VERSION}" of the
+        unit types shared by the query and the references. Each result holds the reference
+        `rows` that have a unit of that type and the aligned `similarity` (`array("d")`) and
+        `common_prefix_bits` (`array("H")`) columns. INSTANCE similarity is binary (0.0 or 1.0)
+        with the query length as common prefix.
+
+        :param iscc: Query ISCC-UNIT or ISCC-CODE (not ISCC-ID)
+        :return: Columnar NPH results per unit type
+        :rtype: Dict[str, dict]
+        """
+        if not isinstance(iscc, str):
+            iscc = ic.Code(iscc).code
+        result = {}
+        for unit in ic.iscc_decompose(iscc):
+            mtype, stype, version, _, body = ic.iscc_decode(unit)
+            group = self._groups.get((mtype, stype, version))
+            if group is None:
+                continue
+            rows, ints, width, sizes = group
+            name = f"{ic.MT(mtype).name}_{ic.SUBTYPE_MAP[(mtype, version)](stype).name}"
+            name += f"_{ic.VS(version).name}"
+            if mtype == ic.MT.INSTANCE:
+                similarity, bits = self._instance(body, ints, width, sizes)
+            else:
+                distances = _nph_distances(body, ints, width, sizes)
+                similarity = array("d", map((1.0).__sub__, distances))
+                common = {size: min(len(body), size) * 8 for size in set(sizes)}
+                bits = array("H", map(common.__getitem__, sizes))
+            result[name] = dict(rows=rows, similarity=similarity, common_prefix_bits=bits)
+        return result
+
+    def compare_many(self, isccs):
+        # type: (Iterable[ic.IsccAny]) -> List[Dict[str, dict]]
+        """
+        Compare many query ISCCs with all references.
+
+        :param isccs: Query ISCC-UNITs or ISCC-CODEs
+        :return: Columnar NPH results per query (see `compare`)
+        :rtype: List[Dict[str, dict]]
+        """
+        return [self.compare(iscc) for iscc in isccs]
+
+    @staticmethod
+    def _instance(body, ints, width, sizes):
+        # type: (bytes, List[int], int, Sequence[int]) -> Tuple[array, array]
+        """Binary exact match of an Instance-Code body with zero-padded reference bodies."""
+        query = int.from_bytes(body.ljust(width, b"\x00"), "big")
+        equal = map(query.__eq__, ints)
+        if len(set(sizes)) > 1:
+            equal = map(bool.__and__, equal, map(len(body).__eq__, sizes))
+        elif len(body) != width:
+            equal = repeat(False, len(ints))
+        similarity = array("d", map(float, equal))
+        return similarity, array("H", [len(body) * 8]) * len(ints)
@@ -87,6 +87,14 @@ class CoreOptions(BaseSettings):
         64, description="Default length of generated Content-Code Video in bits"
     )
 
+    video_window: int = Field(
+        150, description="Number of frame signatures per granular video segment (30s at 5 fps)"
+    )
+
+    video_step: int = Field(
+        25, description="Number of frame signatures to advance between granular video segments"
+    )
+
     data_bits: int = Field(64, description="Default length of generated Data-Code in bits")
 
     flake_bits: int = Field(64, description="Default length of generated Flake-Code in bits")
@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
+import heapq
 import io
 import json
+import operator
+from array import array
 from hashlib import sha256
-from typing import Generator, Sequence, Tuple, Any
+from itertools import repeat
+from typing import Generator, Iterable, List, Sequence, Tuple, Any, Union
 import uvarint
 from bitarray import bitarray
 from bitarray.util import count_xor
@@ -10,6 +14,7 @@ from blake3 import blake3
 import iscc_core as ic
 import jcs
 from iscc_core.constants import Stream
+from iscc_core.models import _popcount
 
 __all__ = [
     "iscc_nph_similarity_bytes",
@@ -24,6 +29,8 @@ __all__ = [
     "iscc_compare",
     "iscc_distance",
     "iscc_distance_bytes",
+    "iscc_distance_many",
+    "iscc_distance_topk",
     "multi_hash_blake3",
 ]
 
@@ -400,6 +407,99 @@ def iscc_distance_bytes(a, b):
     return count_xor(ba, bb)
 
 
+def iscc_distance_many(query, candidates, nph=False):
+    # type: (ic.IsccAny, Union[ic.IsccArray, Iterable[ic.IsccAny]], bool) -> array
+    """
+    Calculate hamming distances between one query ISCC and many candidate ISCCs.
+
+    Header compatibility is checked once for the whole batch. By default MainType, SubType,
+    Version and Length of all candidates must match the query. With `nph=True` only
+    MainType, SubType and Version must match, and distances are calculated as Normalized
+    Prefix Hamming Distance (see `iscc_nph_distance_bytes`) over the common prefix of the
+    query and each candidate.
+
+    :param query: Query ISCC
+    :param candidates: IsccArray or iterable of candidate ISCCs
+    :param bool nph: Use Normalized Prefix Hamming Distance for codes of different lengths
+    :return: Hamming distances (`array("H")`) or NPH distances (`array("d")`) per candidate
+    :rtype: array
+    :raise ValueError: If headers don´t match or for unsupported types
+    """
+    query, candidates = _distance_batch(query, candidates, nph)
+    body, width, sizes = query.hash_bytes, candidates.width, candidates.sizes
+    if not len(candidates):
+        return array("d" if nph else "H")
+    if not nph:
+        if width != len(body) or min(sizes) != width:
+            raise AssertionError(f"Hash diggest of unequal length: {len(body)} vs {width}")
+        q = int.from_bytes(body, "big")
+        return array("H", map(_popcount, map(q.__xor__, candidates.ints())))
+    return _nph_distances(body, candidates.ints(), width, sizes)
+
+
+def _nph_distances(body, ints, width, sizes):
+    # type: (bytes, List[int], int, Sequence[int]) -> array
+    """NPH distances of a query body to zero-padded candidate bodies of `width` bytes."""
+    # Align query with the zero-padded candidate bodies and compare common prefixes only
+    q = int.from_bytes(body[:width].ljust(width, b"\x00"), "big")
+    xors = map(q.__xor__, ints)
+    lengths = set(sizes)
+    if len(lengths) == 1:
+        common_bits = min(len(body), lengths.pop()) * 8
+        if not common_bits:
+            return array("d", [float(bool(body))]) * len(ints)
+        shifted = map(operator.rshift, xors, repeat(width * 8 - common_bits))
+        return array("d", map(operator.truediv, map(_popcount, shifted), repeat(common_bits)))
+    bits = {size: min(len(body), size) * 8 for size in lengths}
+    distances = array("d")
+    for xor, size in zip(xors, sizes):
+        common_bits = bits[size]
+        if common_bits:
+            distances.append(_popcount(xor >> (width * 8 - common_bits)) / common_bits)
+        else:
+            distances.append(float(bool(body) or bool(size)))
+    return distances
+
+
+def iscc_distance_topk(query, candidates, k=10, nph=False):
+    # type: (ic.IsccAny, Union[ic.IsccArray, Iterable[ic.IsccAny]], int, bool) -> List[tuple]
+    """
+    Find the k candidates with the smallest hamming distance to a query ISCC.
+
+    See `iscc_distance_many` for header compatibility and NPH semantics.
+
+    :param query: Query ISCC
+    :param candidates: IsccArray or iterable of candidate ISCCs
+    :param int k: Number of results
+    :param bool nph: Use Normalized Prefix Hamming Distance for codes of different lengths
+    :return: List of (candidate index, distance) tuples sorted by distance
+    :rtype: List[tuple]
+    """
+    distances = iscc_distance_many(query, candidates, nph)
+    best = heapq.nsmallest(k, range(len(distances)), key=distances.__getitem__)
+    return [(idx, distances[idx]) for idx in best]
+
+
+def _distance_batch(query, candidates, nph):
+    # type: (ic.IsccAny, Union[ic.IsccArray, Iterable[ic.IsccAny]], bool) -> tuple
+    """Prepare query Code and candidate IsccArray and check header compatibility once."""
+    if isinstance(query, str):
+        query = ic.iscc_decode(query)
+    query = query if isinstance(query, ic.Code) else ic.Code(query)
+    if not isinstance(candidates, ic.IsccArray):
+        candidates = ic.IsccArray(candidates)
+    if query.maintype == ic.MT.ID and query.version == ic.VS.V1:
+        raise ValueError("Similarity comparison not supported for ISCC-IDv1")
+    columns = [candidates.maintype, candidates.subtype, candidates.version]
+    if not nph:
+        columns.append(candidates._ln)
+    head = tuple(query)[: len(columns)]
+    mismatch = set(zip(*columns)) - {head}
+    if mismatch:
+        raise ValueError(f"ISCC headers don´t match: {head} vs {sorted(mismatch)}")
+    return query, candidates
+
+
 def iscc_pair_unpack(a, b):
     # type: (str, str) -> Tuple[bytes, bytes]
     """
@@ -413,9 +513,7 @@ def iscc_pair_unpack(a, b):
     :rtype: Tuple[bytes, bytes]
     :raise ValueError: If ISCC headers don´t match or for unsupported types
     """
-    a, b = ic.iscc_clean(ic.iscc_normalize(a)), ic.iscc_clean(ic.iscc_normalize(b))
-    a, b = ic.decode_base32(a), ic.decode_base32(b)
-    a, b = ic.decode_header(a), ic.decode_header(b)
+    a, b = ic.iscc_decode(a), ic.iscc_decode(b)
 
     # Check for ISCC-IDv1 which doesn't support similarity comparison
     if a[0] == ic.MT.ID and a[2] == ic.VS.V1:
@@ -1,18 +1,34 @@
 # -*- coding: utf-8 -*-
-from typing import Sequence
+from operator import gt, itemgetter
+from typing import List, Sequence
 from bitarray import bitarray
 
 
 def alg_wtahash(vec: Sequence[float], bits) -> bytes:
     """Calculate WTA Hash for vector with 380 values (MP7 frame signature)."""
-    h = []
-    for perm in WTA_VIDEO_ID_PERMUTATIONS:
-        v = vec[perm[0]], vec[perm[1]]
-        h.append(v.index(max(v)))
-        if len(h) == bits:
-            break
-    h = bitarray(h).tobytes()
-    return h
+    return _wta_bits(vec)[:bits].tobytes()
+
+
+def alg_wtahash_batch(vecs: Sequence[Sequence[float]], bits) -> List[bytes]:
+    """
+    Calculate WTA Hashes for a batch of vectors with 380 values each.
+
+    Equivalent to calling `alg_wtahash` for each row of a (N, 380) matrix, but avoids
+    repeated per-call setup when hashing many vectors (e.g. video scenes).
+
+    :param Sequence vecs: Sequence of vectors with 380 values each
+    :param int bits: Bit-length of resulting hash digests
+    :return: List of WTA Hash digests (one per input vector)
+    :rtype: List[bytes]
+    """
+    return [_wta_bits(vec)[:bits].tobytes() for vec in vecs]
+
+
+def _wta_bits(vec):
+    # type: (Sequence[float]) -> bitarray
+    """Gather both permutation sides in one pass and compare them pairwise."""
+    # A bit is set if the second value of the pair wins (ties go to the first value)
+    return bitarray(map(gt, _GATHER_B(vec), _GATHER_A(vec)))
 
 
 WTA_VIDEO_ID_PERMUTATIONS = (
@@ -273,3 +289,10 @@ WTA_VIDEO_ID_PERMUTATIONS = (
     (63, 14),
     (28, 351),
 )
+
+#: Permutation table split into two index arrays (first and second value of each pair)
+WTA_VIDEO_ID_IDX_A = tuple(perm[0] for perm in WTA_VIDEO_ID_PERMUTATIONS)
+WTA_VIDEO_ID_IDX_B = tuple(perm[1] for perm in WTA_VIDEO_ID_PERMUTATIONS)
+
+_GATHER_A = itemgetter(*WTA_VIDEO_ID_IDX_A)
+_GATHER_B = itemgetter(*WTA_VIDEO_ID_IDX_B)
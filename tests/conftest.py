@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import io
 import pytest
+import iscc_core as ic
 
 MB1 = 1024 * 1024
 
@@ -16,6 +17,12 @@ def turbo(request):
     return request.config.getoption("--turbo")
 
 
+@pytest.fixture
+def restore_rgen(monkeypatch):
+    """Restore the random generator of `Code.rnd` after tests that seed their own."""
+    monkeypatch.setattr(ic.Code, "rgen", ic.Code.rgen)
+
+
 @pytest.fixture(scope="module", name="static_bytes")
 def static_bytes_(n: int = MB1, block_size: int = 4) -> bytes:
     """Wraps static_bytes function as a fixture (both can be used)."""
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import random
+from itertools import combinations
+import pytest
+import iscc_core as ic
+from iscc_core import cluster
+from iscc_core.cluster import _UnionFind
+from iscc_core.iscc_file import IsccFileWriter
+
+pytestmark = pytest.mark.usefixtures("restore_rgen")
+
+
+def near_duplicates(n, seed=0):
+    rnd = random.Random(seed)
+    ic.Code.rgen = rnd
+    codes = []
+    for code in [ic.Code.rnd(ic.MT.ISCC, bits=256) for _ in range(n)]:
+        codes.append(code)
+        for _ in range(rnd.randint(0, 2)):
+            body = bytearray(code.hash_bytes)
+            for _ in range(rnd.randint(0, 5)):
+                body[rnd.randrange(len(body))] ^= 1 << rnd.randrange(8)
+            codes.append(ic.Code(code.bytes[:2] + bytes(body)))
+    rnd.shuffle(codes)
+    return codes
+
+
+def brute_force(codes, thresholds):
+    forest = _UnionFind(len(codes))
+    units = [[ic.Code(unit) for unit in ic.iscc_decompose(code.code)] for code in codes]
+    for i, j in combinations(range(len(codes)), 2):
+        for a in units[i]:
+            for b in units[j]:
+                if a.maintype in thresholds and tuple(a)[:4] == tuple(b)[:4]:
+                    radius = int(thresholds[a.maintype] * len(a.hash_bytes) * 8)
+                    if ic.iscc_distance_bytes(a.hash_bytes, b.hash_bytes) <= radius:
+                        forest.union(i, j)
+    return [forest.find(row) for row in range(len(codes))]
+
+
+def test_iscc_cluster_matches_brute_force():
+    codes = near_duplicates(150)
+    for thresholds in (None, {ic.MT.META: 0.2, ic.MT.DATA: 0.05}):
+        result = ic.iscc_cluster(codes, thresholds, workers=1)
+        roots = brute_force(codes, thresholds or {ic.MT.CONTENT: 0.1, ic.MT.DATA: 0.1})
+        assert list(result["representatives"]) == sorted(set(roots))
+        assert [result["representatives"][label] for label in result["labels"]] == roots
+
+
+def test_iscc_cluster_shards_match_brute_force():
+    codes = near_duplicates(100, seed=5)
+    codes += codes[:20]
+    codes = ic.IsccArray(codes)
+    shards = [codes[0:50], codes[50:51], codes[51:51], codes[51:]]
+    for thresholds in (None, {ic.MT.INSTANCE: 0.0, ic.MT.DATA: 0.05}):
+        result = ic.iscc_cluster_shards(shards, thresholds, workers=1)
+        rows = [ic.Code(code) for code in codes.tolist()]
+        roots = brute_force(rows, thresholds or {ic.MT.CONTENT: 0.1, ic.MT.DATA: 0.1})
+        assert [result["representatives"][label] for label in result["labels"]] == roots
+
+
+def test_iscc_cluster_tasks_per_shard(monkeypatch):
+    tasks = []
+
+    def record(mtype, shards, offsets, threshold):
+        tasks.append((mtype, len(shards), offsets))
+        return links(mtype, shards, offsets, threshold)
+
+    links = cluster._cluster_links
+    monkeypatch.setattr(cluster, "_cluster_links", record)
+    codes = near_duplicates(30, seed=6)
+    result = ic.iscc_cluster(codes, {ic.MT.DATA: 0.1}, workers=1)
+    assert tasks == [(ic.MT.DATA, 1, [0])]
+    tasks.clear()
+    shards = [ic.IsccArray(codes[:10]), ic.IsccArray(codes[10:25]), ic.IsccArray(codes[25:])]
+    assert ic.iscc_cluster_shards(shards, {ic.MT.DATA: 0.1}, workers=1) == result
+    assert tasks == [(ic.MT.DATA, 3, [0, 10, 25]), (ic.MT.DATA, 2, [10, 25]), (ic.MT.DATA, 1, [25])]
+
+
+def test_iscc_cluster_groups_variants():
+    codes = near_duplicates(300, seed=1)
+    result = ic.iscc_cluster(ic.IsccArray(codes), workers=1)
+    assert len(result["labels"]) == len(codes)
+    assert len(result["representatives"]) == 300
+    assert result["labels"][0] == 0 and result["representatives"][0] == 0
+
+
+def test_iscc_cluster_instance_and_units():
+    ic.Code.rgen = random.Random(2)
+    instance = ic.Code.rnd(ic.MT.INSTANCE, bits=64)
+    other = ic.Code.rnd(ic.MT.INSTANCE, bits=64)
+    data = ic.Code.rnd(ic.MT.DATA, bits=64)
+    codes = [data, instance, other, instance, data]
+    result = ic.iscc_cluster(codes, workers=1)
+    assert list(result["labels"]) == [0, 1, 2, 1, 0]
+    assert list(result["representatives"]) == [0, 1, 2]
+
+
+def test_iscc_cluster_shards_files_and_workers(tmp_path):
+    codes = near_duplicates(200, seed=3)
+    path = str(tmp_path / "shard.iscc")
+    with IsccFileWriter(path) as writer:
+        writer.write(codes[100:])
+    with ic.IsccFile(path) as isccfile:
+        rows = codes[:100] + isccfile.array().tolist()
+    expected = ic.iscc_cluster(rows, workers=1)
+    shards = [ic.IsccArray(codes[:100]), path]
+    assert ic.iscc_cluster_shards(shards, workers=1) == expected
+    assert ic.iscc_cluster_shards(shards, workers=2) == expected
+
+
+def test_iscc_cluster_workers_memoryview_shards(tmp_path):
+    codes = near_duplicates(100, seed=4)
+    sliced = ic.IsccArray(codes)[0:150]
+    assert isinstance(sliced._body, memoryview)
+    assert ic.iscc_cluster(sliced, workers=2) == ic.iscc_cluster(sliced, workers=1)
+    path = str(tmp_path / "shard.iscc")
+    with IsccFileWriter(path) as writer:
+        writer.write(codes)
+    with ic.IsccFile(path) as isccfile:
+        sections = [section for section, _ in isccfile.sections]
+        expected = ic.iscc_cluster_shards(sections, workers=1)
+        assert ic.iscc_cluster_shards(sections, workers=2) == expected
+
+
+def test_union_find_roots_are_lowest_rows():
+    forest = _UnionFind(3)
+    forest.grow(6)
+    assert len(forest) == 6
+    assert forest.union(5, 4) and forest.union(2, 5) and not forest.union(4, 2)
+    assert forest.union(1, 0)
+    assert [forest.find(row) for row in range(6)] == [0, 0, 2, 3, 2, 2]
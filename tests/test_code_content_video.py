@@ -70,3 +70,50 @@ def test_gen_video_code_schema_confromance():
 def test_empty_frame_sigs():
     with pytest.raises(ValueError, match="frame_sigs cannot be empty"):
         iscc_core.code_content_video.soft_hash_video_v0([])
+
+
+def _frame_sigs(n=60):
+    fa = tuple([0, 1, 0, 2, 1] * 76)
+    fb = tuple([1, 2, 1, 0, 2] * 76)
+    fc = tuple(range(380))
+    return [(fa, fb, fc)[i % 3] if i < n // 2 else (fa, fb)[i % 2] for i in range(n)]
+
+
+def _records(segments, bits):
+    size = bits // 8
+    digests = segments["digests"]
+    assert len(digests) == len(segments["starts"]) * size
+    assert segments["starts"].typecode == segments["ends"].typecode == "Q"
+    chunks = [digests[i : i + size] for i in range(0, len(digests), size)]
+    return list(zip(segments["starts"], segments["ends"], chunks))
+
+
+def test_soft_hash_video_segments_v0_sliding():
+    sigs = _frame_sigs()
+    segments = iscc_core.soft_hash_video_segments_v0(sigs, window=20, step=15, bits=128)
+    records = _records(segments, 128)
+    assert [(s, e) for s, e, _ in records] == [(0, 20), (15, 35), (30, 50), (45, 60)]
+    for start, end, digest in records:
+        assert digest == iscc_core.soft_hash_video_v0(sigs[start:end], bits=128)
+
+
+def test_soft_hash_video_segments_v0_window_exceeds_frames():
+    sigs = _frame_sigs(10)
+    segments = iscc_core.soft_hash_video_segments_v0(sigs, window=50, step=5)
+    assert _records(segments, 64) == [(0, 10, iscc_core.soft_hash_video_v0(sigs))]
+
+
+def test_soft_hash_video_segments_v0_cuts():
+    sigs = [list(sig) for sig in _frame_sigs()]
+    segments = iscc_core.soft_hash_video_segments_v0(sigs, cuts=[40, 0, 25, 25, 99], bits=256)
+    records = _records(segments, 256)
+    assert [(s, e) for s, e, _ in records] == [(0, 25), (25, 40), (40, 60)]
+    for start, end, digest in records:
+        assert digest == iscc_core.soft_hash_video_v0(sigs[start:end], bits=256)
+
+
+def test_soft_hash_video_segments_v0_raises():
+    with pytest.raises(ValueError, match="frame_sigs cannot be empty"):
+        iscc_core.soft_hash_video_segments_v0([])
+    with pytest.raises(ValueError, match="must be positive"):
+        iscc_core.soft_hash_video_segments_v0(_frame_sigs(), window=0)
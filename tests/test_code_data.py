@@ -89,3 +89,18 @@ def test_DataHasher(static_bytes):
 def test_gen_data_code_schema_conformance():
     iscc_obj = iscc_core.gen_data_code_v0(BytesIO(b"\xff"))
     assert iscc_obj == {"iscc": "ISCC:GAAV5ZIQC4WCUBIK"}
+
+
+def test_gen_code_data_v0_granular(static_bytes):
+    dc_obj = iscc_core.code_data.gen_data_code_v0(BytesIO(static_bytes), granular=True)
+    assert dc_obj["iscc"] == "ISCC:GAA6LM626EIYZ4E4"
+    assert sum(dc_obj["sizes"]) == len(static_bytes)
+    assert len(dc_obj["offsets"]) == len(dc_obj["sizes"]) == len(dc_obj["features"])
+    for offset, size, feature in zip(dc_obj["offsets"], dc_obj["sizes"], dc_obj["features"]):
+        chunk = static_bytes[offset : offset + size]
+        assert iscc_core.code_data.xxhash.xxh32_intdigest(chunk) == feature
+
+
+def test_DataHasherV0_granular_empty():
+    hasher = iscc_core.code_data.DataHasherV0()
+    assert hasher.granular() == dict(offsets=[0], sizes=[0], features=[46947589])
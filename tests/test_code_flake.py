@@ -1,3 +1,5 @@
+import threading
+import time
 import pytest
 import iscc_core as ic
 
@@ -82,3 +84,79 @@ def test_Flake_ordered():
     f2 = ic.Flake()
     assert f1 < f2
     assert f2 > f1
+
+
+def test_uid_flake_v0_same_ts_sequential():
+    a, b = ic.uid_flake_v0(TS), ic.uid_flake_v0(TS)
+    assert a[:6] == b[:6]
+    assert int.from_bytes(b, "big") == int.from_bytes(a, "big") + 1
+
+
+def test_FlakeGenerator_raises():
+    with pytest.raises(ValueError):
+        ic.FlakeGenerator(bits=32)
+    with pytest.raises(ValueError):
+        ic.FlakeGenerator(bits=96 + 8)
+
+
+def test_FlakeGenerator_next_batch_monotonic():
+    gen = ic.FlakeGenerator()
+    flakes = [gen.next() for _ in range(10)] + gen.next_batch(200_000) + [gen.next()]
+    assert all(len(flake) == 8 for flake in flakes)
+    assert flakes == sorted(flakes)
+    assert len(set(flakes)) == len(flakes)
+
+
+def test_FlakeGenerator_counter_overflow_advances_time():
+    gen = ic.FlakeGenerator(bits=64)
+    flakes = gen.next_batch(70_000, ts=TS)
+    assert flakes == sorted(set(flakes))
+    times = {int.from_bytes(flake[:6], "big") for flake in flakes}
+    assert min(times) == int(TS * 1000)
+    assert len(times) in (2, 3)
+
+
+def test_FlakeGenerator_clock_step_back():
+    gen = ic.FlakeGenerator(bits=128)
+    first = gen.next()
+    gen._clock[0] += 60000
+    assert gen.next() > first
+    future = gen.next(ts=time.time() + 3600)
+    clock_ms = int.from_bytes(gen.next()[:6], "big")
+    assert gen.next() < future
+    assert abs(clock_ms - time.time() * 1000) < 60000 + 5000
+    past = gen.next(ts=TS)
+    assert past[:6] == int(TS * 1000).to_bytes(6, "big")
+
+
+def test_uid_flake_v0_explicit_ts_keeps_clock():
+    ic.uid_flake_v0(ts=4e9, bits=64)
+    stamp = int.from_bytes(ic.uid_flake_v0(bits=64)[:6], "big")
+    assert abs(stamp - time.time() * 1000) < 5000
+
+
+def test_FlakeGenerator_packed():
+    gen = ic.FlakeGenerator(bits=96)
+    packed = gen.next_batch(100, ts=TS, packed=True)
+    assert len(packed) == 100 * 12
+    flakes = [packed[i : i + 12] for i in range(0, len(packed), 12)]
+    assert flakes == sorted(set(flakes))
+    assert gen.next_batch(0) == []
+
+
+def test_FlakeGenerator_threads():
+    gen = ic.FlakeGenerator()
+    results = []
+
+    def worker():
+        flakes = [gen.next() for _ in range(5000)] + gen.next_batch(5000)
+        results.append(flakes)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    flakes = [flake for result in results for flake in result]
+    assert len(set(flakes)) == len(flakes) == 40_000
+    assert all(result == sorted(result) for result in results)
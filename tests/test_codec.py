@@ -1081,3 +1081,154 @@ def test_validate_invalid_maintype_version_combinations():
     # Verify that valid ID-V1 still passes
     valid_idv1 = ic.gen_iscc_id_v1(1647312000000000, 42, realm_id=0)["iscc"]
     assert ic.iscc_validate(valid_idv1, strict=True) is True
+
+
+def test_header_tables_match_varnibble_coding():
+    for fields, header in ic.codec._HEADER_ENCODE.items():
+        assert ic.codec._encode_header_varnibble(*fields) == header
+        assert ic.encode_header(*fields) == header
+        data = header + b"\xff\x00\x01"
+        assert ic.decode_header(data) == ic.codec._decode_header_varnibble(data)
+        assert ic.decode_header(data) == fields + (b"\xff\x00\x01",)
+
+
+def test_header_tables_fallback():
+    # MainType 8 is not part of the lookup tables
+    header = ic.encode_header(8, 0, 0, 1)
+    assert header == ic.codec._encode_header_varnibble(8, 0, 0, 1)
+    assert ic.decode_header(header + b"\x01") == (8, 0, 0, 1, b"\x01")
+
+
+def test_decode_header_accepts_buffers():
+    data = ic.decode_base32("AAAWKLHFPV6OPKDG")
+    expected = ic.decode_header(data)
+    assert ic.decode_header(bytearray(data)) == expected
+    assert ic.decode_header(memoryview(data)) == expected
+
+
+def test_encode_base32_many():
+    records = [bytes([i]) * 10 for i in range(5)]
+    assert ic.encode_base32_many(b"".join(records), 10) == [ic.encode_base32(r) for r in records]
+    records = [bytes(range(i, i + 34)) for i in range(3)]
+    data = bytearray(b"".join(records))
+    assert ic.encode_base32_many(data, 34) == [ic.encode_base32(r) for r in records]
+    assert ic.encode_base32_many(b"", 8) == []
+
+
+def test_encode_base32_many_raises():
+    with pytest.raises(ValueError, match="not a multiple"):
+        ic.encode_base32_many(b"\x00" * 11, 10)
+    with pytest.raises(ValueError, match="not a multiple"):
+        ic.encode_base32_many(b"\x00", 0)
+
+
+def test_decode_base32_many():
+    codes = [
+        "AAAWKLHFPV6OPKDG",
+        "ISCC:EAASKDNZNYGUUF5A",
+        "gaasl4f2wzy7kbxb",
+        "iscc:EAASKDNZNYGUUF5A",
+    ]
+    expected = b"".join(ic.decode_base32(ic.iscc_clean(c)) for c in codes)
+    assert ic.decode_base32_many(codes) == expected
+    codes = [ic.Code.rnd(mt=ic.MT.DATA, bits=256).code for _ in range(4)]
+    assert ic.decode_base32_many(codes) == b"".join(ic.decode_base32(c) for c in codes)
+    assert ic.decode_base32_many([]) == b""
+
+
+def test_decode_base32_many_raises():
+    with pytest.raises(ValueError, match="equal length"):
+        ic.decode_base32_many(["AAAWKLHFPV6OPKDG", "AAAWKLHFPV6OPKD"])
+    with pytest.raises(ValueError, match="Incorrect padding"):
+        ic.decode_base32_many(["AAAWKLHFP"])
+    for invalid in ("AAAWKLHFPV6OPKD1", "AAAWKLHFPV6OPKD_", "AAAWKLHFPV6OPKDÄ", "AAAWKLHF V6OPKDG"):
+        with pytest.raises(ValueError, match="Non-base32 digit"):
+            ic.decode_base32_many([invalid])
+    with pytest.raises(ValueError, match="Non-base32 digit"):
+        ic.decode_base32_many(["ABCD:EAASKDNZNYGUUF5A"])
+
+
+def test_normalize_composite_rewrites_header():
+    data, instance = ic.Code.rnd(mt=ic.MT.DATA), ic.Code.rnd(mt=ic.MT.INSTANCE)
+    meta = ic.Code.rnd(mt=ic.MT.META)
+    for units, st in (((), ic.ST_ISCC.SUM), ((ic.MT.META,), ic.ST_ISCC.NONE)):
+        body = (meta.hash_bytes if units else b"") + data.hash_bytes + instance.hash_bytes
+        # Non-canonical SubType TEXT without a Content-Code in the composite
+        raw = ic.encode_header(ic.MT.ISCC, ic.ST_ISCC.TEXT, 0, ic.encode_units(units)) + body
+        expected = ic.encode_header(ic.MT.ISCC, st, 0, ic.encode_units(units)) + body
+        assert ic.iscc_normalize(ic.encode_base32(raw)) == "ISCC:" + ic.encode_base32(expected)
+
+
+def test_normalize_truncated_composite():
+    code = ic.Code.rnd(mt=ic.MT.ISCC, bits=256)
+    truncated = ic.encode_base32(code.bytes[:-8])
+    assert ic.iscc_normalize(truncated) == ic.iscc_normalize("-".join(ic.iscc_decompose(truncated)))
+
+
+def test_normalize_truncated_unit():
+    truncated = ic.encode_base32(ic.decode_base32("AAATTZCKVH3S42TP")[:-2])
+    assert ic.iscc_normalize(truncated) == "ISCC:" + ic.iscc_decompose(truncated)[0]
+
+
+def test_normalize_mf_bad_prefix():
+    with pytest.raises(ValueError, match="invalid prefix"):
+        ic.iscc_normalize("f" + (ic.MC_PREFIX + ic.decode_base32("LA22222222")).hex())
+
+
+def test_normalize_many():
+    codes = ["GAAW2PRCRS5LNVZV-IAAUVACQKXE3V44W", "aaattzckvh3s42tp", "ISCC:AAATTZCKVH3S42TP"]
+    assert ic.iscc_normalize_many(codes) == [ic.iscc_normalize(c) for c in codes]
+    codes = ["aaattzckvh3s42tp", "ISCC:AAATTZCKVH3S42TP"]
+    assert ic.iscc_normalize_many(codes) == ["ISCC:AAATTZCKVH3S42TP"] * 2
+    assert ic.iscc_normalize_many([]) == []
+
+
+def test_iscc_validate_many():
+    valid = [ic.Code.rnd(mt=mt).code for mt in (ic.MT.META, ic.MT.DATA, ic.MT.INSTANCE)]
+    valid += ["ISCC:" + ic.Code.rnd(mt=ic.MT.ISCC, bits=256).code, "ISCC:MMAMRVPW22XVU4FR"]
+    codes = [
+        "ISCC:" + valid[0],
+        "ISCC:" + valid[1],
+        "ISCC:" + valid[2],
+        valid[3],
+        valid[4],
+        "ISCC:AAAWKLHFPV6OPK",  # truncated -> incorrect padding
+        "ISCC:aaawklhfpv6opkdg",  # lower case
+        "ISCC:ZZAWKLHFPV6OPKDG",  # invalid prefix
+        "ISCC:CE22222222",  # version
+        "ISCC:" + ic.encode_base32(ic.encode_header(0, 0, 1, 1) + b"\x00" * 8),  # version
+        "ISCC:" + ic.encode_base32(ic.encode_header(0, 0, 0, 1) + b"\x00" * 7),  # length
+        "ISCC:" + ic.encode_base32(ic.encode_header(6, 0, 0, 3) + b"\x00" * 11),  # ID length
+        "ISCC:" + ic.encode_base32(ic.encode_header(0, 0, 0, 9) + b"\x00" * 16),  # wide length
+    ]
+    mask, reasons = ic.iscc_validate_many(codes)
+    expected = [ic.VR.VALID] * 5 + [ic.VR.BASE32, ic.VR.FORMAT, ic.VR.PREFIX]
+    expected += [ic.VR.VERSION] * 2 + [ic.VR.LENGTH] * 3
+    assert list(reasons) == expected
+    assert mask.tolist() == [1] * 5 + [0] * 8
+    # `iscc_validate` raises for the last two codes with unsupported length values
+    for code, ok in zip(codes[:-2], mask):
+        assert ic.iscc_validate(code, strict=False) is bool(ok)
+
+
+def test_iscc_validate_many_noncanonical_header():
+    # Header in WIDE subtype not covered by the header lookup table
+    raw = ic.encode_header(ic.MT.ISCC, ic.ST_ISCC.WIDE, 0, 0) + b"\x00" * 32
+    assert ic.iscc_validate_many(["ISCC:" + ic.encode_base32(raw)])[1].tolist() == [ic.VR.VALID]
+    # Header with an invalid varnibble prefix pattern
+    raw = bytes([0b00000000, 0b00001111]) + b"\x00" * 8
+    assert ic.iscc_validate_many(["ISCC:" + ic.encode_base32(raw)])[1].tolist() == [ic.VR.HEADER]
+
+
+def test_iscc_validate_many_empty():
+    mask, reasons = ic.iscc_validate_many([])
+    assert len(mask) == 0 and len(reasons) == 0
+
+
+def test_decode_base32_padded_and_empty():
+    assert ic.decode_base32("") == b""
+    assert ic.decode_base32("MFRGG===") == b"abc"
+    with pytest.raises(ValueError):
+        ic.decode_base32("MFRG=G")
+    with pytest.raises(ValueError, match="Non-base32 digit"):
+        ic.decode_base32("MFRGG1A")
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import io
+import random
+import pytest
+import iscc_core as ic
+from iscc_core.index_chunk import ChunkIndex
+
+
+def random_bytes(n, seed):
+    return random.Random(seed).randbytes(n)
+
+
+def granular(data):
+    return ic.gen_data_code(io.BytesIO(data), granular=True)
+
+
+def test_chunk_index_containment_and_coverage():
+    files = [random_bytes(200_000, seed) for seed in range(5)]
+    index = ChunkIndex()
+    for key, data in enumerate(files):
+        index.add(granular(data), key)
+    assert len(index) == 5 and 3 in index
+    # Truncated copy: most query bytes are in file 1
+    results = index.query(granular(files[1][:80_000]))
+    assert results[0]["key"] == 1
+    assert results[0]["containment"] > 0.9
+    assert 0.3 < results[0]["coverage"] < 0.45
+    # Embedded copy: file 2 is fully contained in the query
+    query = granular(random_bytes(50_000, 99) + files[2] + random_bytes(50_000, 98))
+    results = index.query(query, min_share=0.9)
+    assert [r["key"] for r in results] == [2]
+    assert results[0]["coverage"] > 0.95
+    assert 0.6 < results[0]["containment"] < 0.7
+    # Unrelated data
+    assert index.query(granular(random_bytes(100_000, 77))) == []
+
+
+def test_chunk_index_locate():
+    data = random_bytes(100_000, 1)
+    index = ChunkIndex()
+    index.add(granular(data), "a")
+    prefix = random_bytes(30_000, 2)
+    runs = index.locate(granular(prefix + data), "a")
+    assert len(runs) == 1
+    query_offset, file_offset, length = runs[0]
+    assert query_offset - file_offset == len(prefix)
+    assert length > 95_000
+    query = prefix + data
+    assert query[query_offset : query_offset + length] == data[file_offset : file_offset + length]
+    with pytest.raises(KeyError):
+        index.locate(granular(data), "b")
+
+
+def test_chunk_index_repeated_chunks():
+    block = random_bytes(20_000, 3)
+    index = ChunkIndex()
+    index.add(granular(block), "once")
+    index.add(granular(block + block), "twice")
+    results = {r["key"]: r for r in index.query(granular(block))}
+    assert results["once"]["shared"] == results["twice"]["shared"]
+    assert results["once"]["containment"] == pytest.approx(1.0)
+    assert results["twice"]["coverage"] < 0.6
+    runs = index.locate(granular(block), "twice")
+    assert runs[0][:2] == (0, 0)
+
+
+def test_chunk_index_stop_features():
+    index = ChunkIndex(max_postings=3)
+    common = granular(random_bytes(5000, 4))
+    for key in range(4):
+        index.add(common, key)
+    assert set(common["features"]) <= index.stop_features
+    assert index.query(common) == []
+    assert index.locate(common, 0) == []
+    index.remove(0)
+    index.add(common, 9)
+    assert index.query(common) == []
+
+
+def test_chunk_index_remove_and_replace():
+    a, b = granular(random_bytes(30_000, 5)), granular(random_bytes(30_000, 6))
+    index = ChunkIndex()
+    index.add(a, "x")
+    index.add(a, "y")
+    index.add(b, "x")
+    assert [r["key"] for r in index.query(a)] == ["y"]
+    assert [r["key"] for r in index.query(b)] == ["x"]
+    index.remove("y")
+    assert index.query(a) == [] and len(index) == 1
+    with pytest.raises(KeyError):
+        index.remove("y")
+
+
+def test_chunk_index_empty_and_invalid():
+    index = ChunkIndex()
+    empty = granular(b"")
+    assert empty["sizes"] == [0]
+    index.add(empty, "empty")
+    assert index.query(empty) == []
+    with pytest.raises(ValueError):
+        index.add(dict(features=[1, 2], sizes=[1]), "bad")
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import pytest
+import iscc_core as ic
+from iscc_core.index_id import IsccIdIndex
+
+T0 = 1714503123456789
+
+
+def bodies(timestamps, hub_id=0):
+    return list(ic.iscc_id_v1_pack(timestamps, hub_id))
+
+
+def test_iscc_id_index_query():
+    index = IsccIdIndex(bodies(range(T0, T0 + 1000, 2), 1) + bodies(range(T0 + 1, T0 + 1000, 2), 2))
+    assert len(index) == 1000
+    assert list(index.bodies) == sorted(index.bodies)
+    assert index.count() == 1000
+    assert index.count(T0 + 10, T0 + 20) == 10
+    assert index.count(T0 + 20, T0 + 10) == 0
+    assert list(index.query(T0 + 10, T0 + 14, packed=True)) == [
+        T0 + 10 << 12 | 1,
+        T0 + 11 << 12 | 2,
+        T0 + 12 << 12 | 1,
+        T0 + 13 << 12 | 2,
+    ]
+    assert index.query(T0 + 10, T0 + 20, hub_id=2) == [
+        ic.gen_iscc_id_v1(ts, 2, 0)["iscc"] for ts in range(T0 + 11, T0 + 20, 2)
+    ]
+    assert index.query(end=T0 + 1, packed=True) == index.query(-5, T0 + 1, packed=True)
+    assert len(index.query(start=T0 + 995)) == 5
+    assert index.query(T0 + 2000) == []
+
+
+def test_iscc_id_index_add():
+    issuer = ic.IsccIdIssuer(hub_id=9, realm_id=1)
+    isccs = issuer.issue_batch(200)
+    index = IsccIdIndex(realm_id=1)
+    index.add_many(isccs[100:])
+    index.add_many(isccs[150:160])
+    assert len(index) == 100
+    for iscc in reversed(isccs[:10]):
+        index.add(iscc)
+    index.add_many(isccs[::-1])
+    assert len(index) == 200
+    assert index.query() == isccs
+    assert isccs[5] in index
+    assert ic.iscc_id_v1_bodies([isccs[5]])[0] in index
+    assert 1 not in index
+    assert (2**52 - 1) << 12 not in index
+    index.add_many([])
+    index.add_many(issuer.issue_batch(5, packed=True))
+    assert len(index) == 205
+    assert len(index) == 205
+
+
+def test_iscc_id_index_merge_many():
+    index = IsccIdIndex(bodies(range(T0, T0 + 1000, 3)))
+    index.add_many(bodies(range(T0 + 500, T0 + 2000)))
+    index.add_many(bodies(range(T0 - 100, T0 + 100)))
+    assert list(index.bodies) == bodies(range(T0 - 100, T0 + 100)) + bodies(
+        [ts for ts in range(T0 + 100, T0 + 500) if not (ts - T0) % 3]
+    ) + bodies(range(T0 + 500, T0 + 2000))
+
+
+def test_iscc_id_index_raises():
+    with pytest.raises(ValueError, match="Realm-ID"):
+        IsccIdIndex(realm_id=2)
+    with pytest.raises(ValueError, match="realm 0"):
+        IsccIdIndex([ic.gen_iscc_id_v1(T0, 1, 1)["iscc"]])
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import io
+import random
+import pytest
+import iscc_core as ic
+from iscc_core.index_instance import InstanceIndex
+from iscc_core.iscc_file import IsccFileWriter
+
+
+def instance_codes(n, bits=64, seed=0):
+    ic.Code.rgen = random.Random(seed)
+    return [ic.Code.rnd(mt=ic.MT.INSTANCE, bits=bits) for _ in range(n)]
+
+
+@pytest.mark.parametrize("bits", [64, 128, 256])
+def test_instance_index_add_get(bits):
+    codes = instance_codes(2000, 256)
+    index = InstanceIndex(bits)
+    for value, code in enumerate(codes):
+        index.add(code, value)
+    assert len(index) == len(codes)
+    assert [index.get(code) for code in codes] == list(range(len(codes)))
+    assert all(code.uri in index for code in codes[:10])
+    assert index.get(codes[5].hash_bytes) == 5
+    for code in instance_codes(500, 256, seed=1):
+        assert index.get(code) is None
+    assert index.get(instance_codes(1, 256, seed=2)[0], -1) == -1
+
+
+def test_instance_index_datahash_and_prefix():
+    data = io.BytesIO(b"hello world")
+    result = ic.gen_instance_code_v0(data, bits=64)
+    index = InstanceIndex(64)
+    index.add(result["iscc"], 42)
+    assert index.get(result["datahash"]) == 42
+    assert index.get(ic.gen_instance_code_v0(io.BytesIO(b"hello world"), bits=256)["iscc"]) == 42
+    index.add(result["datahash"], 7)
+    assert len(index) == 1
+    assert index.get(result["iscc"]) == 7
+    index.add(bytes.fromhex(result["datahash"][4:]), 8)
+    assert index.get(result["iscc"]) == 8
+
+
+def test_instance_index_get_many():
+    codes = instance_codes(300)
+    index = InstanceIndex(capacity=100)
+    index.add_many(codes[:200], range(200))
+    expected = list(range(200)) + [None] * 100
+    assert index.get_many(codes) == expected
+    assert index.get_many(ic.IsccArray(codes)) == expected
+    index.add_many(ic.IsccArray(codes[200:]), range(200, 300))
+    assert index.get_many([c.uri for c in codes]) == list(range(300))
+    assert index.get_many(ic.IsccArray()) == []
+
+
+def test_instance_index_without_bloom_filter():
+    codes = instance_codes(100)
+    index = InstanceIndex(bloom_bits=0)
+    index.add_many(codes[:50], range(50))
+    assert index.get_many(codes) == list(range(50)) + [None] * 50
+
+
+def test_instance_index_invalid():
+    with pytest.raises(ValueError, match="must be 64, 128, 192 or 256"):
+        InstanceIndex(100)
+    index = InstanceIndex(128)
+    with pytest.raises(ValueError, match="Instance-Code expected not DATA-Code"):
+        index.add(ic.Code.rnd(mt=ic.MT.DATA, bits=128), 1)
+    with pytest.raises(ValueError, match="at least 128 bits not 64"):
+        index.add(instance_codes(1)[0], 1)
+    with pytest.raises(ValueError, match="at least 128 bits not 64"):
+        index.get(bytes(8))
+    with pytest.raises(ValueError, match="Instance-Codes expected"):
+        index.get_many(ic.IsccArray([ic.Code.rnd(mt=ic.MT.DATA, bits=128)]))
+    with pytest.raises(ValueError, match="Expected at least 128 bits"):
+        index.get_many(ic.IsccArray(instance_codes(2)))
+
+
+def test_instance_index_save_load(tmp_path):
+    codes = instance_codes(1000, 128)
+    for bits, bloom_bits in ((64, 10), (128, 0)):
+        index = InstanceIndex(bits, bloom_bits=bloom_bits)
+        index.add_many(codes[:500], range(500))
+        path = str(tmp_path / f"instances-{bits}.bin")
+        index.save(path)
+        loaded = InstanceIndex.load(path)
+        assert len(loaded) == 500
+        assert loaded.get_many(codes) == list(range(500)) + [None] * 500
+        loaded.add(codes[600], 600)
+        assert loaded.get(codes[600]) == 600
+
+
+def test_instance_index_load_invalid(tmp_path):
+    path = tmp_path / "instances.bin"
+    InstanceIndex().save(str(path))
+    data = path.read_bytes()
+    path.write_bytes(b"XXXXXXXX" + data[8:])
+    with pytest.raises(ValueError, match="Not an Instance-Code index file"):
+        InstanceIndex.load(str(path))
+    path.write_bytes(data[:8] + b"\x09\x00" + data[10:])
+    with pytest.raises(ValueError, match="Unsupported Instance-Code index version 9"):
+        InstanceIndex.load(str(path))
+
+
+def test_instance_index_from_iscc_file(tmp_path):
+    units = instance_codes(50, 64)
+    data = [ic.Code.rnd(mt=ic.MT.DATA, bits=64) for _ in range(5)]
+    iscc_codes = [ic.Code.rnd(mt=ic.MT.ISCC, bits=256) for _ in range(20)]
+    path = str(tmp_path / "codes.iscc")
+    with IsccFileWriter(path) as writer:
+        writer.write(units + data + iscc_codes)
+    index = InstanceIndex.from_iscc_file(path)
+    array = ic.IsccFile(path).array()
+    assert len(index) == 70
+    for row, code in enumerate(array):
+        if code.maintype == ic.MT.INSTANCE:
+            assert index.get(code) == row
+        elif code.maintype == ic.MT.ISCC:
+            instance = ic.iscc_decompose(code.code)[-1]
+            assert index.get(instance) == row
+    assert len(InstanceIndex.from_iscc_file(path, bits=128)) == 0
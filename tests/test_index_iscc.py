@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import io
+import random
+import pytest
+import iscc_core as ic
+from iscc_core.index_iscc import IsccIndex
+
+
+def unit(mt, st, body, bits=64):
+    length = ic.encode_length(mt, bits)
+    return ic.Code((mt, st, ic.VS.V0, length, body.to_bytes(bits // 8, "big"))).code
+
+
+def flip(body, n, rgen, bits=64):
+    for _ in range(n):
+        body ^= 1 << rgen.randrange(bits)
+    return body
+
+
+def collection(n=120, seed=0):
+    rgen = random.Random(seed)
+    originals = [[rgen.getrandbits(64) for _ in range(4)] for _ in range(10)]
+    codes = []
+    for _ in range(n):
+        meta, content, data, instance = rgen.choice(originals)
+        units = [
+            unit(ic.MT.META, ic.ST.NONE, flip(meta, rgen.randint(0, 20), rgen)),
+            unit(ic.MT.CONTENT, ic.ST_CC.TEXT, flip(content, rgen.randint(0, 20), rgen)),
+            unit(ic.MT.DATA, ic.ST.NONE, flip(data, rgen.randint(0, 20), rgen)),
+            unit(ic.MT.INSTANCE, ic.ST.NONE, flip(instance, rgen.randint(0, 1), rgen)),
+        ]
+        codes.append(ic.gen_iscc_code_v0(units)["iscc"])
+    return codes
+
+
+def test_iscc_index_matches_compare():
+    codes = collection()
+    index = IsccIndex(instance_shortcut=False)
+    for key, code in enumerate(codes):
+        index.add(code, key)
+    assert len(index) == len(codes)
+    for query in codes[:5]:
+        results = index.query(query, limit=len(codes))
+        assert results[0]["score"] == 1.0
+        for result in results:
+            expected = ic.iscc_compare(query, codes[result["key"]])
+            assert {k: v for k, v in result.items() if k not in ("key", "score")} == expected
+        found = {result["key"] for result in results}
+        for key, code in enumerate(codes):
+            dists = ic.iscc_compare(query, code)
+            close = dists["instance_match"] or any(
+                v <= 12 for k, v in dists.items() if k.endswith("_dist")
+            )
+            assert close == (key in found)
+
+
+def test_iscc_index_fused_score_and_weights():
+    code_a = collection(1, seed=1)[0]
+    meta, content, data, instance = ic.iscc_decompose(code_a)
+    other_meta = unit(ic.MT.META, ic.ST.NONE, ic.Code(meta).hash_uint ^ 0xFF)
+    code_b = ic.gen_iscc_code_v0([other_meta, content, data, instance])["iscc"]
+    index = IsccIndex()
+    index.add(code_b, "b")
+    result = index.query(code_a)[0]
+    assert result["meta_dist"] == 8
+    assert result["score"] == pytest.approx(1 - 8 / 64 / 4)
+    weighted = IsccIndex(weights={ic.MT.META: 0.0})
+    weighted.add(code_b, "b")
+    assert weighted.query(code_a)[0]["score"] == 1.0
+    assert index.query(code_a, min_score=0.99) == []
+
+
+def test_iscc_index_instance_shortcut():
+    codes = collection(40, seed=2)
+    index = IsccIndex()
+    for key, code in enumerate(codes):
+        index.add(code, key)
+    query = codes[0]
+    results = index.query(query, limit=100)
+    assert results
+    assert all(result["instance_match"] for result in results)
+    assert len(IsccIndex(instance_shortcut=False)._decompose(query)) == 4
+
+
+def test_iscc_index_units_and_prefix():
+    data = ic.Code.rnd(mt=ic.MT.DATA, bits=128)
+    short = unit(ic.MT.DATA, ic.ST.NONE, data.hash_uint >> 64)
+    index = IsccIndex()
+    index.add(data, "long")
+    index.add(short, "short")
+    assert sorted(r["key"] for r in index.query(short)) == ["long", "short"]
+    assert index._score(index._decompose(short), "long")["data_dist"] == 0
+    image = ic.Code.rnd(mt=ic.MT.CONTENT, st=ic.ST_CC.IMAGE, bits=64)
+    assert index._score(index._decompose(image), "long")["score"] == 0.0
+
+
+def test_iscc_index_cross_length():
+    data = bytes(range(256)) * 200
+    meta = ic.gen_meta_code("Hello World")["iscc"]
+    data_64 = ic.gen_data_code(io.BytesIO(data))["iscc"]
+    data_256 = ic.gen_data_code(io.BytesIO(data), bits=256)["iscc"]
+    instance_64 = ic.gen_instance_code(io.BytesIO(data))["iscc"]
+    instance_256 = ic.gen_instance_code(io.BytesIO(data), bits=256)["iscc"]
+    code = ic.gen_iscc_code([meta, data_64, instance_64])["iscc"]
+    index = IsccIndex()
+    index.add(code, "a")
+    assert [r["key"] for r in index.query(instance_256)] == ["a"]
+    assert index.query(instance_256)[0]["instance_match"] is True
+    assert [r["key"] for r in index.query(data_256)] == ["a"]
+    assert index.query(data_256)[0]["data_dist"] == 0
+    index = IsccIndex()
+    index.add(instance_256, "instance")
+    index.add(data_256, "data")
+    assert [r["key"] for r in index.query(code)] == ["instance"]
+    index.instance_shortcut = False
+    assert sorted(r["key"] for r in index.query(code)) == ["data", "instance"]
+    index.remove("instance")
+    assert [r["key"] for r in index.query(code)] == ["data"]
+
+
+def test_iscc_index_remove_and_replace():
+    codes = collection(3, seed=3)
+    index = IsccIndex()
+    index.add(codes[0], "a")
+    index.add(codes[1], "a")
+    index.add(codes[1], "b")
+    assert "a" in index
+    index.remove("a")
+    assert [r["key"] for r in index.query(codes[1])] == ["b"]
+    index.remove("b")
+    assert index._instances == {}
+    assert index.query(codes[1]) == []
+    with pytest.raises(KeyError):
+        index.remove("b")
+
+
+def test_iscc_index_rejects_ids():
+    with pytest.raises(ValueError, match="ISCC-IDs are not supported"):
+        IsccIndex().add(ic.gen_iscc_id_v1(1000, 0)["iscc"], 1)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import random
+import pytest
+import iscc_core as ic
+from iscc_core.index_knn import KnnIndex
+
+pytestmark = pytest.mark.usefixtures("restore_rgen")
+
+
+def clustered(n, bits, seed=0):
+    rnd = random.Random(seed)
+    ic.Code.rgen = rnd
+    base = [ic.Code.rnd(ic.MT.CONTENT, st=0, bits=bits) for _ in range(n // 10)]
+    codes = []
+    for i in range(n):
+        body = base[i % len(base)].hash_uint
+        for _ in range(rnd.randint(0, 6)):
+            body ^= 1 << rnd.randrange(bits)
+        codes.append(ic.Code(base[0].bytes[:2] + body.to_bytes(bits // 8, "big")))
+    return codes, base
+
+
+def brute_force(shards, query, k, nph=False):
+    result = []
+    for shard, codes in enumerate(shards):
+        distances = ic.iscc_distance_many(query, codes, nph=nph)
+        result += [(dist, shard, row) for row, dist in enumerate(distances)]
+    return [(shard, row, dist) for dist, shard, row in sorted(result)[:k]]
+
+
+@pytest.mark.parametrize("bits", [64, 128, 256])
+def test_knn_index_matches_brute_force(bits):
+    codes, base = clustered(3000, bits)
+    index = KnnIndex(codes)
+    assert len(index) == 3000
+    queries = base[:10] + [ic.Code.rnd(ic.MT.CONTENT, st=0, bits=bits) for _ in range(5)]
+    for query in queries:
+        for k in (1, 10, 50):
+            expected = [(row, dist) for _, row, dist in brute_force([codes], query, k)]
+            assert index.knn(query, k) == expected
+    assert index.knn(queries[0].uri, 0) == []
+
+
+def test_knn_index_shards():
+    codes, base = clustered(2000, 64, seed=1)
+    shards = [codes[:700], codes[700:1500], codes[1500:]]
+    indexes = [KnnIndex(shard, prefix_bits=6) for shard in shards]
+    for query in base[:10]:
+        assert KnnIndex.knn_shards(indexes, query, 15) == brute_force(shards, query, 15)
+
+
+def test_knn_index_nph_mixed_lengths():
+    rnd = random.Random(2)
+    ic.Code.rgen = rnd
+    codes = []
+    for _ in range(500):
+        code = ic.Code.rnd(ic.MT.CONTENT, st=0, bits=256)
+        codes.append(code)
+        for bits in (64, 128):
+            codes.append(ic.Code(ic.encode_component(*tuple(code)[:3], bits, code.hash_bytes)))
+    rnd.shuffle(codes)
+    index = KnnIndex(ic.IsccArray(codes))
+    for query in codes[:10] + [ic.Code.rnd(ic.MT.CONTENT, st=0, bits=32)]:
+        expected = [(row, dist) for _, row, dist in brute_force([codes], query, 10, nph=True)]
+        assert index.knn(query, 10, nph=True) == expected
+    with pytest.raises(AssertionError):
+        index.knn(codes[0], 10)
+
+
+def test_knn_index_invalid():
+    codes, _ = clustered(100, 64, seed=3)
+    index = KnnIndex(codes)
+    with pytest.raises(ValueError):
+        index.knn(ic.Code.rnd(ic.MT.DATA, bits=64), 5)
+    with pytest.raises(AssertionError):
+        index.knn(ic.Code.rnd(ic.MT.CONTENT, st=0, bits=128), 5)
+    with pytest.raises(ValueError):
+        KnnIndex(codes + [ic.Code.rnd(ic.MT.DATA, bits=64)])
+    with pytest.raises(ValueError):
+        KnnIndex([ic.gen_iscc_id_v1(1000, 0)["iscc"]])
+    assert KnnIndex([]).knn(codes[0], 5) == []
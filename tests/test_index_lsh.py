@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import random
+import pytest
+import iscc_core as ic
+from iscc_core.index_lsh import LshIndex
+
+
+def feature_sets(n=60, seed=0):
+    rgen = random.Random(seed)
+    base = [{rgen.getrandbits(32) for _ in range(100)} for _ in range(3)]
+    docs = []
+    for _ in range(n):
+        keep = rgen.uniform(0.6, 1.0)
+        doc = {f for f in rgen.choice(base) if rgen.random() < keep}
+        docs.append(doc | {rgen.getrandbits(32) for _ in range(rgen.randint(0, 20))})
+    return docs
+
+
+def data_code(mhash, lsb):
+    body = ic.alg_minhash_compress(mhash, lsb)
+    return ic.Code((ic.MT.DATA, ic.ST.NONE, ic.VS.V0, lsb * 2 - 1, body))
+
+
+def test_lsh_query_data_codes():
+    docs = feature_sets()
+    codes = [data_code(ic.alg_minhash(list(doc)), 4) for doc in docs]
+    index = LshIndex(8, 8)
+    for key, code in enumerate(codes):
+        index.add(code.uri, key)
+    assert len(index) == len(codes)
+    result = index.query(codes[0])
+    assert result[0] == (0, 1.0)
+    assert [j for _, j in result] == sorted((j for _, j in result), reverse=True)
+    assert {key for key, _ in result} == index.candidates(codes[0])
+    assert all(j >= 0.5 for _, j in index.query(codes[0], threshold=0.5))
+
+
+def test_lsh_jaccard_estimate():
+    docs = feature_sets()
+    vectors = [ic.alg_minhash(list(doc)) for doc in docs]
+    index = LshIndex()
+    for key, vector in enumerate(vectors):
+        index.add(vector, key)
+    assert index.lsb == 32
+    errors = []
+    for key, jaccard in index.query(vectors[1]):
+        expected = len(docs[1] & docs[key]) / len(docs[1] | docs[key])
+        errors.append(abs(expected - jaccard))
+    assert sum(errors) / len(errors) < 0.1
+
+
+def test_lsh_text_code_and_b_bit_correction():
+    text = ic.gen_text_code_v0("Hello World " * 20, bits=64)["iscc"]
+    index = LshIndex(4, 16)
+    assert index.candidates(text) == set()
+    assert index.jaccard(text, text) == 1.0
+    assert index.lsb is None  # read only estimates don't bind the index
+    other = ic.Code((ic.MT.CONTENT, ic.ST_CC.TEXT, ic.VS.V0, 1, bytes(8)))
+    inverse = ic.Code((ic.MT.CONTENT, ic.ST_CC.TEXT, ic.VS.V0, 1, b"\xff" * 8))
+    assert index.jaccard(other, inverse) == 0.0
+    assert index.jaccard(other, 2**64 - 1) == 0.0
+    with pytest.raises(ValueError, match="unknown"):
+        index.jaccard(0, 2**64 - 1)
+    with pytest.raises(ValueError, match="Expected 1 bits"):
+        index.jaccard(other, ic.gen_text_code_v0("Hello", bits=128)["iscc"])
+    index.add(text, "text")
+    assert index.lsb == 1
+    assert index.jaccard(0, 2**64 - 1) == 0.0
+
+
+def test_lsh_remove():
+    codes = [data_code(ic.alg_minhash(list(doc)), 1) for doc in feature_sets(5)]
+    index = LshIndex(4, 16)
+    index.add(codes[0], "a")
+    index.add(codes[0], "b")
+    index.add(codes[1], "b")
+    assert "b" in index
+    index.remove("a")
+    index.remove("b")
+    assert all(not table for table in index._tables)
+    with pytest.raises(KeyError):
+        index.remove("a")
+
+
+def test_lsh_invalid_signatures():
+    index = LshIndex()
+    with pytest.raises(ValueError, match="Data-Code or Text-Code expected"):
+        index.add(ic.Code.rnd(mt=ic.MT.CONTENT, st=ic.ST_CC.IMAGE, bits=64), 1)
+    with pytest.raises(ValueError, match="multiple of 64 bits"):
+        index.add(ic.Code.rnd(mt=ic.MT.DATA, bits=32), 1)
+    index.add(ic.Code.rnd(mt=ic.MT.DATA, bits=64), 1)
+    with pytest.raises(ValueError, match="Expected 1 bits per minhash value not 4"):
+        index.query(ic.Code.rnd(mt=ic.MT.DATA, bits=256))
+    with pytest.raises(ValueError, match="bands \\* rows"):
+        LshIndex(16, 5)
+
+
+def test_lsh_probability_and_optimal():
+    assert LshIndex.probability(1.0, 8, 8) == 1.0
+    assert LshIndex.probability(0.0, 8, 8) < 1e-60
+    assert LshIndex.probability(0.0, 8, 8, lsb=1) > 0.03
+    strict = LshIndex.optimal(0.9)
+    loose = LshIndex.optimal(0.3)
+    assert strict.rows > loose.rows
+    assert strict.bands * strict.rows <= 64
+    recall = LshIndex.optimal(0.8, fp_weight=0.1)
+    precision = LshIndex.optimal(0.8, fp_weight=0.9)
+    assert LshIndex.probability(0.7, recall.bands, recall.rows) > LshIndex.probability(
+        0.7, precision.bands, precision.rows
+    )
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import random
+import pytest
+import iscc_core as ic
+from iscc_core.index_mih import MihIndex
+
+
+def noisy_codes(bits, n=300, seed=0):
+    rgen = random.Random(seed)
+    length = ic.encode_length(ic.MT.CONTENT, bits)
+    centers = [rgen.getrandbits(bits) for _ in range(5)]
+    codes = []
+    for _ in range(n):
+        body = rgen.choice(centers)
+        for _ in range(rgen.randint(0, bits // 4)):
+            body ^= 1 << rgen.randrange(bits)
+        body = body.to_bytes(bits // 8, "big")
+        codes.append(ic.Code((ic.MT.CONTENT, ic.ST_CC.IMAGE, ic.VS.V0, length, body)))
+    return codes
+
+
+def brute_force(query, codes, radius):
+    distances = [ic.iscc_distance_bytes(query.hash_bytes, c.hash_bytes) for c in codes]
+    return sorted(d for d in distances if d <= radius)
+
+
+@pytest.mark.parametrize("bits", [64, 256])
+def test_mih_query_matches_brute_force(bits):
+    codes = noisy_codes(bits)
+    index = MihIndex(bits)
+    for key, code in enumerate(codes):
+        index.add(code, key)
+    assert len(index) == len(codes)
+    for query in codes[:5]:
+        for radius in (0, 3, bits // 16, bits // 8, bits // 4):
+            result = index.query(query, radius)
+            assert [d for _, d in result] == brute_force(query, codes, radius)
+            for key, dist in result:
+                assert ic.iscc_distance_bytes(query.hash_bytes, codes[key].hash_bytes) == dist
+
+
+@pytest.mark.parametrize("bits", [64, 256])
+def test_mih_knn_matches_brute_force(bits):
+    codes = noisy_codes(bits)
+    index = MihIndex(bits)
+    for key, code in enumerate(codes):
+        index.add(code.uri, key)
+    for query in codes[:5]:
+        result = index.knn(query, 7)
+        assert [d for _, d in result] == brute_force(query, codes, bits)[:7]
+
+
+def test_mih_knn_small_index():
+    codes = noisy_codes(64, n=3)
+    index = MihIndex(64, m=2)
+    assert index.knn(codes[0], 5) == []
+    for key, code in enumerate(codes):
+        index.add(code, key)
+    assert sorted(key for key, _ in index.knn(codes[0], 5)) == [0, 1, 2]
+
+
+def test_mih_duplicates_and_remove():
+    code = noisy_codes(64, n=1)[0]
+    index = MihIndex()
+    index.add(code, "a")
+    index.add(code, "b")
+    index.add(code, "b")
+    assert "a" in index
+    assert index.query(code, 0) == [("a", 0), ("b", 0)]
+    index.remove("a")
+    assert index.query(code, 0) == [("b", 0)]
+    index.remove("b")
+    assert index.query(code, 0) == []
+    assert all(not table for table in index._tables)
+    with pytest.raises(KeyError):
+        index.remove("b")
+
+
+def test_mih_incompatible_codes():
+    index = MihIndex()
+    assert index.query(ic.Code.rnd(mt=ic.MT.DATA, bits=64), 5) == []
+    index.add(ic.Code.rnd(mt=ic.MT.CONTENT, st=ic.ST_CC.IMAGE, bits=64), 1)
+    with pytest.raises(ValueError, match="headers don´t match"):
+        index.add(ic.Code.rnd(mt=ic.MT.CONTENT, st=ic.ST_CC.AUDIO, bits=64), 2)
+    with pytest.raises(ValueError, match="Expected body of 64 bits"):
+        MihIndex().add(ic.Code.rnd(mt=ic.MT.CONTENT, bits=128), 1)
+    with pytest.raises(ValueError, match="ISCC-IDv1"):
+        MihIndex().add(ic.gen_iscc_id_v1(1000, 0)["iscc"], 1)
+    with pytest.raises(ValueError, match="not divisible"):
+        MihIndex(64, m=5)
+
+
+def test_mih_memory():
+    index = MihIndex()
+    empty = index.memory()
+    for key, code in enumerate(noisy_codes(64, n=100)):
+        index.add(code, key)
+    memory = index.memory()
+    assert memory["total"] == memory["tables"] + memory["entries"]
+    assert memory["total"] > empty["total"]
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+import json
+import random
+import threading
+import pytest
+import iscc_core as ic
+from iscc_core.index_mmap import MmapIndex, SEGMENT
+
+
+def image_code(body, bits=64):
+    length = ic.encode_length(ic.MT.CONTENT, bits)
+    return ic.Code(
+        (ic.MT.CONTENT, ic.ST_CC.IMAGE, ic.VS.V0, length, body.to_bytes(bits // 8, "big"))
+    )
+
+
+def noisy_bodies(n, bits=64, seed=0):
+    rgen = random.Random(seed)
+    centers = [rgen.getrandbits(bits) for _ in range(5)]
+    bodies = []
+    for _ in range(n):
+        body = rgen.choice(centers)
+        for _ in range(rgen.randint(0, bits // 4)):
+            body ^= 1 << rgen.randrange(bits)
+        bodies.append(body)
+    return centers, bodies
+
+
+def assert_matches(index, truth, centers, bits=64):
+    assert len(index) == len(truth)
+    for query in centers:
+        for radius in (0, bits // 16, bits // 8, bits // 4):
+            result = sorted(
+                (dist, key) for key, dist in index.query(image_code(query, bits), radius)
+            )
+            expected = [
+                (
+                    ic.iscc_distance_bytes(
+                        query.to_bytes(bits // 8, "big"), b.to_bytes(bits // 8, "big")
+                    ),
+                    k,
+                )
+                for k, b in truth.items()
+            ]
+            assert result == sorted(e for e in expected if e[0] <= radius)
+        knn = index.knn(image_code(query, bits), 5)
+        assert [dist for _, dist in knn] == sorted(e[0] for e in expected)[:5]
+
+
+@pytest.mark.parametrize("bits", [64, 256])
+def test_mmap_index_updates(tmp_path, bits):
+    centers, bodies = noisy_bodies(600, bits)
+    rgen = random.Random(1)
+    truth = {}
+    index = MmapIndex(str(tmp_path), bits)
+    for step in range(4):
+        for body in bodies[step * 150 : (step + 1) * 150]:
+            key = rgen.randrange(400)
+            index.add(image_code(body, bits), key)
+            truth[key] = body
+        for key in rgen.sample(sorted(truth), 20):
+            index.remove(key)
+            del truth[key]
+        assert_matches(index, truth, centers, bits)
+        index.flush()
+    assert len(index._segments) == 4
+    reader = MmapIndex(str(tmp_path), readonly=True)
+    assert reader.bits == bits
+    assert_matches(reader, truth, centers, bits)
+    index.compact()
+    assert len(index._segments) == 1
+    assert_matches(index, truth, centers, bits)
+    reader.refresh()
+    assert_matches(reader, truth, centers, bits)
+    index.close()
+    reader.close()
+
+
+def test_mmap_index_reopen_and_contains(tmp_path):
+    code = image_code(1)
+    with MmapIndex(str(tmp_path)) as index:
+        index.add(code, 7)
+        assert 7 in index
+        index.flush()
+        index.flush()
+        index.add(code, 8)
+    with MmapIndex(str(tmp_path)) as index:
+        assert len(index) == 2
+        assert 7 in index and 8 in index
+        assert index.query(code, 0) == [(7, 0), (8, 0)]
+        index.remove(7)
+        index.refresh()
+        assert 7 not in index
+        index.add(image_code(3), 7)
+        assert index.query(code, 1) == [(8, 0), (7, 1)]
+        with pytest.raises(KeyError):
+            index.remove(9)
+
+
+def test_mmap_index_compact_noop_and_tombstones_only(tmp_path):
+    index = MmapIndex(str(tmp_path))
+    index.compact()
+    assert index._segments == []
+    index.add(image_code(1), 1)
+    index.flush()
+    name = index._segments[0].name
+    index.compact()
+    assert index._segments[0].name == name
+    index.remove(1)
+    index.compact()
+    assert len(index) == 0
+    assert len(index._segments) == 1
+    assert index.knn(image_code(1), 3) == []
+    assert not (tmp_path / name).exists()
+
+
+def test_mmap_index_background_compaction(tmp_path):
+    centers, bodies = noisy_bodies(400)
+    index = MmapIndex(str(tmp_path))
+    for key, body in enumerate(bodies[:200]):
+        index.add(image_code(body), key)
+        if key % 50 == 49:
+            index.flush()
+    worker = threading.Thread(target=index.compact)
+    worker.start()
+    for key, body in enumerate(bodies[200:], 200):
+        index.add(image_code(body), key)
+        if key % 50 == 49:
+            index.flush()
+    worker.join()
+    index.compact()
+    assert_matches(index, dict(enumerate(bodies)), centers)
+
+
+def test_mmap_index_reader_stale_manifest(tmp_path):
+    index = MmapIndex(str(tmp_path))
+    reader = MmapIndex(str(tmp_path), readonly=True)
+    index.add(image_code(1), 1)
+    index.flush()
+    index.add(image_code(3), 2)
+    index.flush()
+    stale = index._read_manifest()
+    index.compact()
+    stale["segments"] = index._read_manifest()["segments"] + stale["segments"]
+    reader._load(stale)
+    assert [seg.name for seg in reader._segments] == index._read_manifest()["segments"]
+    assert reader.query(image_code(3), 0) == [(2, 0)]
+    reader.close()
+    (tmp_path / index._segments[0].name).unlink()
+    with pytest.raises(FileNotFoundError):
+        MmapIndex(str(tmp_path), readonly=True)
+
+
+def test_mmap_index_readonly(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        MmapIndex(str(tmp_path / "missing"), readonly=True)
+    MmapIndex(str(tmp_path)).close()
+    reader = MmapIndex(str(tmp_path), readonly=True)
+    with pytest.raises(PermissionError):
+        reader.add(image_code(1), 1)
+    with pytest.raises(PermissionError):
+        reader.remove(1)
+    assert reader.query(image_code(1), 10) == []
+    reader.close()
+
+
+def test_mmap_index_close_with_references(tmp_path):
+    index = MmapIndex(str(tmp_path))
+    index.add(image_code(1), 1)
+    index.flush()
+    keys = index._segments[0].keys
+    index.close()
+    assert keys.tolist() == [1]
+
+
+def test_mmap_index_invalid(tmp_path):
+    index = MmapIndex(str(tmp_path / "a"))
+    with pytest.raises(ValueError, match="unsigned 64-bit"):
+        index.add(image_code(1), -1)
+    with pytest.raises(ValueError, match="unsigned 64-bit"):
+        index.add(image_code(1), "key")
+    index.add(image_code(1), 1)
+    with pytest.raises(ValueError, match="headers don´t match"):
+        index.add(ic.Code.rnd(mt=ic.MT.DATA, bits=64), 2)
+    with pytest.raises(ValueError, match="more than 64 bits"):
+        MmapIndex(str(tmp_path / "b"), bits=256, m=2)
+    manifest = tmp_path / "a" / "manifest.json"
+    data = json.loads(manifest.read_text())
+    manifest.write_text(json.dumps(dict(data, version=99)))
+    with pytest.raises(ValueError, match="format version 99"):
+        MmapIndex(str(tmp_path / "a"))
+
+
+def test_mmap_index_invalid_segment(tmp_path):
+    index = MmapIndex(str(tmp_path))
+    index.add(image_code(1), 1)
+    index.close()
+    path = tmp_path / "00000001.seg"
+    data = bytearray(path.read_bytes())
+    path.write_bytes(b"NOTMIH!!" + data[8:])
+    with pytest.raises(ValueError, match="Not an ISCC index segment"):
+        MmapIndex(str(tmp_path))
+    fields = list(SEGMENT.unpack_from(data))
+    fields[1] = 99
+    path.write_bytes(SEGMENT.pack(*fields) + data[SEGMENT.size :])
+    with pytest.raises(ValueError, match="segment version 99"):
+        MmapIndex(str(tmp_path))
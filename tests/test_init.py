@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import importlib
+import subprocess
+import sys
+import pytest
+import iscc_core as ic
+
+HEAVY_MODULES = (
+    "pydantic",
+    "loguru",
+    "jcs",
+    "data_url",
+    "base58",
+    "blake3",
+    "xxhash",
+    "bitarray",
+    "iscc_core.options",
+    "iscc_core.codec",
+)
+
+
+def test_import_is_lazy():
+    code = (
+        f"import sys, iscc_core; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+def test_lazy_api_resolves():
+    for name in ic.__all__:
+        module = importlib.import_module(ic._LAZY_NAMES[name])
+        assert getattr(ic, name) is getattr(module, name)
+
+
+def test_lazy_api_covers_module_exports():
+    for module_name in ic._LAZY_API:
+        module = importlib.import_module(module_name)
+        for name in getattr(module, "__all__", ()):
+            assert ic._LAZY_NAMES.get(name) == module_name, name
+
+
+def test_lazy_submodule_access():
+    assert ic.codec is importlib.import_module("iscc_core.codec")
+
+
+def test_lazy_unknown_attribute():
+    with pytest.raises(AttributeError):
+        ic.does_not_exist
+    with pytest.raises(AttributeError):
+        ic._private
+
+
+def test_lazy_dir():
+    names = dir(ic)
+    assert "gen_meta_code" in names
+    assert "__version__" in names
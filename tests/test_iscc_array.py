@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+import io
+import random
+import pickle
+from array import array
+import pytest
+import iscc_core as ic
+from iscc_core.iscc_array import IsccArray
+
+
+def rnd_codes(n=200, seed=0):
+    ic.Code.rgen = random.Random(seed)
+    codes = []
+    for i in range(n):
+        mt = ic.Code.rgen.choice(
+            [ic.MT.META, ic.MT.CONTENT, ic.MT.DATA, ic.MT.INSTANCE, ic.MT.ISCC]
+        )
+        if mt == ic.MT.ISCC:
+            bits = ic.Code.rgen.choice([128, 192, 256, 320])
+        else:
+            bits = ic.Code.rgen.choice([64, 128, 256])
+        codes.append("ISCC:" + ic.Code.rnd(mt=mt, bits=bits).code)
+    codes.append("ISCC:" + ic.Code.rnd(mt=ic.MT.ISCC, st=ic.ST_ISCC.WIDE).code)
+    return codes
+
+
+def test_iscc_array_mixed_roundtrip():
+    codes = rnd_codes()
+    arr = IsccArray(codes)
+    assert len(arr) == len(codes)
+    assert arr.width == 40
+    assert arr.tolist() == codes
+    assert IsccArray(arr.tobytes()).tolist() == codes
+    assert [code.code for code in arr] == [ic.Code(code).code for code in codes]
+
+
+def test_iscc_array_uniform_roundtrip():
+    codes = [ic.Code.rnd(mt=ic.MT.CONTENT, bits=64).uri for _ in range(100)]
+    arr = IsccArray(codes)
+    assert arr.width == 8
+    assert arr.sizes.tolist() == [8] * 100
+    assert arr.tolist() == codes
+    assert arr.tobytes() == b"".join(ic.Code(c).bytes for c in codes)
+    assert IsccArray([c[5:].lower() for c in codes]).tolist() == codes
+
+
+def test_iscc_array_init_variants():
+    code = ic.Code.rnd(mt=ic.MT.DATA, bits=128)
+    arr = IsccArray([code, code.bytes, code.code, "ISCC:" + code.code])
+    assert arr.tolist() == [code.uri] * 4
+    assert len(IsccArray()) == 0
+    assert IsccArray().tolist() == []
+    with pytest.raises(ValueError, match="must be str, bytes or Code"):
+        IsccArray([1])
+
+
+def test_iscc_array_noncanonical_header():
+    wide = "ISCC:" + ic.Code.rnd(mt=ic.MT.ISCC, st=ic.ST_ISCC.WIDE).code
+    noncanonical = ic.encode_base32(ic.encode_header(ic.MT.META, 0, 0, 9) + bytes(8))
+    arr = IsccArray([wide, wide, noncanonical])
+    assert arr.tolist() == [wide, wide, "ISCC:" + noncanonical]
+    assert arr[2].hash_bytes == bytes(8)
+
+
+def test_iscc_array_frombytes_invalid():
+    data = ic.Code.rnd(mt=ic.MT.DATA, bits=64).bytes
+    with pytest.raises(ValueError, match="truncated ISCC at byte offset 10"):
+        IsccArray(data + data[:-1])
+    with pytest.raises(ValueError, match="Invalid or truncated"):
+        IsccArray(ic.encode_header(ic.MT.ID, 0, 0, 3) + bytes(11))
+
+
+def test_iscc_array_fromfile(tmp_path):
+    codes = rnd_codes(20)
+    path = tmp_path / "codes.txt"
+    path.write_text("\n".join(codes) + "\n\n", encoding="ascii")
+    assert IsccArray.fromfile(str(path)).tolist() == codes
+    assert IsccArray.fromfile(io.StringIO("\n".join(codes))).tolist() == codes
+
+
+def test_iscc_array_getitem():
+    codes = rnd_codes(50)
+    arr = IsccArray(codes)
+    assert arr[3] == ic.Code(codes[3])
+    assert arr[-1] == ic.Code(codes[-1])
+    assert arr[10:20].tolist() == codes[10:20]
+    assert arr[::7].tolist() == codes[::7]
+    assert isinstance(arr[10:20].body, memoryview)
+    with pytest.raises(IndexError):
+        arr[len(codes)]
+
+
+def test_iscc_array_columns():
+    codes = rnd_codes(50)
+    arr = IsccArray(codes)
+    objs = [ic.Code(c) for c in codes]
+    assert arr.maintype.tolist() == [c.maintype for c in objs]
+    assert arr.subtype.tolist() == [c.subtype for c in objs]
+    assert arr.version.tolist() == [c.version for c in objs]
+    assert arr.length.tolist() == [len(c.hash_bytes) * 8 for c in objs]
+    assert len(arr.body) == len(arr) * arr.width
+    assert repr(arr) == "<IsccArray rows=51 width=40>"
+
+
+def test_iscc_array_ints():
+    codes = rnd_codes(30)
+    arr = IsccArray(codes)
+    expected = [int.from_bytes(ic.Code(c).hash_bytes.ljust(40, b"\x00"), "big") for c in codes]
+    assert arr.ints() == expected
+    arr = IsccArray([ic.Code.rnd(mt=ic.MT.DATA, bits=64) for _ in range(10)])
+    assert arr.ints() == [c.hash_uint for c in arr]
+
+
+def test_iscc_array_select_filter_take():
+    codes = rnd_codes(100)
+    arr = IsccArray(codes)
+    objs = [ic.Code(c) for c in codes]
+    content = arr.select(ic.MT.CONTENT)
+    assert content.tolist() == [c for c, o in zip(codes, objs) if o.maintype == ic.MT.CONTENT]
+    images = arr.select(ic.MT.CONTENT, ic.ST_CC.IMAGE, ic.VS.V0)
+    expected = [c.uri for c in objs if c.maintype == ic.MT.CONTENT and c.subtype == ic.ST_CC.IMAGE]
+    assert images.tolist() == expected
+    mask = [i % 3 == 0 for i in range(len(arr))]
+    assert arr.filter(mask).tolist() == codes[::3]
+    assert arr.take([5, 1, 5]).tolist() == [codes[5], codes[1], codes[5]]
+
+
+def test_iscc_array_groups():
+    arr = IsccArray(rnd_codes(100))
+    groups = arr.groups()
+    assert sum(len(rows) for rows in groups.values()) == len(arr)
+    for (mt, st, vs), rows in groups.items():
+        for row in rows:
+            code = arr[row]
+            assert (code.maintype, code.subtype, code.version) == (mt, st, vs)
+
+
+def test_iscc_array_decompose():
+    codes = rnd_codes(100)
+    units = IsccArray(codes).decompose()
+    total = 0
+    for mt, (rows, unit_arr) in units.items():
+        assert isinstance(rows, array)
+        assert set(unit_arr.maintype) == {mt}
+        for row, unit in zip(rows, unit_arr.tolist()):
+            assert unit[5:] in ic.iscc_decompose(codes[row])
+        total += len(rows)
+    assert total == sum(len(ic.iscc_decompose(c)) for c in codes)
+
+
+def test_iscc_array_concat():
+    codes = rnd_codes(20)
+    parts = [IsccArray(codes[:5]), IsccArray(codes[5:]), IsccArray()]
+    assert IsccArray.concat(parts).tolist() == codes
+
+
+def test_iscc_array_from_columns():
+    arr = IsccArray(rnd_codes(10))
+    cols = (arr.maintype, arr.subtype, arr.version, arr._ln, arr.sizes)
+    view = IsccArray.from_columns(*(memoryview(c) for c in cols), arr.body, arr.width)
+    assert view.tolist() == arr.tolist()
+    with pytest.raises(ValueError, match="same number of rows"):
+        IsccArray.from_columns(*cols[:4], cols[4][:-1], arr.body, arr.width)
+    with pytest.raises(ValueError, match="does not match"):
+        IsccArray.from_columns(*cols, arr.body[:-1], arr.width)
+
+
+def test_iscc_array_noncanonical_uniform():
+    raw = ic.encode_header(ic.MT.META, 0, 0, 9) + bytes(8)
+    code = "ISCC:" + ic.encode_base32(raw)
+    arr = IsccArray([code, code])
+    assert arr.tolist() == [code, code]
+    assert arr.tobytes() == raw + raw
+    assert IsccArray([raw]).tolist() == [code]
+    with pytest.raises(ValueError, match="Invalid or truncated"):
+        IsccArray(raw)
+    data = ic.Code.rnd(mt=ic.MT.DATA, bits=64).bytes
+    wide = ic.Code.rnd(mt=ic.MT.ISCC, st=ic.ST_ISCC.WIDE).bytes
+    assert IsccArray(wide + data + wide).tobytes() == wide + data + wide
+
+
+def test_iscc_array_header_only():
+    arr = IsccArray(["ISCC:AAAA"])
+    assert arr.width == 0
+    assert arr.sizes.tolist() == [0]
+    assert arr.tolist() == ["ISCC:AAAA"]
+    assert arr.ints() == [0]
+
+
+def test_iscc_array_uniform():
+    codes = [ic.Code.rnd(mt=ic.MT.DATA, bits=64) for _ in range(10)]
+    body = b"".join(c.hash_bytes for c in codes)
+    arr = IsccArray.uniform(ic.MT.DATA, ic.ST.NONE, ic.VS.V0, 1, memoryview(body), 8)
+    assert arr.tolist() == [c.uri for c in codes]
+    assert arr.maintype.tolist() == [ic.MT.DATA] * 10
+    assert list(arr.subtype) == [0] * 10
+    assert repr(arr.version) == "_Constant(0, 10)"
+    assert arr[2] == codes[2]
+    assert arr[2:5].tolist() == [c.uri for c in codes[2:5]]
+    assert len(arr[2:5].maintype) == 3
+    assert arr.take([9, 0]).tolist() == [codes[9].uri, codes[0].uri]
+    assert arr.select(ic.MT.DATA).tolist() == arr.tolist()
+    with pytest.raises(IndexError):
+        arr.maintype[10]
+    with pytest.raises(ValueError, match="not a multiple"):
+        IsccArray.uniform(ic.MT.DATA, ic.ST.NONE, ic.VS.V0, 1, body[:-1], 8)
+
+
+def test_iscc_array_scheme_prefix():
+    code = ic.gen_meta_code("Hello")["iscc"]
+    assert IsccArray(["iscc:" + code[5:], code[5:]]).tolist() == [code, code]
+    with pytest.raises(ValueError):
+        IsccArray(["ABCD:" + code[5:]])
+    with pytest.raises(ValueError):
+        IsccArray(["ABCD:" + code[5:], "ISCC:AAAA"])
+
+
+def test_iscc_array_pickle_memoryview_columns():
+    codes = [ic.gen_meta_code(f"title {i}")["iscc"] for i in range(10)]
+    arr = IsccArray(codes)
+    sliced = arr[2:8]
+    assert pickle.loads(pickle.dumps(sliced)).tolist() == codes[2:8]
+    cols = [memoryview(array("B", col)) for col in (arr.maintype, arr.subtype, arr.version)]
+    cols += [memoryview(array("B", arr._ln)), memoryview(array("H", arr.sizes))]
+    viewed = IsccArray.from_columns(*cols, arr.body, arr.width)
+    restored = pickle.loads(pickle.dumps(viewed))
+    assert restored.tolist() == codes
+    assert restored.sizes.typecode == "H"
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+import mmap
+import os
+import random
+import struct
+import pytest
+import iscc_core as ic
+from iscc_core import iscc_file
+from iscc_core.iscc_array import IsccArray
+from iscc_core.iscc_file import IsccFile, IsccFileWriter
+
+
+def rnd_codes(n=300, seed=0):
+    ic.Code.rgen = random.Random(seed)
+    codes = []
+    for i in range(n):
+        mt = ic.Code.rgen.choice([ic.MT.META, ic.MT.CONTENT, ic.MT.DATA, ic.MT.ISCC])
+        bits = 256 if mt == ic.MT.ISCC else ic.Code.rgen.choice([64, 256])
+        codes.append(ic.Code.rnd(mt=mt, bits=bits).uri)
+    return codes
+
+
+def test_iscc_file_roundtrip(tmp_path):
+    path = str(tmp_path / "codes.iscc")
+    codes = rnd_codes()
+    with IsccFileWriter(path) as writer:
+        writer.write(codes)
+    with IsccFile(path) as isccfile:
+        assert len(isccfile) == len(codes)
+        assert isccfile.key_size == 0
+        assert sorted(isccfile.array().tolist()) == sorted(codes)
+        assert isccfile.keys() == b""
+        for section, keys in isccfile.sections:
+            assert keys is None
+            assert len(set(section.maintype)) == 1
+            assert isinstance(section.body, memoryview)
+        # order is preserved within sections
+        content = [c for c in codes if ic.Code(c).type_id == "CONTENT-TEXT-V0-64"]
+        sections = [s for s, _ in isccfile.sections if s[0].type_id == "CONTENT-TEXT-V0-64"]
+        assert sections[0].tolist() == content
+
+
+def test_iscc_file_keys(tmp_path):
+    path = str(tmp_path / "codes.iscc")
+    codes = rnd_codes()
+    keys = [os.urandom(8) for _ in codes]
+    with IsccFileWriter(path, key_size=8, buffer_size=1000) as writer:
+        writer.write(IsccArray(codes[:100]), b"".join(keys[:100]))
+        writer.write(codes[100:], b"".join(keys[100:]))
+        writer.write([], b"")
+    with IsccFile(path) as isccfile:
+        assert len(isccfile.sections) > 10
+        expected = dict(zip(codes, keys))
+        found = isccfile.keys()
+        for idx, code in enumerate(isccfile.array().tolist()):
+            assert expected[code] == found[idx * 8 : idx * 8 + 8]
+
+
+def test_iscc_file_uniform(tmp_path):
+    path = str(tmp_path / "codes.iscc")
+    codes = [ic.Code.rnd(mt=ic.MT.DATA, bits=64).uri for _ in range(1000)]
+    with IsccFileWriter(path) as writer:
+        writer.write(IsccArray(codes))
+        writer.write(IsccArray(codes))
+    assert os.path.getsize(path) == 32 + 2 * 8 * 1000 + 32
+    with IsccFile(path) as isccfile:
+        assert len(isccfile.sections) == 1
+        assert isccfile.sections[0][0].tolist() == codes * 2
+
+
+def test_iscc_file_mixed_sizes(tmp_path):
+    path = str(tmp_path / "codes.iscc")
+    raw = ic.encode_header(ic.MT.META, 0, 0, 9) + bytes(8)
+    codes = [ic.Code.rnd(mt=ic.MT.META, bits=256).uri, "ISCC:" + ic.encode_base32(raw)]
+    with IsccFileWriter(path) as writer:
+        writer.write(codes)
+    with IsccFile(path) as isccfile:
+        assert isccfile.array().tolist() == codes
+
+
+def test_iscc_file_write_errors(tmp_path):
+    path = str(tmp_path / "codes.iscc")
+    codes = rnd_codes(10)
+    with IsccFileWriter(path, key_size=8) as writer:
+        with pytest.raises(ValueError, match="if and only if"):
+            writer.write(codes)
+        with pytest.raises(ValueError, match="Expected 80 bytes"):
+            writer.write(codes, bytes(79))
+        with pytest.raises(ValueError, match="without body"):
+            writer.write(["ISCC:AAAA"], bytes(8))
+    writer.close()
+
+
+def test_iscc_file_open_errors(tmp_path):
+    path = tmp_path / "codes.iscc"
+    path.write_bytes(b"\x00" * 32)
+    with pytest.raises(ValueError, match="Not an ISCC file"):
+        IsccFile(str(path))
+    with IsccFileWriter(str(path)):
+        pass
+    data = bytearray(path.read_bytes())
+    data[8] = 99
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="Unsupported ISCC file format version 99"):
+        IsccFile(str(path))
+    path.write_bytes(b"ISCC")
+    with pytest.raises(ValueError, match="Not an ISCC file"):
+        IsccFile(str(path))
+
+
+def test_iscc_file_open_error_closes_mmap(tmp_path, monkeypatch):
+    maps = []
+
+    class RecordingMmap(mmap.mmap):
+        def __init__(self, *args, **kwargs):
+            maps.append(self)
+
+    monkeypatch.setattr(iscc_file.mmap, "mmap", RecordingMmap)
+    path = tmp_path / "codes.iscc"
+    path.write_bytes(b"\x00" * 32)
+    with pytest.raises(ValueError, match="Not an ISCC file"):
+        IsccFile(str(path))
+    assert len(maps) == 1 and maps[0].closed
+
+
+def corrupt_count(data, table):
+    struct.pack_into("<Q", data, table + 16, struct.unpack_from("<Q", data, table + 16)[0] + 3)
+    return data
+
+
+def corrupt_offset(data, table):
+    struct.pack_into("<Q", data, table + 24, 0)
+    return data
+
+
+def corrupt_truncate(data, table):
+    return data[: table + 20]
+
+
+@pytest.mark.parametrize(
+    "corrupt, match",
+    [
+        (corrupt_count, "Section 0 exceeds"),
+        (corrupt_offset, "Section 0 exceeds"),
+        (corrupt_truncate, "Section table exceeds"),
+    ],
+)
+def test_iscc_file_corrupt_section_table(tmp_path, monkeypatch, corrupt, match):
+    path = tmp_path / "codes.iscc"
+    codes = [ic.Code.rnd(mt=ic.MT.DATA, bits=64).uri for _ in range(10)]
+    with IsccFileWriter(str(path), key_size=8) as writer:
+        writer.write(codes, bytes(80))
+    data = bytearray(path.read_bytes())
+    path.write_bytes(bytes(corrupt(data, struct.unpack_from("<Q", data, 24)[0])))
+    maps = []
+
+    class RecordingMmap(mmap.mmap):
+        def __init__(self, *args, **kwargs):
+            maps.append(self)
+
+    monkeypatch.setattr(iscc_file.mmap, "mmap", RecordingMmap)
+    with pytest.raises(ValueError, match=match):
+        IsccFile(str(path))
+    assert len(maps) == 1 and maps[0].closed
+
+
+def test_iscc_file_close_with_views(tmp_path):
+    path = str(tmp_path / "codes.iscc")
+    codes = [ic.Code.rnd(mt=ic.MT.DATA, bits=64).uri for _ in range(10)]
+    with IsccFileWriter(path) as writer:
+        writer.write(codes)
+    isccfile = IsccFile(path)
+    view = isccfile.sections[0][0][2:4]
+    isccfile.close()
+    assert view.tolist() == codes[2:4]
+    isccfile = IsccFile(path)
+    isccfile.close()
+    assert isccfile.sections == []
@@ -4,6 +4,7 @@ import random
 
 import pytest
 import iscc_core as ic
+from iscc_core.iscc_id import soft_hash_iscc_id_v0, soft_hash_iscc_id_v0_many
 
 wallet = "1Bq568oLhi5HvdgC6rcBSGmu4G3FeAntCz"
 
@@ -165,3 +166,69 @@ def test_iscc_id_from_iscc_id_raises():
     assert iid.code == "MIAORZJBNL6L2BGD"
     with pytest.raises(ValueError):
         ic.gen_iscc_id_v0(iid.code, 0, "a")
+
+
+def replay_codes():
+    meta = ic.gen_meta_code("Hello World", bits=256)["iscc"]
+    data = ic.gen_data_code(io.BytesIO(b"\x01" * 5000), bits=128)["iscc"]
+    instance = ic.gen_instance_code(io.BytesIO(b"\x01" * 5000), bits=128)["iscc"]
+    text = ic.gen_text_code("Hello World")["iscc"]
+    return [
+        ic.gen_iscc_code([meta, text, data, instance])["iscc"],
+        ic.gen_iscc_code_v0([data, instance], wide=True)["iscc"],
+        instance,
+        meta,
+        ic.gen_iscc_code([text, data, instance])["iscc"][5:],
+        text + "-" + data[5:],
+        text + data[5:],
+    ]
+
+
+def test_soft_hash_iscc_id_v0_many():
+    codes = replay_codes() * 3
+    wallets = [f"wallet{i % 4}" for i in range(len(codes))]
+    assert soft_hash_iscc_id_v0_many(codes, wallets) == [
+        soft_hash_iscc_id_v0(code, wallet) for code, wallet in zip(codes, wallets)
+    ]
+    assert soft_hash_iscc_id_v0_many([], []) == []
+    with pytest.raises(ValueError, match="don´t match"):
+        soft_hash_iscc_id_v0_many(codes, wallets[1:])
+    with pytest.raises(ValueError, match="from ISCC-ID"):
+        soft_hash_iscc_id_v0_many(["MAAJU3Y6GCTXLVKA"], [wallet])
+
+
+def test_iscc_id_v0_replay():
+    codes = replay_codes() * 40
+    declarations = [(code, i % 2, f"wallet{i % 3}") for i, code in enumerate(codes)]
+    declarations += [(codes[0], 0, "wallet0")] * 130
+    issued, expected = set(), []
+    for code, chain_id, wallet_ in declarations:
+        iscc_id = ic.gen_iscc_id_v0(code, chain_id, wallet_)["iscc"]
+        while iscc_id in issued:
+            iscc_id = "ISCC:" + ic.iscc_id_incr_v0(iscc_id)
+        issued.add(iscc_id)
+        expected.append(iscc_id)
+    assert max(ic.Code(iscc_id).length for iscc_id in expected) == 80  # uc >= 128
+    replay = ic.IsccIdV0Replay()
+    assert replay.replay(declarations[:100]) + replay.replay(iter(declarations[100:])) == expected
+    assert replay.replay([]) == []
+    assert len(replay) == len(expected)
+    assert expected[-1] in replay
+    assert "ISCC:" + ic.iscc_id_incr_v0(expected[-1]) not in replay
+
+
+def test_iscc_id_v0_replay_add():
+    code = replay_codes()[0]
+    first = ic.gen_iscc_id_v0(code, 1, wallet)["iscc"]
+    third = ic.gen_iscc_id_v0(code, 1, wallet, uc=2)["iscc"]
+    replay = ic.IsccIdV0Replay()
+    replay.add(third)
+    replay.add(first)
+    assert len(replay) == 3
+    assert first in replay and third in replay
+    assert replay.replay([(code, 1, wallet), (code, 2, wallet)]) == [
+        ic.gen_iscc_id_v0(code, 1, wallet, uc=3)["iscc"],
+        ic.gen_iscc_id_v0(code, 2, wallet)["iscc"],
+    ]
+    with pytest.raises(ValueError, match="ISCC-IDv0 expected"):
+        replay.add(ic.gen_iscc_id_v1(1714503123456789)["iscc"])
@@ -1,3 +1,4 @@
+import threading
 import pytest
 import iscc_core as ic
 
@@ -183,3 +184,171 @@ def test_iscc_id_incr_v1_raises():
 
 def test_idv1_multiformat(idv1):
     obj = ic.Code.rnd(mt=ic.MT.ID)
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+        self.slept = []
+
+    def time_ns(self):
+        return self.now * 1000
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += int(seconds * 1e6)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock(1714503123456789)
+    monkeypatch.setattr(ic.iscc_id, "time", fake)
+    return fake
+
+
+def timestamps(isccs):
+    return [ic.Code(iscc).hash_uint >> 12 for iscc in isccs]
+
+
+def test_iscc_id_issuer_batch_matches_gen_iscc_id_v1(clock):
+    issuer = ic.IsccIdIssuer(hub_id=42, realm_id=1)
+    isccs = issuer.issue_batch(100)
+    start = clock.now
+    assert isccs == [ic.gen_iscc_id_v1(start + i, 42, 1)["iscc"] for i in range(100)]
+    bodies = issuer.issue_batch(3, packed=True)
+    assert bodies.typecode == "Q"
+    assert list(bodies) == [(start + 100 + i) << 12 | 42 for i in range(3)]
+    assert issuer.issue() == ic.gen_iscc_id_v1(start + 103, 42, 1)
+    assert issuer.last == start + 103
+    assert issuer.issue_batch(0) == [] and len(issuer.issue_batch(0, packed=True)) == 0
+
+
+def test_iscc_id_issuer_clock_regression(clock):
+    issuer = ic.IsccIdIssuer(max_drift=None)
+    first = timestamps([issuer.issue()["iscc"] for _ in range(3)])
+    clock.now -= 5_000_000
+    later = timestamps([issuer.issue()["iscc"]] + issuer.issue_batch(3))
+    assert first + later == list(range(first[0], first[0] + 7))
+    assert clock.slept == []
+
+
+def test_iscc_id_issuer_max_drift_waits(clock):
+    issuer = ic.IsccIdIssuer(max_drift=1000)
+    issuer.issue_batch(5000)
+    assert clock.slept == []
+    assert timestamps([issuer.issue()["iscc"]]) == [clock.now + 1000]
+    assert clock.slept == [pytest.approx(0.004)]
+
+
+def test_iscc_id_issuer_persists_high_water_mark(clock, tmp_path):
+    path = str(tmp_path / "issuer.json")
+    issuer = ic.IsccIdIssuer(hub_id=7, path=path, reserve=500)
+    issued = timestamps(issuer.issue_batch(10))
+    clock.now -= 1_000_000
+    restarted = ic.IsccIdIssuer(hub_id=7, path=path, reserve=500, max_drift=None)
+    assert restarted.last == issued[-1] + 500
+    assert timestamps([restarted.issue()["iscc"]]) == [issued[-1] + 501]
+    restarted.close()
+    assert ic.IsccIdIssuer(hub_id=7, path=path).last == issued[-1] + 501
+    ic.IsccIdIssuer(hub_id=7).close()
+    with pytest.raises(ValueError):
+        ic.IsccIdIssuer(hub_id=8, path=path)
+
+
+def test_iscc_id_issuer_persist_failure(clock, tmp_path, monkeypatch):
+    path = str(tmp_path / "issuer.json")
+    issuer = ic.IsccIdIssuer(hub_id=7, path=path, reserve=500)
+    first = timestamps([issuer.issue()["iscc"]])[0]
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(ic.iscc_id.os, "replace", fail)
+        clock.now += 1000
+        with pytest.raises(OSError):
+            issuer.issue()
+        assert issuer.last == first
+        with pytest.raises(OSError):
+            issuer.issue()
+    assert timestamps([issuer.issue()["iscc"]]) == [clock.now]
+    assert ic.IsccIdIssuer(hub_id=7, path=path).last == clock.now + 500
+
+
+def test_iscc_id_issuer_threads():
+    issuer = ic.IsccIdIssuer(hub_id=1)
+    results = []
+
+    def worker():
+        results.append([issuer.issue()["iscc"] for _ in range(500)] + issuer.issue_batch(500))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    issued = [iscc for result in results for iscc in result]
+    assert len(set(issued)) == len(issued) == 4000
+    assert all(timestamps(result) == sorted(timestamps(result)) for result in results)
+
+
+def test_iscc_id_issuer_raises(clock):
+    with pytest.raises(ValueError, match="HUB-ID overflow"):
+        ic.IsccIdIssuer(hub_id=4096)
+    with pytest.raises(ValueError, match="Realm-ID"):
+        ic.IsccIdIssuer(realm_id=2)
+    clock.now = 2**52 - 2
+    with pytest.raises(ValueError, match="Timestamp overflow"):
+        ic.IsccIdIssuer().issue_batch(3)
+
+
+def test_iscc_id_v1_bodies_roundtrip():
+    isccs = [ic.gen_iscc_id_v1(1714503123456789 + i, i * 97 % 4096, 1)["iscc"] for i in range(50)]
+    bodies = ic.iscc_id_v1_bodies(isccs)
+    assert bodies.typecode == "Q"
+    assert list(bodies) == [ic.Code(iscc).hash_uint for iscc in isccs]
+    assert ic.iscc_id_v1_bodies([iscc[5:].lower() for iscc in isccs], realm_id=1) == bodies
+    with pytest.raises(ValueError, match="Realm-ID"):
+        ic.iscc_id_v1_bodies(isccs, realm_id=2)
+    assert ic.iscc_id_v1_from_bodies(bodies, realm_id=1) == isccs
+    assert ic.iscc_id_v1_from_bodies([]) == []
+    assert len(ic.iscc_id_v1_bodies([])) == 0
+
+
+def test_iscc_id_v1_bodies_raises():
+    idv1 = ic.gen_iscc_id_v1(1714503123456789, 42, 0)["iscc"]
+    with pytest.raises(ValueError, match="realm 1"):
+        ic.iscc_id_v1_bodies([idv1], realm_id=1)
+    with pytest.raises(ValueError, match="ISCC-IDv1 strings expected"):
+        ic.iscc_id_v1_bodies(["ISCC:MAAJU3Y6GCTXLVKA"])
+    with pytest.raises(ValueError, match="ISCC-IDv1 strings expected"):
+        ic.iscc_id_v1_bodies([ic.gen_meta_code("Hello")["iscc"]])
+    with pytest.raises(ValueError, match="ISCC-IDv1 strings expected"):
+        ic.iscc_id_v1_bodies(["ISCC:MAAZU3Y6GCTXLVKAAE"])
+    with pytest.raises(ValueError, match="Realm-ID"):
+        ic.iscc_id_v1_from_bodies([1], realm_id=2)
+
+
+def test_iscc_id_v1_split_pack():
+    timestamps = [0, 1714503123456789, 2**52 - 1]
+    hub_ids = [4095, 42, 0]
+    bodies = ic.iscc_id_v1_pack(timestamps, hub_ids)
+    assert list(bodies) == [ts << 12 | hub for ts, hub in zip(timestamps, hub_ids)]
+    split = ic.iscc_id_v1_split(bodies)
+    assert (split[0].typecode, split[1].typecode) == ("Q", "H")
+    assert (list(split[0]), list(split[1])) == (timestamps, hub_ids)
+    assert list(ic.iscc_id_v1_pack(timestamps, 7)) == [ts << 12 | 7 for ts in timestamps]
+    with pytest.raises(ValueError, match="Timestamp overflow"):
+        ic.iscc_id_v1_pack([2**52], 0)
+    with pytest.raises(ValueError, match="HUB-ID overflow"):
+        ic.iscc_id_v1_pack([0], 4096)
+    with pytest.raises(ValueError, match="don´t match"):
+        ic.iscc_id_v1_pack([0, 1], [0])
+
+
+def test_iscc_id_v1_base32hex():
+    isccs = [ic.gen_iscc_id_v1(1714503123456789 + i * 1000, i, 0)["iscc"] for i in range(20)]
+    encoded = ic.iscc_id_v1_base32hex(ic.iscc_id_v1_bodies(isccs))
+    assert encoded == [ic.Code(iscc).hash_base32hex for iscc in isccs]
+    assert encoded == sorted(encoded)
+    assert ic.iscc_id_v1_base32hex([]) == []
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import pytest
+import iscc_core as ic
+from iscc_core import join
+from iscc_core.iscc_file import IsccFileWriter
+
+pytestmark = pytest.mark.usefixtures("restore_rgen")
+
+
+def collections(n, seed=0):
+    rnd = random.Random(seed)
+    ic.Code.rgen = rnd
+    right = [ic.Code.rnd(ic.MT.ISCC, bits=256) for _ in range(n)]
+    left = [ic.Code.rnd(ic.MT.ISCC, bits=256) for _ in range(n)]
+    for code in rnd.sample(right, n // 4):
+        body = bytearray(code.hash_bytes)
+        for _ in range(rnd.randint(0, 8)):
+            body[rnd.randrange(len(body))] ^= 1 << rnd.randrange(8)
+        left.append(ic.Code(code.bytes[:2] + bytes(body)))
+    left.append(ic.Code.rnd(ic.MT.META, bits=64))
+    rnd.shuffle(left)
+    return left, right
+
+
+def brute_force(left, right, thresholds):
+    matches = []
+    for i, a in enumerate(left):
+        units_a = [ic.Code(unit) for unit in ic.iscc_decompose(a.code)]
+        for j, b in enumerate(right):
+            for ua in units_a:
+                for ub in [ic.Code(unit) for unit in ic.iscc_decompose(b.code)]:
+                    if ua.maintype in thresholds and tuple(ua)[:4] == tuple(ub)[:4]:
+                        dist = ic.iscc_distance_bytes(ua.hash_bytes, ub.hash_bytes)
+                        if dist <= int(thresholds[ua.maintype] * len(ua.hash_bytes) * 8):
+                            matches.append((i, j, ua.maintype, dist))
+    return sorted(matches)
+
+
+def test_iscc_join_matches_brute_force():
+    left, right = collections(80)
+    for thresholds in (None, {ic.MT.META: 0.3, ic.MT.SEMANTIC: 0.1}):
+        expected = brute_force(left, right, thresholds or join.THRESHOLDS)
+        result = list(ic.iscc_join(left, right, thresholds, workers=1, block_size=7))
+        assert result == expected
+        assert {mt for _, _, mt, _ in result} <= set(thresholds or join.THRESHOLDS)
+    assert any(mt == ic.MT.META for _, _, mt, _ in result)
+
+
+def test_iscc_join_workers():
+    left, right = collections(200, seed=1)
+    expected = list(ic.iscc_join(left, right, workers=1))
+    assert len(expected) >= 50
+    result = ic.iscc_join(ic.IsccArray(left), ic.IsccArray(right), workers=2, block_size=16)
+    assert list(result) == expected
+
+
+def test_iscc_join_workers_spawn_memoryview(tmp_path, monkeypatch):
+    left, right = collections(60, seed=4)
+    path = str(tmp_path / "right.iscc")
+    with IsccFileWriter(path) as writer:
+        writer.write(right)
+    context = multiprocessing.get_context("spawn")
+    monkeypatch.setattr(
+        join, "ProcessPoolExecutor", partial(ProcessPoolExecutor, mp_context=context)
+    )
+    with ic.IsccFile(path) as isccfile:
+        for section, _ in isccfile.sections:
+            sliced = section[0 : len(section)]
+            expected = list(ic.iscc_join(left, sliced, workers=1))
+            assert list(ic.iscc_join(left, sliced, workers=2, block_size=16)) == expected
+
+
+def test_iscc_join_worker_functions():
+    left, right = collections(30, seed=2)
+    join._init(ic.IsccArray(right), join.THRESHOLDS)
+    block = ic.IsccArray(left)
+    assert join._join(block, 100) == [
+        (row + 100, *rest) for row, *rest in ic.iscc_join(left, right, workers=1)
+    ]
+
+
+def test_iscc_join_duplicates_and_empty():
+    ic.Code.rgen = random.Random(3)
+    data = ic.Code.rnd(ic.MT.DATA, bits=64)
+    instance = ic.Code.rnd(ic.MT.INSTANCE, bits=128)
+    right = [data, instance, data, instance]
+    assert list(ic.iscc_join([instance, data], right)) == [
+        (0, 1, ic.MT.INSTANCE, 0),
+        (0, 3, ic.MT.INSTANCE, 0),
+        (1, 0, ic.MT.DATA, 0),
+        (1, 2, ic.MT.DATA, 0),
+    ]
+    assert list(ic.iscc_join([], right)) == []
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import pytest
 from iscc_core.models import Code
 from iscc_core.constants import MT, ST_ISCC, ST_ID_REALM, VS
 
@@ -121,3 +122,37 @@ def test_code_iscc_idv1():
     # Test string representations
     assert code.uri.startswith("ISCC:")
     assert code == Code(code.code)  # Test round-trip through string encoding
+
+
+def test_code_slots():
+    code = Code.rnd(mt=MT.DATA, bits=256)
+    assert not hasattr(code, "__dict__")
+    assert code._ba is None
+
+
+def test_code_hash_ba_lazy():
+    code = Code.rnd(mt=MT.CONTENT, bits=128)
+    assert code.hash_ba.tobytes() == code.hash_bytes
+    assert code.hash_ba is code.hash_ba
+    assert code.hash_bits == code.hash_ba.to01()
+    assert code.hash_ints == code.hash_ba.tolist()
+    assert code.hash_uint == int(code.hash_bits, 2)
+
+
+def test_code_from_tuple_bytearray_body():
+    code = Code((MT.DATA, 0, VS.V0, 1, bytearray(8)))
+    assert code.hash_bytes == bytes(8)
+    assert Code(code) == code
+
+
+def test_code_xor():
+    from bitarray.util import count_xor
+
+    a, b = Code.rnd(mt=MT.DATA, bits=256), Code.rnd(mt=MT.DATA, bits=256)
+    assert a ^ b == count_xor(a.hash_ba, b.hash_ba)
+    assert a ^ a == 0
+
+
+def test_code_xor_length_mismatch():
+    with pytest.raises(ValueError):
+        Code.rnd(mt=MT.DATA, bits=64) ^ Code.rnd(mt=MT.DATA, bits=128)
@@ -13,8 +13,8 @@ def test_iscc_clean():
 
 
 def test_iscc_decode():
-    assert ic.iscc_decode(MF_B32H) == ISCC_OBJ._head + (ISCC_OBJ._body.tobytes(),)
-    assert ic.iscc_decode(MF_B32H_P) == ISCC_OBJ._head + (ISCC_OBJ._body.tobytes(),)
+    assert ic.iscc_decode(MF_B32H) == ISCC_OBJ._head + (ISCC_OBJ.hash_bytes,)
+    assert ic.iscc_decode(MF_B32H_P) == ISCC_OBJ._head + (ISCC_OBJ.hash_bytes,)
 
 
 def test_iscc_decompose():
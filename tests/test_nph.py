@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import random
+import pytest
+import iscc_core as ic
+
+pytestmark = pytest.mark.usefixtures("restore_rgen")
+
+
+def references(n, seed=0):
+    rnd = random.Random(seed)
+    ic.Code.rgen = rnd
+    codes = []
+    for _ in range(n):
+        if rnd.random() < 0.5:
+            codes.append(ic.Code.rnd(ic.MT.ISCC, bits=256).uri)
+        else:
+            mtype = rnd.choice([ic.MT.META, ic.MT.CONTENT, ic.MT.DATA, ic.MT.INSTANCE])
+            codes.append(ic.Code.rnd(mtype, bits=rnd.choice([64, 128, 256])).uri)
+    return codes
+
+
+def columns_to_rows(result):
+    return {
+        key: {row: (sim, bits) for row, sim, bits in zip(*value.values())}
+        for key, value in result.items()
+    }
+
+
+def test_nph_engine_matches_pairwise_compare():
+    refs = references(400)
+    id_row = ic.gen_iscc_id_v1(1000, 0)["iscc"]
+    engine = ic.NphEngine(refs + [id_row])
+    assert len(engine) == 401
+    queries = refs[:40] + [ic.Code.rnd(ic.MT.ISCC, bits=256) for _ in range(3)]
+    for query, result in zip(queries, engine.compare_many(queries)):
+        query = query if isinstance(query, str) else query.code
+        expected = {}
+        for row, ref in enumerate(refs):
+            for key, value in ic.iscc_nph_compare(query, ref).items():
+                expected.setdefault(key, {})[row] = tuple(value.values())
+        assert columns_to_rows(result) == expected
+
+
+def test_nph_engine_columns():
+    ic.Code.rgen = random.Random(1)
+    content = ic.Code.rnd(ic.MT.CONTENT, st=ic.ST_CC.TEXT, bits=256)
+    short = ic.Code(ic.encode_component(*tuple(content)[:3], 64, content.hash_bytes))
+    engine = ic.NphEngine(ic.IsccArray([content, short]))
+    result = engine.compare(short.bytes)["CONTENT_TEXT_V0"]
+    assert list(result["rows"]) == [0, 1]
+    assert result["similarity"].tolist() == [1.0, 1.0]
+    assert result["common_prefix_bits"].tolist() == [64, 64]
+    assert engine.compare(ic.Code.rnd(ic.MT.DATA, bits=64)) == {}
+
+
+def test_nph_engine_instance_lengths():
+    ic.Code.rgen = random.Random(2)
+    long = ic.Code.rnd(ic.MT.INSTANCE, bits=256)
+    short = ic.Code(ic.encode_component(*tuple(long)[:3], 64, long.hash_bytes))
+    uniform = ic.NphEngine([short, short])
+    assert uniform.compare(short)["INSTANCE_NONE_V0"]["similarity"].tolist() == [1.0, 1.0]
+    assert uniform.compare(long)["INSTANCE_NONE_V0"]["similarity"].tolist() == [0.0, 0.0]
+    mixed = ic.NphEngine([long, short])
+    result = mixed.compare(short)["INSTANCE_NONE_V0"]
+    assert result["similarity"].tolist() == [0.0, 1.0]
+    assert result["common_prefix_bits"].tolist() == [64, 64]
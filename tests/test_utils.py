@@ -538,3 +538,62 @@ def test_iscc_nph_compare_skips_iscc_id():
 
     # Result should be empty since ID components are skipped and there's no match
     assert result == {}
+
+
+def test_iscc_distance_many():
+    query = ic.Code.rnd(mt=ic.MT.CONTENT, st=ic.ST_CC.IMAGE, bits=64)
+    cands = [ic.Code.rnd(mt=ic.MT.CONTENT, st=ic.ST_CC.IMAGE, bits=64).uri for _ in range(50)]
+    expected = [ic.iscc_distance(query.uri, c) for c in cands]
+    assert ic.iscc_distance_many(query.uri, cands).tolist() == expected
+    assert ic.iscc_distance_many(query, ic.IsccArray(cands)).tolist() == expected
+    assert ic.iscc_distance_many(query.bytes, []).tolist() == []
+
+
+def test_iscc_distance_many_header_mismatch():
+    query = ic.Code.rnd(mt=ic.MT.CONTENT, st=ic.ST_CC.IMAGE, bits=64)
+    other = ic.Code.rnd(mt=ic.MT.CONTENT, st=ic.ST_CC.AUDIO, bits=64)
+    longer = ic.Code.rnd(mt=ic.MT.CONTENT, st=ic.ST_CC.IMAGE, bits=128)
+    with pytest.raises(ValueError, match="headers don´t match"):
+        ic.iscc_distance_many(query, [query, other])
+    with pytest.raises(ValueError, match="headers don´t match"):
+        ic.iscc_distance_many(query, [longer])
+    with pytest.raises(ValueError, match="ISCC-IDv1"):
+        ic.iscc_distance_many(ic.gen_iscc_id_v1(1000, 0)["iscc"], [])
+
+
+def test_iscc_distance_many_unequal_body():
+    query = ic.Code.rnd(mt=ic.MT.DATA, bits=64)
+    noncanonical = ic.Code(ic.encode_header(ic.MT.DATA, 0, 0, 1) + bytes(9))
+    with pytest.raises(AssertionError, match="unequal length"):
+        ic.iscc_distance_many(query, [noncanonical])
+
+
+def test_iscc_distance_many_nph():
+    query = ic.Code.rnd(mt=ic.MT.DATA, bits=128)
+    cands = [ic.Code.rnd(mt=ic.MT.DATA, bits=bits) for bits in (64, 128, 256, 64)]
+    expected = [
+        ic.iscc_nph_distance_bytes(query.hash_bytes, c.hash_bytes)["distance"] for c in cands
+    ]
+    assert ic.iscc_distance_many(query, cands, nph=True).tolist() == expected
+    uniform = cands[1:2] * 3
+    expected = [ic.iscc_nph_distance_bytes(query.hash_bytes, uniform[0].hash_bytes)["distance"]]
+    assert ic.iscc_distance_many(query, uniform, nph=True).tolist() == expected * 3
+    assert ic.iscc_distance_many(query, [], nph=True).tolist() == []
+
+
+def test_iscc_distance_many_nph_empty_bodies():
+    empty = "ISCC:GAAA"
+    data = ic.Code.rnd(mt=ic.MT.DATA, bits=64)
+    assert ic.iscc_distance_many(empty, [empty, empty], nph=True).tolist() == [0.0, 0.0]
+    assert ic.iscc_distance_many(data, [empty], nph=True).tolist() == [1.0]
+    assert ic.iscc_distance_many(empty, [data, empty], nph=True).tolist() == [1.0, 0.0]
+
+
+def test_iscc_distance_topk():
+    query = ic.Code.rnd(mt=ic.MT.DATA, bits=64)
+    cands = [ic.Code.rnd(mt=ic.MT.DATA, bits=64).uri for _ in range(30)] + [query.uri]
+    distances = ic.iscc_distance_many(query, cands)
+    top = ic.iscc_distance_topk(query, cands, k=3)
+    assert top[0] == (30, 0)
+    assert top == sorted(enumerate(distances), key=lambda item: item[1])[:3]
+    assert len(ic.iscc_distance_topk(query, cands, k=100)) == 31
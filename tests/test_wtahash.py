@@ -28,3 +28,21 @@ def test_wtahash():
         ic.alg_wtahash(vec, 256).hex()
         == "528f91431f7c4ad26932fc073a28cac93f21a3071a152fc2925bdaed1d190061"
     )
+
+
+def test_wtahash_bit_lengths():
+    vec = tuple(range(380))
+    full = ic.alg_wtahash(vec, 256)
+    for bits in (64, 128, 192):
+        assert ic.alg_wtahash(vec, bits) == full[: bits // 8]
+
+
+def test_wtahash_ties_favour_first_index():
+    vec = [7] * 380
+    assert ic.alg_wtahash(vec, 256) == b"\x00" * 32
+
+
+def test_wtahash_batch():
+    vecs = [tuple(range(380)), tuple([0] * 379) + (1,), tuple([0, 1, 0, 2, 1] * 76)]
+    assert ic.alg_wtahash_batch(vecs, 128) == [ic.alg_wtahash(v, 128) for v in vecs]
+    assert ic.alg_wtahash_batch([], 64) == []